@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Admission control for the resident TalentSol XGBoost wrapper
+Bounds the rows waiting to be scored and sheds work that cannot be useful:
+a submission that would overflow the queue is rejected whole, and rows whose
+"deadline_ms" budget is shorter than the estimated queue drain time, or that
+are still waiting when their deadline passes, are answered without scoring.
+Shed rows come back as {"error": ..., "shed": reason} so callers can retry
+elsewhere, and the stats output counts them per reason next to the queue depth.
+With a fallback scorer (--degrade), shed rows get its degraded score instead,
+and a request whose rows all carry deadlines is answered by the fallback when
+the earliest one passes, even if the model is still working on it.
+
+Reasons:
+  queue_full   admitting the submission would exceed --max-queue-rows
+  deadline     the estimated wait is already longer than the row's budget
+  expired      the deadline passed before the model answered
+"""
+import time
+import heapq
+import threading
+from itertools import count
+from concurrent.futures import Future
+
+SHED_QUEUE_FULL = 'queue_full'
+SHED_DEADLINE = 'deadline'
+SHED_EXPIRED = 'expired'
+
+# Weight of the newest sample in the per-row drain time estimate
+DRAIN_SMOOTHING = 0.2
+
+# Absolute time.monotonic() deadline stamped on admitted rows (CLOCK_MONOTONIC
+# is system-wide, so forked workers compare it against their own clock)
+DEADLINE_FIELD = 'deadline_at'
+
+def row_budget(item, default_ms):
+    """Deadline budget in seconds for one row, None without one; raises ValueError when invalid"""
+    budget = item.get('deadline_ms', default_ms) if isinstance(item, dict) else default_ms
+    if budget is None:
+        return None
+    if isinstance(budget, bool) or not isinstance(budget, (int, float)) or budget <= 0:
+        raise ValueError("'deadline_ms' must be a positive number of milliseconds")
+    return budget / 1000.0
+
+def shed_result(reason, message):
+    return {'error': f"Overloaded: {message}", 'shed': reason}
+
+def shed_rows(inputs, reason, message, fallback=None):
+    """Results for rows that won't be scored: the fallback's degraded scores, or shed errors"""
+    if fallback is not None:
+        return fallback(inputs, reason)
+    return [shed_result(reason, message) for _ in inputs]
+
+def expire_overdue(score_batch, fallback=None):
+    """Wrap score_batch so rows whose deadline has passed are shed instead of scored"""
+    def score(inputs):
+        now = time.monotonic()
+        expired = []
+        live = []
+        for position, item in enumerate(inputs):
+            deadline = item.get(DEADLINE_FIELD) if isinstance(item, dict) else None
+            (expired if deadline is not None and deadline < now else live).append(position)
+
+        if not expired:
+            return score_batch(inputs)
+        results = [None] * len(inputs)
+        shed = shed_rows([inputs[position] for position in expired], SHED_EXPIRED,
+                         'deadline passed while queued', fallback)
+        for position, result in zip(expired, shed):
+            results[position] = result
+        if live:
+            for position, result in zip(live, score_batch([inputs[position] for position in live])):
+                results[position] = result
+        return results
+    return score
+
+class DeadlineWatcher:
+    """One thread running callbacks at their time.monotonic() deadlines"""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._heap = []  # [deadline, sequence, callback or None once cancelled]
+        self._sequence = count()
+        self._thread = None
+
+    def schedule(self, deadline, callback):
+        """Run callback at deadline; returns the entry to pass to cancel()"""
+        entry = [deadline, next(self._sequence), callback]
+        with self._condition:
+            heapq.heappush(self._heap, entry)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='deadline-watcher', daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return entry
+
+    def cancel(self, entry):
+        """Drop a pending callback (and the request it holds); the bare entry expires at its deadline"""
+        with self._condition:
+            entry[2] = None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._heap or self._heap[0][0] > time.monotonic():
+                    self._condition.wait(self._heap[0][0] - time.monotonic() if self._heap else None)
+                _, _, callback = heapq.heappop(self._heap)
+            if callback is not None:
+                callback()
+
+class AdmissionControl:
+    """Scheduler wrapper bounding queued rows and shedding rows that would miss their deadline"""
+
+    def __init__(self, scheduler, max_queue_rows=20000, default_deadline_ms=None, fallback=None):
+        # max_queue_rows 0: unbounded; a submission larger than the bound is admitted only into an empty queue
+        # fallback(inputs, reason) -> degraded results, or None to answer shed rows with errors
+        self.scheduler = scheduler
+        self.max_queue_rows = max(0, int(max_queue_rows))
+        self.default_deadline_ms = default_deadline_ms or None
+        self.fallback = fallback
+        self._watcher = DeadlineWatcher() if fallback is not None else None
+        self._lock = threading.Lock()
+        self._queued_rows = 0
+        self._peak_rows = 0
+        self._admitted = 0
+        self._shed = {SHED_QUEUE_FULL: 0, SHED_DEADLINE: 0, SHED_EXPIRED: 0}
+        self._degraded = 0
+        self._row_seconds = None  # Smoothed time to drain one queued row; None until measured
+
+    def _count_shed(self, reason, results):
+        """Count shed rows (under self._lock); degraded ones are the subset the fallback answered"""
+        for result in results:
+            if result.get('shed') == reason:
+                self._shed[reason] += 1
+                self._degraded += result.get('degraded') is True
+
+    def submit(self, inputs):
+        inputs = list(inputs)
+        results = [None] * len(inputs)
+        now = time.monotonic()
+        future = Future()
+
+        with self._lock:
+            queued = self._queued_rows
+            full = self.max_queue_rows and queued and queued + len(inputs) > self.max_queue_rows
+            if not full:
+                # Everything queued, this submission included, drains before its last row is scored
+                wait = self._row_seconds * (queued + len(inputs)) if self._row_seconds is not None else 0.0
+                admitted = []
+                late = []
+                for position, item in enumerate(inputs):
+                    try:
+                        budget = row_budget(item, self.default_deadline_ms)
+                    except ValueError as e:
+                        results[position] = {'error': str(e)}
+                        continue
+                    if budget is None or not isinstance(item, dict):
+                        admitted.append(item)  # Invalid rows get their error from the scorer
+                    elif budget < wait:
+                        late.append(position)
+                    else:
+                        admitted.append(dict(item, **{DEADLINE_FIELD: now + budget}))
+                late_positions = set(late)
+                positions = [position for position, result in enumerate(results)
+                             if result is None and position not in late_positions]
+                self._queued_rows += len(positions)
+                self._peak_rows = max(self._peak_rows, self._queued_rows)
+                self._admitted += len(positions)
+
+        # The fallback runs outside the lock: it is cheap per row, not per batch
+        if full:
+            shed = shed_rows(inputs, SHED_QUEUE_FULL, f"{queued} rows already queued", self.fallback)
+            with self._lock:
+                self._count_shed(SHED_QUEUE_FULL, shed)
+            future.set_result(shed)
+            return future
+        if late:
+            shed = shed_rows([inputs[position] for position in late], SHED_DEADLINE,
+                             f"estimated wait {wait * 1000.0:.0f} ms exceeds the deadline", self.fallback)
+            with self._lock:
+                self._count_shed(SHED_DEADLINE, shed)
+            for position, result in zip(late, shed):
+                results[position] = result
+
+        if not positions:
+            future.set_result(results)
+            return future
+
+        settle_lock = threading.Lock()
+        watch = []  # The watcher entry, once scheduled
+
+        def settle(answered):
+            """Resolve the future once: from the model, or from the fallback at the deadline"""
+            with settle_lock:
+                if future.done():
+                    return False
+                for position, result in zip(positions, answered):
+                    results[position] = result
+                future.set_result(results)
+                return True
+
+        def on_done(done):
+            if watch:
+                self._watcher.cancel(watch[0])
+            elapsed = time.monotonic() - now
+            with self._lock:
+                self._queued_rows -= len(positions)
+                if queued:
+                    # Only a submission that queued behind others measures drain rate, not bare latency
+                    sample = elapsed / (queued + len(positions))
+                    self._row_seconds = sample if self._row_seconds is None else \
+                        self._row_seconds + DRAIN_SMOOTHING * (sample - self._row_seconds)
+            try:
+                scored = done.result()
+            except Exception as e:
+                with settle_lock:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            if settle(scored):
+                with self._lock:
+                    self._count_shed(SHED_EXPIRED, scored)
+
+        def on_deadline():
+            if future.done():
+                return  # The model answered first; don't rule-score rows nobody will read
+            try:
+                degraded = self.fallback(admitted, SHED_EXPIRED)
+            except Exception:
+                return  # The model's answer still settles the request
+            if settle(degraded):
+                with self._lock:
+                    self._count_shed(SHED_EXPIRED, degraded)
+
+        try:
+            self.scheduler.submit(admitted).add_done_callback(on_done)
+        except Exception:
+            with self._lock:
+                self._queued_rows -= len(positions)
+            raise
+
+        deadlines = [item.get(DEADLINE_FIELD) if isinstance(item, dict) else None for item in admitted]
+        if self._watcher is not None and None not in deadlines and not future.done():
+            # Rows without a deadline keep the whole request waiting for the model anyway
+            watch.append(self._watcher.schedule(min(deadlines), on_deadline))
+            if future.done():
+                self._watcher.cancel(watch[0])  # The model answered while the entry was scheduled
+        return future
+
+    def queue_depth(self):
+        return self.scheduler.queue_depth()
+
+    def stats(self):
+        stats = dict(self.scheduler.stats())
+        with self._lock:
+            stats['admission'] = {
+                'queued_rows': self._queued_rows,
+                'peak_queued_rows': self._peak_rows,
+                'max_queue_rows': self.max_queue_rows,
+                'default_deadline_ms': self.default_deadline_ms,
+                'admitted_rows': self._admitted,
+                'shed_rows': dict(self._shed),
+                'degraded_rows': self._degraded,
+                'row_drain_ms': self._row_seconds * 1000.0 if self._row_seconds is not None else None,
+            }
+        return stats
+
+    def close(self):
+        self.scheduler.close()
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Latency and throughput benchmark for the TalentSol XGBoost wrapper
+Drives the wrapper as a child process, the way xgboostModelService.ts does,
+over a synthetic corpus of job/resume pairs of mixed length (short, typical,
+long). Scenarios:
+  one-shot   a fresh process per request: spawn, imports, model load, score
+  resident   one --serve process answering requests of 1 to 10,000 rows; each
+             batch size runs on unseen rows (uncached), then replays them
+             (every row a prediction cache hit)
+  length     resident single-row requests per text length tier
+Resident scenarios speak JSON lines, or with --framed the length-prefixed
+protocol with column-encoded batches (framed_protocol.py).
+Each scenario reports p50/p95/p99/max request latency and rows/sec. The JSON
+report (stdout, or --output) records the environment and model fingerprint
+next to the numbers; --baseline compares against an earlier report and exits
+2 if any scenario's p95 or throughput got worse by more than --tolerance.
+A human-readable summary goes to stderr.
+
+Usage:
+  python benchmark.py [--quick] [--engine booster] [--output report.json]
+  python benchmark.py --baseline previous.json [--tolerance 0.2]
+"""
+import os
+import sys
+import json
+import time
+import random
+import platform
+import tempfile
+import subprocess
+from pathlib import Path
+
+from micro_batcher import percentile
+from sample_corpus import synthetic_inputs
+from framed_protocol import FRAME_HEADER, encode_json_frame, encode_batch_frame
+
+WRAPPER_PATH = Path(__file__).parent / 'xgboost_predict_wrapper.py'
+
+# Tier -> ((job description words), (resume words), share of the mixed corpus)
+LENGTH_TIERS = {
+    'short': ((10, 40), (15, 60), 0.2),
+    'typical': ((40, 200), (60, 400), 0.7),
+    'long': ((400, 1000), (1500, 4000), 0.1),
+}
+
+DEFAULT_BATCH_SIZES = '1,10,100,1000,10000'
+DEFAULT_ONE_SHOT_BATCH_SIZES = '1,1000'
+
+# Applicants per job posting in the corpus, as in a real batch
+APPLICANTS_PER_JOB = 20
+
+# Requests per scenario discarded before measuring (first-use imports, allocator growth)
+WARMUP_REQUESTS = 1
+
+def benchmark_corpus(count, seed, tiers=None):
+    """count shuffled input rows, drawn from the length tiers in proportion to their share"""
+    tiers = tiers or list(LENGTH_TIERS)
+    total_share = sum(LENGTH_TIERS[tier][2] for tier in tiers)
+    rows = []
+    for offset, tier in enumerate(tiers):
+        job_words, resume_words, share = LENGTH_TIERS[tier]
+        tier_count = count - len(rows) if tier == tiers[-1] else round(count * share / total_share)
+        rows.extend(synthetic_inputs(tier_count, seed=seed * 101 + offset,
+                                     distinct_jobs=max(1, tier_count // APPLICANTS_PER_JOB),
+                                     job_words=job_words, resume_words=resume_words))
+    random.Random(seed).shuffle(rows)
+    return rows
+
+def encode_request(request_id, rows, framed=False):
+    """Serve-mode request bytes: a single-object request for one row, else an inputs batch"""
+    if framed:
+        if len(rows) == 1:
+            return encode_json_frame(dict(rows[0], id=request_id))
+        return encode_batch_frame(rows, id=request_id)
+    if len(rows) == 1:
+        return (json.dumps(dict(rows[0], id=request_id)) + '\n').encode('utf-8')
+    return (json.dumps({'id': request_id, 'inputs': rows}) + '\n').encode('utf-8')
+
+def count_errors(response):
+    if 'results' in response:
+        return sum('error' in result for result in response['results'])
+    return 1 if 'error' in response else 0
+
+def summarize(scenario, latencies, rows, seconds, errors, **details):
+    """One scenario's entry in the report; latencies in seconds, reported in milliseconds"""
+    ordered = sorted(latencies)
+    return dict(
+        {'scenario': scenario}, **details,
+        requests=len(ordered),
+        rows=rows,
+        errors=errors,
+        seconds=seconds,
+        rows_per_sec=rows / seconds if seconds else 0.0,
+        latency_ms={
+            'mean': sum(ordered) / len(ordered) * 1000.0 if ordered else 0.0,
+            'p50': percentile(ordered, 0.50) * 1000.0,
+            'p95': percentile(ordered, 0.95) * 1000.0,
+            'p99': percentile(ordered, 0.99) * 1000.0,
+            'max': ordered[-1] * 1000.0 if ordered else 0.0
+        }
+    )
+
+class ResidentWrapper:
+    """A --serve child process, sent one encoded request at a time"""
+
+    def __init__(self, wrapper_args, framed=False):
+        self.framed = framed
+        self._stderr = tempfile.TemporaryFile(mode='w+')
+        self.process = subprocess.Popen(
+            [sys.executable, '-W', 'ignore', str(WRAPPER_PATH), '--serve', *wrapper_args,
+             *(['--framed'] if framed else [])],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=self._stderr
+        )
+        ready = self._read()
+        if ready.get('event') != 'ready':
+            raise RuntimeError(f"Wrapper did not start: {ready}")
+
+    def _read(self):
+        if self.framed:
+            header = self.process.stdout.read(FRAME_HEADER.size)
+            data = self.process.stdout.read(FRAME_HEADER.unpack(header)[0]) if header else b''
+        else:
+            data = self.process.stdout.readline()
+        if not data:
+            self._stderr.seek(0)
+            raise RuntimeError(f"Wrapper exited: {self._stderr.read().strip()[-2000:]}")
+        return json.loads(data)
+
+    def request(self, data):
+        self.process.stdin.write(data)
+        self.process.stdin.flush()
+        return self._read()
+
+    def stats(self):
+        request = {'id': 'stats', 'op': 'stats'}
+        data = encode_json_frame(request) if self.framed else (json.dumps(request) + '\n').encode('utf-8')
+        return self.request(data)['stats']
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait(timeout=60)
+        self._stderr.close()
+
+def timed_requests(wrapper, requests):
+    """Send encoded requests one after another; (latencies after warmup, seconds, errors)"""
+    for data in requests[:WARMUP_REQUESTS]:
+        wrapper.request(data)
+
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for data in requests[WARMUP_REQUESTS:]:
+        sent = time.perf_counter()
+        errors += count_errors(wrapper.request(data))
+        latencies.append(time.perf_counter() - sent)
+    return latencies, time.perf_counter() - started, errors
+
+def requests_for(batch_size, args):
+    """Measured requests for a batch size: about --rows-per-size rows, within the request bounds"""
+    return max(args.min_requests, min(args.max_requests, args.rows_per_size // batch_size))
+
+def run_resident(args, wrapper_args, seed):
+    """Length-tier and batch-size scenarios against one resident wrapper"""
+    batch_sizes = parse_sizes(args.batch_sizes)
+    # Room for every row the cached passes replay
+    cache_entries = sum((requests_for(size, args) + WARMUP_REQUESTS) * size for size in batch_sizes) + 1000
+    wrapper = ResidentWrapper(wrapper_args + ['--cache-entries', str(cache_entries),
+                                              '--cache-mb', str(max(64, cache_entries // 1000))],
+                              framed=args.framed)
+    scenarios = []
+    try:
+        for tier in LENGTH_TIERS:
+            seed += 1
+            rows = benchmark_corpus(args.length_requests + WARMUP_REQUESTS, seed, tiers=[tier])
+            requests = [encode_request(f"{tier}-{position}", [row], args.framed)
+                        for position, row in enumerate(rows)]
+            latencies, seconds, errors = timed_requests(wrapper, requests)
+            scenarios.append(summarize(f"resident/length={tier}", latencies, len(latencies), seconds, errors,
+                                       mode='resident', batch_size=1, length=tier, cache='uncached'))
+
+        for size in batch_sizes:
+            seed += 1
+            count = requests_for(size, args) + WARMUP_REQUESTS
+            rows = benchmark_corpus(count * size, seed)
+            requests = [encode_request(f"{size}-{position}", rows[position * size:(position + 1) * size],
+                                       args.framed)
+                        for position in range(count)]
+            del rows
+
+            for cache in ('uncached', 'cached'):
+                latencies, seconds, errors = timed_requests(wrapper, requests)
+                scenarios.append(summarize(f"resident/batch={size}/{cache}", latencies, len(latencies) * size,
+                                           seconds, errors, mode='resident', batch_size=size, cache=cache))
+                print(f"  {scenarios[-1]['scenario']}: {scenarios[-1]['rows_per_sec']:.0f} rows/s",
+                      file=sys.stderr)
+
+        stages = wrapper.stats()['scheduler'].get('stages', {})
+    finally:
+        wrapper.close()
+
+    stage_means = {name: {'mean_ms': stage['mean_ms'], 'p95_ms': stage['p95_ms'], 'count': stage['count']}
+                   for name, stage in stages.items()}
+    return scenarios, stage_means
+
+def run_one_shot(args, wrapper_args, seed):
+    """A fresh wrapper process per request, for each one-shot batch size"""
+    scenarios = []
+    for size in parse_sizes(args.one_shot_batch_sizes):
+        seed += 1
+        rows = benchmark_corpus(size * args.one_shot_runs, seed)
+        latencies = []
+        errors = 0
+        for run in range(args.one_shot_runs):
+            chunk = rows[run * size:(run + 1) * size]
+            payload = json.dumps(chunk[0] if size == 1 else chunk)
+            started = time.perf_counter()
+            completed = subprocess.run([sys.executable, '-W', 'ignore', str(WRAPPER_PATH), *wrapper_args],
+                                       input=payload, capture_output=True, text=True)
+            latencies.append(time.perf_counter() - started)
+            if completed.returncode != 0:
+                errors += size
+                continue
+            output = json.loads(completed.stdout)
+            errors += sum('error' in result for result in output) if size > 1 else count_errors(output)
+
+        scenarios.append(summarize(f"one-shot/batch={size}", latencies, size * len(latencies), sum(latencies),
+                                   errors, mode='one-shot', batch_size=size, cache='none'))
+        print(f"  {scenarios[-1]['scenario']}: p50 {scenarios[-1]['latency_ms']['p50']:.0f} ms", file=sys.stderr)
+    return scenarios
+
+def package_version(name):
+    from importlib import metadata
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+def git_commit():
+    try:
+        completed = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=Path(__file__).parent,
+                                   capture_output=True, text=True, timeout=10)
+        return completed.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def environment(args):
+    """What a comparison between two reports has to hold equal"""
+    from xgboost_predict_wrapper import MODEL_PATH
+    from model_reloader import resolve_model, model_file
+    from prediction_cache import file_fingerprint
+
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'git_commit': git_commit(),
+        'model_fingerprint': file_fingerprint(model_file(*resolve_model(args.bundle or args.model or MODEL_PATH)))[:16],
+        'engine': args.engine,
+        'workers': args.workers,
+        'protocol': 'framed' if args.framed else 'lines',
+        'seed': args.seed,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'packages': {name: package_version(name) for name in ('xgboost', 'scikit-learn', 'numpy', 'pandas', 'scipy')}
+    }
+
+def compare(report, baseline, tolerance):
+    """Per-scenario p95 and throughput change against a baseline report"""
+    previous = {scenario['scenario']: scenario for scenario in baseline.get('scenarios', [])}
+    comparisons = []
+    for scenario in report['scenarios']:
+        old = previous.get(scenario['scenario'])
+        if old is None:
+            continue
+        p95_change = (scenario['latency_ms']['p95'] / old['latency_ms']['p95'] - 1
+                      if old['latency_ms']['p95'] else 0.0)
+        throughput_change = (scenario['rows_per_sec'] / old['rows_per_sec'] - 1
+                             if old['rows_per_sec'] else 0.0)
+        comparisons.append({
+            'scenario': scenario['scenario'],
+            'p95_change': p95_change,
+            'rows_per_sec_change': throughput_change,
+            'regressed': p95_change > tolerance or throughput_change < -tolerance
+        })
+    return comparisons
+
+def summary_text(report):
+    """Fixed-width table of the scenarios, with baseline changes when compared"""
+    changes = {entry['scenario']: entry for entry in report.get('comparison', {}).get('scenarios', [])}
+    lines = [
+        f"Benchmark {report['environment']['timestamp']}  commit {report['environment']['git_commit']}  "
+        f"engine {report['environment']['engine']}  protocol {report['environment']['protocol']}  "
+        f"model {report['environment']['model_fingerprint']}",
+        f"{'scenario':<32}{'requests':>9}{'rows':>9}{'rows/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+        f"{'p99 ms':>10}{'errors':>8}  vs baseline"
+    ]
+    for scenario in report['scenarios']:
+        latency = scenario['latency_ms']
+        change = changes.get(scenario['scenario'])
+        versus = ''
+        if change is not None:
+            versus = (f"p95 {change['p95_change']:+.0%}, rows/s {change['rows_per_sec_change']:+.0%}"
+                      + ('  REGRESSED' if change['regressed'] else ''))
+        lines.append(
+            f"{scenario['scenario']:<32}{scenario['requests']:>9}{scenario['rows']:>9}"
+            f"{scenario['rows_per_sec']:>10.1f}{latency['p50']:>10.2f}{latency['p95']:>10.2f}"
+            f"{latency['p99']:>10.2f}{scenario['errors']:>8}  {versus}"
+        )
+    if report.get('resident_stages'):
+        lines.append('Resident per-stage means (ms): ' + ', '.join(
+            f"{name} {stage['mean_ms']:.2f}" for name, stage in report['resident_stages'].items()))
+    return '\n'.join(lines)
+
+def parse_sizes(text):
+    sizes = [int(part) for part in text.split(',') if part.strip()]
+    if any(size < 1 for size in sizes):
+        raise ValueError(f"Batch sizes must be positive: {text}")
+    return sizes
+
+def parse_args(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark one-shot and resident wrapper latency and throughput')
+    parser.add_argument('--batch-sizes', default=DEFAULT_BATCH_SIZES,
+                        help=f"resident batch sizes, comma-separated (default {DEFAULT_BATCH_SIZES})")
+    parser.add_argument('--one-shot-batch-sizes', default=DEFAULT_ONE_SHOT_BATCH_SIZES,
+                        help=f"one-shot batch sizes (default {DEFAULT_ONE_SHOT_BATCH_SIZES}; empty skips one-shot)")
+    parser.add_argument('--one-shot-runs', type=int, default=5, help='processes spawned per one-shot batch size')
+    parser.add_argument('--rows-per-size', type=int, default=20000,
+                        help='rows scored per resident batch size and cache state (default 20000)')
+    parser.add_argument('--min-requests', type=int, default=3, help='fewest measured requests per batch size')
+    parser.add_argument('--max-requests', type=int, default=200, help='most measured requests per batch size')
+    parser.add_argument('--length-requests', type=int, default=50,
+                        help='single-row requests per length tier (default 50)')
+    parser.add_argument('--quick', action='store_true',
+                        help='smoke run: batch sizes up to 1000, fewer rows and processes')
+    parser.add_argument('--engine', choices=['pipeline', 'booster', 'numpy'], default='pipeline',
+                        help='wrapper --engine under test')
+    parser.add_argument('--workers', type=int, default=1, help='resident wrapper --workers')
+    parser.add_argument('--framed', action='store_true',
+                        help='resident scenarios use the length-prefixed protocol (--serve --framed)')
+    parser.add_argument('--model', metavar='PATH', help='wrapper --model')
+    parser.add_argument('--bundle', metavar='DIR', help='wrapper --bundle')
+    parser.add_argument('--seed', type=int, default=0, help='corpus seed')
+    parser.add_argument('--output', metavar='PATH', help='write the JSON report here instead of stdout')
+    parser.add_argument('--baseline', metavar='PATH', help='earlier JSON report to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='relative p95 or rows/sec worsening that counts as a regression (default 0.2)')
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.batch_sizes = '1,10,100,1000'
+        args.one_shot_batch_sizes = '1'
+        args.one_shot_runs = 3
+        args.rows_per_size = 2000
+        args.max_requests = 50
+        args.length_requests = 20
+    return args
+
+def main():
+    args = parse_args()
+
+    wrapper_args = ['--engine', args.engine]
+    if args.model:
+        wrapper_args += ['--model', args.model]
+    if args.bundle:
+        wrapper_args += ['--bundle', args.bundle]
+
+    try:
+        baseline = None
+        if args.baseline:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+
+        report = {'environment': environment(args), 'scenarios': []}
+        print('one-shot', file=sys.stderr)
+        report['scenarios'] += run_one_shot(args, wrapper_args, args.seed * 1000)
+        print('resident', file=sys.stderr)
+        resident, stages = run_resident(args, wrapper_args + ['--workers', str(args.workers)],
+                                        args.seed * 1000 + 500)
+        report['scenarios'] += resident
+        report['resident_stages'] = stages
+
+        if baseline is not None:
+            comparisons = compare(report, baseline, args.tolerance)
+            report['comparison'] = {
+                'baseline': args.baseline,
+                'baseline_environment': baseline.get('environment'),
+                'tolerance': args.tolerance,
+                'scenarios': comparisons,
+                'regressions': [entry['scenario'] for entry in comparisons if entry['regressed']]
+            }
+
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2)
+        else:
+            print(json.dumps(report, indent=2))
+        print(summary_text(report), file=sys.stderr)
+    except Exception as e:
+        print(json.dumps({'error': str(e)}), file=sys.stderr)
+        sys.exit(1)
+
+    if report.get('comparison', {}).get('regressions'):
+        sys.exit(2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Direct booster inference engine for the TalentSol XGBoost pipeline
+Decomposes the fitted Pipeline(ColumnTransformer, StandardScaler, XGBClassifier)
+at load time and scores plain row dicts without pandas or sklearn validation:
+hashing branches run through the feature caches, one-hot encoding is a dict
+lookup, scaling multiplies the CSR data in place, and the booster predicts on
+the CSR matrix with inplace_predict.
+"""
+import numpy as np
+from scipy import sparse
+
+from feature_cache import FeatureCachingPipeline, transform_distinct
+from stage_timing import stage
+
+def one_hot_lookup(columns, categories):
+    """Per column: (name, {category: output column}) in the encoder's output order, plus the width"""
+    lookup = []
+    offset = 0
+    for column, known in zip(columns, categories):
+        lookup.append((column, {category: offset + index for index, category in enumerate(known)}))
+        offset += len(known)
+    return lookup, offset
+
+class BoosterEngine(FeatureCachingPipeline):
+    """predict_rows(list of row dicts) -> positive-class probabilities"""
+
+    def __init__(self, pipeline, column_caches=None):
+        super().__init__(pipeline, column_caches or {})
+
+        from sklearn.preprocessing import OneHotEncoder, StandardScaler
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        # Multi-column branches must be one-hot encoders we can replay as lookups
+        self.one_hot = {}
+        for name, transformer, columns in self.branches:
+            if isinstance(columns, str):
+                if not isinstance(transformer, HashingVectorizer):
+                    raise ValueError(f"Branch '{name}' is {type(transformer).__name__}, not HashingVectorizer")
+                continue
+            if not isinstance(transformer, OneHotEncoder) or transformer.drop_idx_ is not None:
+                raise ValueError(f"Branch '{name}' must be a OneHotEncoder without drop")
+            if transformer.handle_unknown != 'ignore':
+                raise ValueError(f"Branch '{name}' must use handle_unknown='ignore'")
+            if transformer.min_frequency is not None or transformer.max_categories is not None:
+                raise ValueError(f"Branch '{name}' groups infrequent categories; lookups can't replay that")
+            self.one_hot[name] = one_hot_lookup(columns, [known.tolist() for known in transformer.categories_])
+
+        if not self.preprocessor.sparse_output_:
+            raise ValueError('ColumnTransformer output is dense; the booster engine expects CSR')
+
+        # Only a mean-free StandardScaler may sit between the preprocessor and the model
+        self.inverse_scale = None
+        for step in self.middle_steps:
+            if not isinstance(step, StandardScaler) or step.with_mean:
+                raise ValueError(f"Unsupported intermediate step {type(step).__name__}")
+            if step.scale_ is not None:
+                # Same operation sklearn applies to CSR input: data *= (1 / scale_)[indices]
+                self.inverse_scale = 1 / step.scale_
+
+        if not hasattr(self.classifier, 'get_booster'):
+            raise ValueError('Final step is not an XGBoost model')
+        self.booster = self.classifier.get_booster()
+        if self.classifier.n_classes_ != 2:
+            raise ValueError('Booster engine supports binary classifiers only')
+        self.missing = self.classifier.missing
+        self.iteration_range = self._default_iteration_range()
+
+    def _default_iteration_range(self):
+        """All trees, unless training recorded a best iteration (mirrors XGBClassifier)"""
+        try:
+            return (0, self.booster.best_iteration + 1)
+        except AttributeError:
+            return (0, 0)
+
+    def _one_hot_block(self, name, rows):
+        lookup, width = self.one_hot[name]
+        indptr = [0]
+        indices = []
+        for row in rows:
+            for column, positions in lookup:
+                position = positions.get(row[column])
+                if position is not None:  # Unknown categories encode as all zeros
+                    indices.append(position)
+            indptr.append(len(indices))
+
+        data = np.ones(len(indices), dtype=np.float64)
+        return sparse.csr_matrix((data, np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int32)),
+                                 shape=(len(rows), width))
+
+    def transform_rows(self, rows):
+        """Scaled CSR feature matrix for a list of row dicts"""
+        blocks = []
+        for name, transformer, columns in self.branches:
+            with stage(f'transform:{name}'):
+                if isinstance(columns, str):
+                    values = [row[columns] for row in rows]
+                    blocks.append(transform_distinct(transformer, values, self.column_caches.get(columns)))
+                else:
+                    blocks.append(self._one_hot_block(name, rows))
+
+        with stage('assemble'):
+            features = sparse.hstack(blocks, format='csr')
+        if self.inverse_scale is not None:
+            with stage('scale'):
+                features.data *= self.inverse_scale.take(features.indices, mode='clip')
+        return features
+
+    def predict_rows(self, rows, iteration_range=None):
+        """Positive-class probabilities straight from the booster"""
+        if not rows:
+            return np.empty(0, dtype=np.float64)
+        return self.predict_features(self.transform_rows(rows), iteration_range)
+
+    def predict_features(self, features, iteration_range=None):
+        """Positive-class probabilities for a matrix from transform_rows"""
+        with stage('trees'):
+            return self.booster.inplace_predict(
+                features,
+                iteration_range=iteration_range or self.iteration_range,
+                missing=self.missing,
+                validate_features=False
+            )
+
+    def predict_proba(self, input_df, iteration_range=None):
+        """Pipeline-compatible two-column output for DataFrame callers"""
+        positive = self.predict_rows(input_df.to_dict('records'), iteration_range)
+        return np.vstack((1 - positive, positive)).transpose()
+
+class CompiledTreeEngine(BoosterEngine):
+    """BoosterEngine transforms, with the trees walked by the pure-NumPy evaluator"""
+
+    def __init__(self, pipeline, column_caches=None):
+        super().__init__(pipeline, column_caches)
+        from tree_ensemble import CompiledEnsemble
+        self.ensemble = CompiledEnsemble.from_booster(self.booster)
+
+    def predict_features(self, features, iteration_range=None):
+        with stage('trees'):
+            return self.ensemble.predict(features, iteration_range or self.iteration_range, self.missing)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Top-K candidate ranking for the TalentSol XGBoost wrapper
+Scores one job against many resumes and keeps only the K most probable
+candidates in a bounded min-heap, so ranking a 5k-applicant job builds and
+serializes K results rather than 5k. Candidates are scored in chunks; each
+chunk repeats the same job text, which the feature caches vectorize once,
+and in resident modes the chunks go through the scheduler (and so across
+workers) concurrently.
+
+Request:  {"job": {"Job Description": ..., "Job Roles": ...},
+           "candidates": [{"id": ..., "Resume": ..., "Ethnicity": ...}, ...],
+           "top_k": 10}
+Response: {"ranked": [{"rank": 1, "index": 17, "id": ..., "probability": ...}, ...],
+           "degraded": [...], "candidates": N, "scored": n, "degraded_rows": d,
+           "failed": f, "errors": [...]}
+
+Ranked entries carry the result's "rounds", "cascade" and (for "debug": true)
+"timings" when it has them.
+Rule-based scores from an overloaded wrapper (--degrade) are on another
+scale, so they never compete with model probabilities: they are ranked
+among themselves under "degraded", each entry marked "degraded": true with
+its "shed" reason.
+"""
+import heapq
+import threading
+from functools import partial
+from concurrent.futures import Future
+
+# Candidates per scoring call (one predict_proba / one scheduler job)
+RANK_CHUNK_ROWS = 512
+
+DEFAULT_TOP_K = 10
+
+# Failed candidates are counted; only the first few are described
+MAX_REPORTED_ERRORS = 10
+
+# Fields taken from the job; everything else comes from each candidate
+JOB_FIELDS = ('Job Description', 'Job Roles')
+
+# Result fields copied onto ranked entries
+RESULT_FLAGS = ('rounds', 'cascade', 'degraded', 'shed', 'timings')
+
+def parse_rank_request(request):
+    """Validated (job, candidates, top_k) from a ranking request"""
+    job = request.get('job')
+    if not isinstance(job, dict):
+        raise ValueError("'job' must be a JSON object")
+    candidates = request.get('candidates')
+    if not isinstance(candidates, list):
+        raise ValueError("'candidates' must be a JSON array")
+    top_k = request.get('top_k', DEFAULT_TOP_K)
+    if not isinstance(top_k, int) or isinstance(top_k, bool) or top_k < 1:
+        raise ValueError("'top_k' must be a positive integer")
+    return job, candidates, top_k
+
+def candidate_input(job, candidate):
+    """Model input for one candidate: the job's fields over the candidate's"""
+    if not isinstance(candidate, dict):
+        return candidate  # predict_batch reports it as an invalid row
+    row = {field: value for field, value in candidate.items() if field != 'id'}
+    row.update((field, job[field]) for field in JOB_FIELDS if field in job)
+    return row
+
+def chunk_inputs(job, chunk):
+    return [candidate_input(job, candidate) for candidate in chunk]
+
+def push_bounded(heap, size, entry):
+    if len(heap) < size:
+        heapq.heappush(heap, entry)
+    elif entry > heap[0]:
+        heapq.heapreplace(heap, entry)
+
+def ranked_entries(heap):
+    return [
+        dict({'rank': rank, 'index': -negative_index, 'id': candidate_id, 'probability': probability}, **flags)
+        for rank, (probability, negative_index, candidate_id, flags) in enumerate(sorted(heap, reverse=True), 1)
+    ]
+
+class TopCandidates:
+    """Min-heaps of the K highest-scoring candidates seen so far, model-scored and degraded apart"""
+
+    def __init__(self, top_k):
+        self.top_k = top_k
+        # (probability, -index, id, flags): earlier candidates win ties, so flags are never compared
+        self._heap = []
+        self._degraded = []
+        self.scored = 0
+        self.degraded = 0
+        self.failed = 0
+        self.errors = []
+
+    def add(self, offset, chunk, results):
+        """Offer one scored chunk (candidates from position offset on)"""
+        for index, (candidate, result) in enumerate(zip(chunk, results), offset):
+            candidate_id = candidate.get('id') if isinstance(candidate, dict) else None
+            if 'error' in result:
+                self.failed += 1
+                if len(self.errors) < MAX_REPORTED_ERRORS:
+                    self.errors.append({'index': index, 'id': candidate_id, 'error': result['error']})
+                continue
+
+            flags = {field: result[field] for field in RESULT_FLAGS if field in result}
+            entry = (result['probability'], -index, candidate_id, flags)
+            if result.get('degraded') is True:
+                self.degraded += 1
+                push_bounded(self._degraded, self.top_k, entry)
+            else:
+                self.scored += 1
+                push_bounded(self._heap, self.top_k, entry)
+
+    def report(self, candidates):
+        return {
+            'ranked': ranked_entries(self._heap),
+            'degraded': ranked_entries(self._degraded),
+            'top_k': self.top_k,
+            'candidates': candidates,
+            'scored': self.scored,
+            'degraded_rows': self.degraded,
+            'failed': self.failed,
+            'errors': self.errors
+        }
+
+def rank_candidates(score_batch, job, candidates, top_k=DEFAULT_TOP_K, chunk_rows=RANK_CHUNK_ROWS):
+    """Rank in-process: score_batch(list of inputs) -> list of results, one chunk at a time"""
+    top = TopCandidates(top_k)
+    for offset in range(0, len(candidates), chunk_rows):
+        chunk = candidates[offset:offset + chunk_rows]
+        top.add(offset, chunk, score_batch(chunk_inputs(job, chunk)))
+    return top.report(len(candidates))
+
+def submit_ranking(scheduler, job, candidates, top_k=DEFAULT_TOP_K, chunk_rows=RANK_CHUNK_ROWS):
+    """Submit every chunk to the scheduler at once; returns a Future of the ranking report"""
+    ranking = Future()
+    top = TopCandidates(top_k)
+    offsets = range(0, len(candidates), chunk_rows)
+    if not offsets:
+        ranking.set_result(top.report(0))
+        return ranking
+
+    lock = threading.Lock()
+    remaining = [len(offsets)]
+
+    def on_chunk(offset, chunk, done):
+        # Chunks finish in any order; the heap doesn't care
+        with lock:
+            if ranking.done():
+                return
+            try:
+                top.add(offset, chunk, done.result())
+            except Exception as e:
+                ranking.set_exception(e)
+                return
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                ranking.set_result(top.report(len(candidates)))
+
+    for offset in offsets:
+        chunk = candidates[offset:offset + chunk_rows]
+        scheduler.submit(chunk_inputs(job, chunk)).add_done_callback(partial(on_chunk, offset, chunk))
+    return ranking
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Two-stage cascade scoring for the TalentSol XGBoost wrapper (--cascade FILE)
+A linear pre-screen over the model's own scaled feature matrix scores every
+row first, with one sparse dot product. Rows it puts at or below the low
+threshold, or at or above the high one, are final; only the uncertain band
+in between goes through the trees, reusing the features already computed.
+Results say which stage answered them ("cascade": "prescreen" or "full"),
+and a row or request with "cascade": false is always scored in full.
+
+The pre-screen is distilled from the full model: a ridge regression onto its
+log-odds, so its scores read as approximate model probabilities. Tree time is
+what the cascade saves, which is most of a row's cost once the job and resume
+feature caches are warm (the same applicants scored against many jobs).
+
+Run as a script to fit the pre-screen and calibrate its thresholds:
+  python integration/cascade_scoring.py --validation applicants.csv --max-disagreement 0.02
+It fits on part of the rows, then picks the thresholds that send the fewest
+held-out rows to the trees while keeping the rank disagreement with the full
+model within --max-disagreement: both the share of row pairs the cascade
+orders differently and the share of the full model's top decile it leaves
+out of its own. A file is tied to the model it was fitted on; the wrapper
+refuses it for another one.
+"""
+import sys
+import json
+import threading
+from pathlib import Path
+
+PRESCREEN_MODEL_TYPE = 'linear_prescreen'
+
+STAGE_PRESCREEN = 'prescreen'
+STAGE_FULL = 'full'
+
+DEFAULT_MAX_DISAGREEMENT = 0.02
+
+# Candidate thresholds are pre-screen score quantiles at this many steps
+THRESHOLD_STEPS = 40
+
+# Probabilities are clipped this far from 0 and 1 before taking log-odds
+LOGIT_EPSILON = 1e-6
+
+def row_cascade(item):
+    """Whether one input may be answered by the pre-screen; raises ValueError when invalid"""
+    if not isinstance(item, dict):
+        return True
+    allowed = item.get('cascade', True)
+    if not isinstance(allowed, bool):
+        raise ValueError("'cascade' must be true or false")
+    return allowed
+
+def scaled_features(engine, rows, columns):
+    """The feature matrix the classifier sees, for row engines and sklearn pipelines alike"""
+    if hasattr(engine, 'transform_rows'):
+        return engine.transform_rows(rows)
+
+    import pandas as pd
+    input_df = pd.DataFrame(rows, columns=columns)
+    if hasattr(engine, 'transform_features'):
+        features = engine.transform_features(input_df)
+        for step in engine.middle_steps:
+            features = step.transform(features)
+        return features
+    return engine[:-1].transform(input_df)
+
+def classify_features(engine, features, iteration_range=None):
+    """Full-model probabilities for an already transformed feature matrix"""
+    if hasattr(engine, 'predict_features'):
+        return engine.predict_features(features, iteration_range)
+    classifier = engine.classifier if hasattr(engine, 'classifier') else engine.steps[-1][1]
+    if iteration_range is not None:
+        return classifier.predict_proba(features, iteration_range=iteration_range)[:, 1]
+    return classifier.predict_proba(features)[:, 1]
+
+class Prescreen:
+    """Linear stand-in for the full model plus the band of scores it defers to the trees"""
+
+    def __init__(self, coef, intercept, low, high, fingerprint):
+        # low/high: scores at or below low, or at or above high, are final
+        self.coef = coef
+        self.intercept = float(intercept)
+        self.low = float(low)
+        self.high = float(high)
+        self.fingerprint = fingerprint
+        self._lock = threading.Lock()
+        self._prescreened = 0
+        self._full = 0
+
+    @classmethod
+    def load(cls, path):
+        import numpy as np
+
+        with np.load(path, allow_pickle=False) as saved:
+            return cls(saved['coef'], saved['intercept'], saved['low'], saved['high'], str(saved['fingerprint']))
+
+    def save(self, path):
+        import numpy as np
+
+        # np.savez appends .npz to any other name; write through a handle to keep the caller's
+        with open(path, 'wb') as handle:
+            np.savez(handle, coef=self.coef, intercept=self.intercept, low=self.low, high=self.high,
+                     fingerprint=np.array(self.fingerprint))
+
+    def check_model(self, fingerprint):
+        """Raise unless this pre-screen was fitted on the model with this fingerprint"""
+        if fingerprint != self.fingerprint:
+            raise ValueError('Cascade pre-screen was fitted on a different model; rerun cascade_scoring.py')
+
+    def probabilities(self, features):
+        import numpy as np
+
+        if features.shape[1] != len(self.coef):
+            raise ValueError(f"Cascade pre-screen expects {len(self.coef)} features, got {features.shape[1]}")
+        margin = np.asarray(features @ self.coef).ravel() + self.intercept
+        return 1.0 / (1.0 + np.exp(-margin))
+
+    def uncertain(self, probabilities):
+        """Mask of scores strictly between the thresholds, which the trees must settle"""
+        return (probabilities > self.low) & (probabilities < self.high)
+
+    def record(self, prescreened, full):
+        with self._lock:
+            self._prescreened += prescreened
+            self._full += full
+
+    def stats(self):
+        with self._lock:
+            scored = self._prescreened + self._full
+            return {
+                'low': self.low,
+                'high': self.high,
+                'prescreened_rows': self._prescreened,
+                'full_rows': self._full,
+                'prescreen_rate': self._prescreened / scored if scored else None,
+            }
+
+def load_prescreen(path, fingerprint):
+    """Prescreen from a cascade_scoring.py file, checked against the model it will front"""
+    prescreen = Prescreen.load(path)
+    prescreen.check_model(fingerprint)
+    return prescreen
+
+def log_odds(probabilities):
+    import numpy as np
+
+    clipped = np.clip(probabilities, LOGIT_EPSILON, 1.0 - LOGIT_EPSILON)
+    return np.log(clipped / (1.0 - clipped))
+
+def fit_prescreen(features, full, alpha=1.0):
+    """(coef, intercept) of a ridge regression from features onto the full model's log-odds"""
+    from sklearn.linear_model import Ridge
+
+    ridge = Ridge(alpha=alpha).fit(features, log_odds(full))
+    return ridge.coef_, float(ridge.intercept_)
+
+def pair_disagreement(full, cascaded):
+    """Share of row pairs the two scores order differently, from Kendall's tau"""
+    from scipy.stats import kendalltau
+
+    if len(full) < 2:
+        return 0.0
+    tau = kendalltau(full, cascaded).statistic
+    return 0.0 if tau != tau else (1.0 - tau) / 2.0  # NaN: one side is constant
+
+def rank_disagreement(full, cascaded):
+    """The worse of pair disagreement and the share of the full top decile the cascade misses"""
+    from ensemble_tiers import top_decile_recall
+
+    return max(pair_disagreement(full, cascaded), 1.0 - top_decile_recall(full, cascaded))
+
+def choose_thresholds(screened, full, max_disagreement=DEFAULT_MAX_DISAGREEMENT, steps=THRESHOLD_STEPS):
+    """(low, high, disagreement, full share) sending the fewest rows to the trees within the bound"""
+    import numpy as np
+
+    candidates = np.unique(np.quantile(screened, np.linspace(0.0, 1.0, steps + 1)))
+    lows = np.concatenate(([0.0], candidates))
+    highs = np.concatenate((candidates, [1.0]))
+
+    best = (0.0, 1.0, rank_disagreement(full, full), 1.0)  # Everything through the trees
+    for low in lows:
+        for high in highs[highs > low]:
+            band = (screened > low) & (screened < high)
+            share = float(band.mean())
+            if share >= best[3]:
+                continue
+            disagreement = rank_disagreement(full, np.where(band, full, screened))
+            if disagreement <= max_disagreement:
+                best = (float(low), float(high), disagreement, share)
+    return best
+
+def calibrate(engine, rows, fingerprint, max_disagreement=DEFAULT_MAX_DISAGREEMENT, holdout=0.25, alpha=1.0):
+    """(Prescreen, report): fit on part of the rows, pick thresholds on the rest"""
+    import numpy as np
+    from ensemble_tiers import top_decile_recall, rank_correlation
+
+    order = np.random.default_rng(0).permutation(len(rows))
+    held = max(1, int(len(rows) * holdout))
+    if len(rows) - held < 2:
+        raise ValueError('Too few rows to fit and calibrate a pre-screen')
+
+    features = engine.transform_rows(rows)
+    full = np.asarray(engine.predict_features(features), dtype=np.float64)
+    fit_rows, held_rows = order[held:], order[:held]
+
+    coef, intercept = fit_prescreen(features[fit_rows], full[fit_rows], alpha)
+    prescreen = Prescreen(coef, intercept, 0.0, 1.0, fingerprint)
+    screened = prescreen.probabilities(features[held_rows])
+    reference = full[held_rows]
+
+    low, high, disagreement, share = choose_thresholds(screened, reference, max_disagreement)
+    prescreen.low, prescreen.high = low, high
+    band = prescreen.uncertain(screened)
+    cascaded = np.where(band, reference, screened)
+
+    report = {
+        'fit_rows': len(fit_rows),
+        'holdout_rows': len(held_rows),
+        'prescreen_rank_correlation': rank_correlation(reference, screened),
+        'prescreen_mean_abs_diff': float(np.abs(screened - reference).mean()),
+        'low': low,
+        'high': high,
+        'max_disagreement': max_disagreement,
+        'rank_disagreement': disagreement,
+        'pair_disagreement': pair_disagreement(reference, cascaded),
+        'top_decile_recall': top_decile_recall(reference, cascaded),
+        'full_share': share,
+    }
+    return prescreen, report
+
+def main():
+    import argparse
+    from xgboost_predict_wrapper import load_model, build_row, MODEL_PATH
+    from booster_engine import BoosterEngine
+    from prediction_cache import file_fingerprint
+    from ensemble_tiers import read_validation
+    from sample_corpus import synthetic_inputs, model_categories
+
+    parser = argparse.ArgumentParser(description='Fit and calibrate the cascade pre-screen for a model')
+    parser.add_argument('--validation', metavar='FILE', help='CSV, JSON array or NDJSON rows to fit and calibrate on')
+    parser.add_argument('--synthetic', type=int, default=20000, help='Synthetic rows when there is no --validation')
+    parser.add_argument('--max-disagreement', type=float, default=DEFAULT_MAX_DISAGREEMENT,
+                        help='Largest share of held-out row pairs, or of the top decile, the cascade may rank '
+                             'unlike the full model')
+    parser.add_argument('--holdout', type=float, default=0.25, help='Share of rows kept back to pick thresholds on')
+    parser.add_argument('--alpha', type=float, default=1.0, help='Ridge regularization strength')
+    parser.add_argument('--model', metavar='PATH', help='Joblib pipeline (default: the shipped model)')
+    parser.add_argument('--output', metavar='FILE',
+                        help='Where to write the pre-screen (default: next to the model, .cascade.npz)')
+    args = parser.parse_args()
+
+    try:
+        if not 0.0 <= args.max_disagreement <= 1.0:
+            raise ValueError('--max-disagreement must be between 0 and 1')
+        if not 0.0 < args.holdout < 1.0:
+            raise ValueError('--holdout must be between 0 and 1')
+
+        model_path = Path(args.model or MODEL_PATH)
+        pipeline = load_model(path=model_path)
+        engine = BoosterEngine(pipeline)
+
+        if args.validation:
+            inputs = read_validation(args.validation)
+        else:
+            job_roles, ethnicities = model_categories(pipeline)
+            inputs = synthetic_inputs(args.synthetic, distinct_jobs=max(1, args.synthetic // 20),
+                                      job_roles=job_roles, ethnicities=ethnicities)
+
+        rows = [build_row(item, record=False) for item in inputs]
+        prescreen, report = calibrate(engine, rows, file_fingerprint(model_path), args.max_disagreement,
+                                      args.holdout, args.alpha)
+
+        output = Path(args.output) if args.output else model_path.with_suffix('.cascade.npz')
+        prescreen.save(output)
+        report['source'] = args.validation or f"synthetic ({args.synthetic} rows)"
+        report['output'] = str(output)
+        print(json.dumps(report, indent=2))
+    except Exception as e:
+        print(json.dumps({'error': str(e)}), file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Degraded scoring for the resident TalentSol XGBoost wrapper (--degrade rule)
+When admission control would shed a row, or a row's deadline passes before the
+model has answered, the row gets a rule-based score instead of an error, in
+the spirit of legacy/predict.py's rule_based_prediction: the share of the
+job description's distinct terms that also appear in the resume. It needs no
+model, costs microseconds per row and never waits in the scoring queue.
+Degraded results carry "degraded": true and the "shed" reason, report their
+own model_type, and are never cached.
+"""
+from text_normalization import TOKEN
+
+RULE_MODEL_TYPE = 'rule_based_keyword_overlap'
+
+def rule_based_probability(row):
+    """Fraction of the job description's distinct terms found in the resume (0 without a description)"""
+    job_terms = set(TOKEN.findall(row['Job Description'].lower()))
+    if not job_terms:
+        return 0.0
+    resume_terms = set(TOKEN.findall(row['Resume'].lower()))
+    return len(job_terms & resume_terms) / len(job_terms)
+
+def rule_based_fallback(build_row):
+    """fallback(inputs, reason) -> degraded results; build_row validates and normalizes one input"""
+    def fallback(inputs, reason):
+        results = []
+        for item in inputs:
+            try:
+                row = build_row(item)
+            except Exception as e:
+                results.append({'error': str(e)})
+                continue
+            results.append({'probability': rule_based_probability(row), 'model_type': RULE_MODEL_TYPE,
+                            'degraded': True, 'shed': reason})
+        return results
+    return fallback
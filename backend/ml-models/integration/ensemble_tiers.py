@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Truncated-ensemble latency tiers for the TalentSol XGBoost wrapper
+A request (or one row) with "rounds": N, or "tier": NAME for a tier from
+--tier NAME=N, is scored with only the first N boosting rounds (XGBoost's
+iteration_range) and its result carries "rounds": N. Tree evaluation cost
+scales with the rounds used; vectorizing the text does not, so the saving
+is largest for short texts and cached job/resume features.
+
+Run as a script to see what each N costs against the full ensemble:
+  python integration/ensemble_tiers.py --validation holdout.csv --label "Best Match"
+For each N it reports AUC (when the file has labels), probability drift
+(mean/p95/max absolute difference), decisions flipped at the threshold,
+rank correlation, how much of the full model's top decile stays in the top
+decile, and tree evaluation time. Without --validation a synthetic corpus
+gives drift only.
+"""
+import sys
+import csv
+import json
+import time
+from pathlib import Path
+
+# Named tiers available without --tier; requests may also give "rounds" directly
+DEFAULT_TIERS = {'triage': 20, 'screen': 50}
+
+DEFAULT_DRIFT_ROUNDS = (5, 10, 20, 30, 50, 75)
+
+# The threshold xgboostModelService.ts turns probabilities into decisions with
+DECISION_THRESHOLD = 0.5027
+
+# Tree timings are the best of this many runs over the same features
+TIMING_RUNS = 3
+
+def parse_tier(text):
+    """argparse type for NAME=ROUNDS"""
+    name, _, rounds = text.partition('=')
+    try:
+        value = int(rounds)
+    except ValueError:
+        value = 0
+    if not name or value < 1:
+        raise ValueError(f"Tier must be NAME=ROUNDS with ROUNDS >= 1, got {text!r}")
+    return name, value
+
+def row_rounds(item, tiers):
+    """Rounds one input asks for, None for the full ensemble; raises ValueError when invalid"""
+    if not isinstance(item, dict):
+        return None
+    rounds = item.get('rounds')
+    tier = item.get('tier')
+    if tier is not None:
+        if tier not in tiers:
+            raise ValueError(f"Unknown tier {tier!r}; known tiers: {', '.join(sorted(tiers)) or 'none'}")
+        rounds = tiers[tier]
+    if rounds is None:
+        return None
+    if isinstance(rounds, bool) or not isinstance(rounds, int) or rounds < 1:
+        raise ValueError("'rounds' must be a positive integer")
+    return rounds
+
+def engine_rounds(engine):
+    """Boosting rounds a full prediction uses (the best iteration when training recorded one)"""
+    end = getattr(engine, 'iteration_range', (0, 0))[1]
+    if end:
+        return end
+    if getattr(engine, 'ensemble', None) is not None:
+        return engine.ensemble.num_iterations
+    booster = getattr(engine, 'booster', None)
+    if booster is None:
+        classifier = getattr(engine, 'classifier', None) or engine.steps[-1][1]
+        booster = classifier.get_booster()
+    return booster.num_boosted_rounds()
+
+def truncated_range(engine, rounds):
+    """iteration_range for the first `rounds` rounds, None when that is the whole ensemble"""
+    if rounds is None or rounds >= engine_rounds(engine):
+        return None
+    return (0, rounds)
+
+def read_validation(path):
+    """Input dicts from a CSV, JSON array or NDJSON file"""
+    path = Path(path)
+    with open(path, newline='', encoding='utf-8') as handle:
+        if path.suffix.lower() == '.csv':
+            return list(csv.DictReader(handle))
+        text = handle.read()
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    if not isinstance(data, list):
+        raise ValueError('Validation JSON must be an array of rows')
+    return data
+
+def parse_label(value):
+    """0/1 from a label cell: numbers, booleans, or true/false/yes/no strings"""
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in ('true', 'yes'):
+            return 1
+        if lowered in ('false', 'no'):
+            return 0
+        value = float(lowered)
+    return 1 if float(value) > 0.5 else 0
+
+def top_decile_recall(full, truncated):
+    """Share of the full model's top 10% that the truncated scores also put in their top 10%"""
+    import numpy as np
+
+    size = max(1, len(full) // 10)
+    expected = set(np.argsort(-full, kind='stable')[:size].tolist())
+    actual = set(np.argsort(-truncated, kind='stable')[:size].tolist())
+    return len(expected & actual) / size
+
+def rank_correlation(full, truncated):
+    """Spearman correlation of two score arrays (ties broken by position)"""
+    import numpy as np
+
+    ranks = [np.argsort(np.argsort(scores, kind='stable'), kind='stable') for scores in (full, truncated)]
+    return float(np.corrcoef(*ranks)[0, 1]) if len(full) > 1 else 1.0
+
+def drift_report(engine, rows, labels=None, rounds_list=DEFAULT_DRIFT_ROUNDS, threshold=DECISION_THRESHOLD):
+    """Per-N accuracy and tree cost of truncated ensembles against the full one"""
+    import numpy as np
+
+    total = engine_rounds(engine)
+    features = engine.transform_rows(rows)
+    auc = None
+    if labels is not None and 0 < sum(labels) < len(labels):
+        from sklearn.metrics import roc_auc_score
+        auc = lambda scores: float(roc_auc_score(labels, scores))
+
+    def evaluate(rounds):
+        iteration_range = (0, rounds) if rounds < total else engine.iteration_range
+        best = None
+        for _ in range(TIMING_RUNS):
+            started = time.perf_counter()
+            if getattr(engine, 'ensemble', None) is not None:
+                scores = engine.ensemble.predict(features, iteration_range, engine.missing)
+            else:
+                scores = engine.booster.inplace_predict(features, iteration_range=iteration_range,
+                                                        missing=engine.missing, validate_features=False)
+            elapsed = (time.perf_counter() - started) * 1000.0
+            best = elapsed if best is None else min(best, elapsed)
+        return np.asarray(scores, dtype=np.float64), best
+
+    evaluate(total)  # Warm-up: the first call pays for thread pool and buffer setup
+    full, full_ms = evaluate(total)
+    full_auc = auc(full) if auc else None
+    tiers = []
+    for rounds in sorted({min(rounds, total) for rounds in rounds_list} | {total}):
+        scores, trees_ms = evaluate(rounds)
+        difference = np.abs(scores - full)
+        entry = {
+            'rounds': rounds,
+            'mean_abs_diff': float(difference.mean()),
+            'p95_abs_diff': float(np.percentile(difference, 95)),
+            'max_abs_diff': float(difference.max()),
+            'decisions_flipped': float(np.mean((scores >= threshold) != (full >= threshold))),
+            'rank_correlation': rank_correlation(full, scores),
+            'top_decile_recall': top_decile_recall(full, scores),
+            'trees_ms_per_1k_rows': trees_ms * 1000.0 / len(rows),
+            'trees_cost': trees_ms / full_ms if full_ms else None,
+        }
+        if full_auc is not None:
+            entry['auc'] = auc(scores)
+            entry['auc_delta'] = entry['auc'] - full_auc
+        tiers.append(entry)
+
+    return {'rows': len(rows), 'full_rounds': total, 'threshold': threshold, 'full_auc': full_auc, 'tiers': tiers}
+
+def main():
+    import argparse
+    from xgboost_predict_wrapper import load_model, build_row, MODEL_PATH
+    from booster_engine import BoosterEngine, CompiledTreeEngine
+    from sample_corpus import synthetic_inputs, model_categories
+
+    parser = argparse.ArgumentParser(description='Measure accuracy drift of truncated XGBoost ensembles')
+    parser.add_argument('--validation', metavar='FILE', help='CSV, JSON array or NDJSON rows to score')
+    parser.add_argument('--label', default='Best Match', help='Label column in the validation file (for AUC)')
+    parser.add_argument('--rounds', default=','.join(str(rounds) for rounds in DEFAULT_DRIFT_ROUNDS),
+                        help='Comma-separated rounds to compare with the full ensemble')
+    parser.add_argument('--synthetic', type=int, default=5000, help='Synthetic rows when there is no --validation')
+    parser.add_argument('--engine', choices=['booster', 'numpy'], default='booster', help='Tree evaluator to time')
+    parser.add_argument('--threshold', type=float, default=DECISION_THRESHOLD, help='Decision threshold for flips')
+    parser.add_argument('--model', metavar='PATH', help='Joblib pipeline (default: the shipped model)')
+    args = parser.parse_args()
+
+    try:
+        rounds_list = [int(rounds) for rounds in args.rounds.split(',') if rounds.strip()]
+        if not rounds_list or min(rounds_list) < 1:
+            raise ValueError('--rounds needs positive integers')
+
+        pipeline = load_model(path=args.model or MODEL_PATH)
+        engine = (CompiledTreeEngine if args.engine == 'numpy' else BoosterEngine)(pipeline)
+
+        labels = None
+        if args.validation:
+            inputs = read_validation(args.validation)
+            if inputs and isinstance(inputs[0], dict) and args.label in inputs[0]:
+                labels = [parse_label(item[args.label]) for item in inputs]
+        else:
+            job_roles, ethnicities = model_categories(pipeline)
+            inputs = synthetic_inputs(args.synthetic, distinct_jobs=max(1, args.synthetic // 20),
+                                      job_roles=job_roles, ethnicities=ethnicities)
+        if not inputs:
+            raise ValueError('No rows to score')
+
+        rows = [build_row(item, record=False) for item in inputs]
+        report = drift_report(engine, rows, labels, rounds_list, args.threshold)
+        report['source'] = args.validation or f"synthetic ({args.synthetic} rows, no labels)"
+        print(json.dumps(report, indent=2))
+    except Exception as e:
+        print(json.dumps({'error': str(e)}), file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Per-column feature caching for the TalentSol XGBoost pipeline
+Runs the fitted ColumnTransformer branches by hand so that a text column shared
+by many rows (the same Job Description across 2,000 applicants) is vectorized
+once per distinct value, and reuses those sparse rows across requests.
+The result feeds the pipeline's remaining steps exactly as Pipeline would.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from scipy import sparse
+
+from stage_timing import stage
+
+def text_key(text):
+    """Cache key for one raw text value"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def sparse_nbytes(matrix):
+    """Memory held by a CSR matrix's arrays"""
+    return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+
+class SparseRowCache:
+    """Thread-safe LRU of transformed 1-row CSR blocks, bounded by entries and bytes"""
+
+    def __init__(self, max_entries=256, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self._rows = OrderedDict()  # key -> (csr row, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._rows.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._rows.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, row):
+        size = sparse_nbytes(row) + len(key)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._rows:
+                self._bytes -= self._rows.pop(key)[1]
+            self._rows[key] = (row, size)
+            self._bytes += size
+
+            while len(self._rows) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted) = self._rows.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._rows),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / lookups) if lookups else 0.0,
+                'evictions': self.evictions
+            }
+
+def transform_distinct(transformer, values, cache=None):
+    """Transform each distinct text once (cache hits skipped), then expand to every row"""
+    positions = {}
+    row_index = np.empty(len(values), dtype=np.intp)
+    for position, value in enumerate(values):
+        row_index[position] = positions.setdefault(value, len(positions))
+
+    distinct = list(positions)
+    keys = [text_key(value) for value in distinct] if cache is not None else None
+    rows = [cache.get(key) for key in keys] if cache is not None else [None] * len(distinct)
+    missing = [index for index, row in enumerate(rows) if row is None]
+
+    block = None
+    if missing:
+        transformed = sparse.csr_matrix(transformer.transform([distinct[index] for index in missing]))
+        if len(missing) == len(distinct):
+            block = transformed  # Nothing was cached: no need to restack rows
+
+        if block is None or cache is not None:
+            for offset, index in enumerate(missing):
+                rows[index] = transformed[offset]
+                if cache is not None:
+                    cache.put(keys[index], rows[index])
+
+    if block is None:
+        block = sparse.vstack(rows, format='csr')
+
+    # Every value distinct and in order: the block already lines up with the rows
+    return block if len(distinct) == len(values) else block[row_index]
+
+class FeatureCachingPipeline:
+    """Drop-in predict_proba for a fitted Pipeline(ColumnTransformer, ..., classifier)"""
+
+    def __init__(self, pipeline, column_caches):
+        # column_caches: {column name: SparseRowCache or None}; None still dedupes per call
+        self.pipeline = pipeline
+        self.column_caches = column_caches
+
+        steps = pipeline.steps
+        self.preprocessor = steps[0][1]
+        self.middle_steps = [step for _, step in steps[1:-1] if step not in (None, 'passthrough')]
+        self.classifier = steps[-1][1]
+
+        self.branches = []
+        for name, transformer, columns in self.preprocessor.transformers_:
+            if transformer == 'drop' or (not isinstance(columns, str) and len(columns) == 0):
+                continue
+            if transformer == 'passthrough':
+                raise ValueError(f"Branch '{name}' is passthrough; feature caching needs fitted transformers")
+            self.branches.append((name, transformer, columns))
+
+    @property
+    def classes_(self):
+        return self.pipeline.classes_
+
+    @property
+    def steps(self):
+        return self.pipeline.steps
+
+    def transform_features(self, input_df):
+        """ColumnTransformer output, with cached columns vectorized once per distinct value"""
+        blocks = []
+        for name, transformer, columns in self.branches:
+            with stage(f'transform:{name}'):
+                if isinstance(columns, str) and columns in self.column_caches:
+                    blocks.append(transform_distinct(transformer, input_df[columns].tolist(),
+                                                     self.column_caches[columns]))
+                else:
+                    blocks.append(transformer.transform(input_df[columns]))
+
+        with stage('assemble'):
+            if self.preprocessor.sparse_output_:
+                return sparse.hstack(blocks, format='csr')
+            return np.hstack([block.toarray() if sparse.issparse(block) else block for block in blocks])
+
+    def predict_proba(self, input_df, iteration_range=None):
+        features = self.transform_features(input_df)
+        with stage('scale'):
+            for step in self.middle_steps:
+                features = step.transform(features)
+        with stage('trees'):
+            if iteration_range is not None:
+                return self.classifier.predict_proba(features, iteration_range=iteration_range)
+            return self.classifier.predict_proba(features)
+
+    def cache_stats(self):
+        return {
+            column: cache.stats()
+            for column, cache in self.column_caches.items()
+            if cache is not None
+        }
+
+def wrap_feature_cache(pipeline, column_caches):
+    """FeatureCachingPipeline when the pipeline has the expected shape, else the pipeline itself"""
+    try:
+        from sklearn.compose import ColumnTransformer
+        if not isinstance(pipeline.steps[0][1], ColumnTransformer):
+            return pipeline
+        return FeatureCachingPipeline(pipeline, column_caches)
+    except Exception:
+        return pipeline
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Length-prefixed framing for the resident TalentSol XGBoost wrapper (--serve --framed)
+JSON lines need a scan for the newline and one json.loads over the whole
+line, which for a 10k-resume batch is a multi-megabyte string. Frames carry
+their size up front, so request boundaries are explicit, and batches can use
+a column encoding that sends each distinct value once (one job description
+for all of its applicants) and decodes without parsing JSON string escapes.
+
+Frame:        u32 payload length | u8 kind | payload        (little-endian)
+  kind 'J'    UTF-8 JSON document: any request, and every response
+  kind 'B'    batch scoring request:
+                u32 header length | header JSON: the request's other fields
+                                    ("id", "model", "debug") plus "rows": N
+                                    and "columns": [name, ...]
+                then per column:
+                  u32 D | D x u32 UTF-8 byte lengths | the D values' bytes
+                  N x u32 index of each row's value (0xFFFFFFFF: field absent)
+A batch frame is answered like {"id": ..., "inputs": [...]}: one JSON frame
+with "results" in row order.
+"""
+import os
+import sys
+import json
+import time
+import struct
+import threading
+from array import array
+from operator import itemgetter
+from itertools import accumulate
+
+FRAME_HEADER = struct.Struct('<IB')
+U32 = struct.Struct('<I')
+
+KIND_JSON = ord('J')
+KIND_BATCH = ord('B')
+
+# Index of a row that has no value for a column
+MISSING = 0xFFFFFFFF
+
+# Larger frames are skipped unread and answered with an error
+MAX_FRAME_BYTES = 256 * 1024 * 1024
+
+READ_CHUNK_BYTES = 1024 * 1024
+
+def u32_array(view):
+    """Little-endian u32 array from a buffer slice"""
+    values = array('I')
+    values.frombytes(view)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+def split_values(view, lengths):
+    """Strings from concatenated UTF-8 values and their byte lengths"""
+    text = str(view, 'utf-8')
+    if len(text) != len(view):
+        # Multi-byte characters: byte offsets aren't string offsets, decode each value
+        ends = list(accumulate(lengths))
+        return [str(view[end - length:end], 'utf-8') for end, length in zip(ends, lengths)]
+    # ASCII (the usual case): one decode, then slices
+    ends = list(accumulate(lengths))
+    return [text[end - length:end] for end, length in zip(ends, lengths)]
+
+def read_exactly(read, size):
+    """size bytes from read(n); None at a clean end of input, EOFError mid-frame"""
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = read(min(remaining, READ_CHUNK_BYTES))
+        if not chunk:
+            if remaining == size:
+                return None
+            raise EOFError(f"Input ended {remaining} bytes short of a frame")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return chunks[0] if len(chunks) == 1 else b''.join(chunks)
+
+def iter_frames(stream, max_frame_bytes=MAX_FRAME_BYTES):
+    """Yield (kind, payload) per frame; payload is None for a frame too large to read"""
+    # Read the descriptor directly, as iter_lines does, so a forked worker can't
+    # inherit a held stdin buffer lock
+    try:
+        fd = stream.fileno()
+        read = lambda size: os.read(fd, size)
+    except (AttributeError, OSError, ValueError):
+        read = getattr(stream, 'buffer', stream).read
+
+    while True:
+        try:
+            header = read_exactly(read, FRAME_HEADER.size)
+        except EOFError:
+            return  # The client went away mid-header; nothing more can be answered
+        if header is None:
+            return
+        size, kind = FRAME_HEADER.unpack(header)
+        if size > max_frame_bytes:
+            # The length says where the next frame starts: discard this one and carry on
+            while size:
+                skipped = read(min(size, READ_CHUNK_BYTES))
+                if not skipped:
+                    return
+                size -= len(skipped)
+            yield kind, None
+            continue
+
+        try:
+            payload = read_exactly(read, size)
+        except EOFError:
+            return
+        if payload is None and size:
+            return
+        yield kind, payload or b''
+
+def decode_batch(payload):
+    """Request dict ({"inputs": [...]} plus header fields) from a batch frame payload"""
+    view = memoryview(payload)
+    try:
+        (header_size,) = U32.unpack_from(view, 0)
+        header = json.loads(bytes(view[4:4 + header_size]))
+        rows = header.pop('rows')
+        columns = header.pop('columns')
+        if not isinstance(rows, int) or rows < 0 or not isinstance(columns, list):
+            raise ValueError('header needs "rows" (a count) and "columns" (a list)')
+        offset = 4 + header_size
+
+        values_by_column = []
+        for _ in columns:
+            (distinct,) = U32.unpack_from(view, offset)
+            offset += 4
+            lengths = u32_array(view[offset:offset + 4 * distinct])
+            offset += 4 * distinct
+
+            size = sum(lengths)
+            if offset + size > len(view):
+                raise ValueError('value bytes run past the end of the frame')
+            values = split_values(view[offset:offset + size], lengths)
+            offset += size
+
+            indices = u32_array(view[offset:offset + 4 * rows])
+            offset += 4 * rows
+            if len(indices) != rows:
+                raise ValueError('row indices run past the end of the frame')
+            if MISSING in indices:
+                values.append(None)
+                indices = [len(values) - 1 if index == MISSING else index for index in indices]
+            values_by_column.append(itemgetter(*indices)(values) if rows > 1 else [values[index] for index in indices])
+    except (struct.error, KeyError, TypeError, IndexError, AttributeError, ValueError) as e:
+        # json.JSONDecodeError and UnicodeDecodeError are ValueErrors too
+        raise ValueError(f"Malformed batch frame: {str(e) or type(e).__name__}")
+
+    if offset != len(view):
+        raise ValueError(f"Malformed batch frame: {len(view) - offset} trailing bytes")
+
+    if not columns:
+        header['inputs'] = [{} for _ in range(rows)]
+    elif any(None in values for values in values_by_column):
+        header['inputs'] = [{column: value for column, value in zip(columns, row) if value is not None}
+                            for row in zip(*values_by_column)]
+    else:
+        header['inputs'] = [dict(zip(columns, row)) for row in zip(*values_by_column)]
+    return header
+
+def decode_frame(frame):
+    """Request dict from one (kind, payload) frame; raises ValueError with the client-facing message"""
+    kind, payload = frame
+    if payload is None:
+        raise ValueError(f"Frame exceeds {MAX_FRAME_BYTES} bytes")
+    if kind == KIND_BATCH:
+        return decode_batch(payload)
+    if kind != KIND_JSON:
+        raise ValueError(f"Unknown frame kind {chr(kind)!r}")
+
+    try:
+        request = json.loads(payload)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid JSON: {str(e)}")
+    if not isinstance(request, dict):
+        raise ValueError('Request must be a JSON object')
+    return request
+
+def encode_frame(kind, payload):
+    return FRAME_HEADER.pack(len(payload), kind) + payload
+
+def encode_json_frame(document):
+    return encode_frame(KIND_JSON, json.dumps(document).encode('utf-8'))
+
+def encode_batch_frame(inputs, **fields):
+    """Batch frame for a list of input dicts with string values (clients and benchmarks)"""
+    columns = list(dict.fromkeys(column for item in inputs for column in item))
+    header = json.dumps(dict(fields, rows=len(inputs), columns=columns)).encode('utf-8')
+    parts = [U32.pack(len(header)), header]
+
+    for column in columns:
+        distinct = {}
+        indices = array('I')
+        for item in inputs:
+            value = item.get(column)
+            indices.append(MISSING if value is None else distinct.setdefault(value, len(distinct)))
+
+        encoded = [value.encode('utf-8') for value in distinct]
+        lengths = array('I', [len(value) for value in encoded])
+        if sys.byteorder == 'big':
+            lengths.byteswap()
+            indices.byteswap()
+        parts += [U32.pack(len(encoded)), lengths.tobytes(), *encoded, indices.tobytes()]
+
+    return encode_frame(KIND_BATCH, b''.join(parts))
+
+class FrameWriter:
+    """Thread-safe JSON frame writer shared by the reader and batcher threads (LineWriter's twin)"""
+
+    def __init__(self, stream, histograms=None):
+        self.stream = getattr(stream, 'buffer', stream)
+        self.lock = threading.Lock()
+        self.histograms = histograms
+
+    def __call__(self, payload):
+        started = time.perf_counter()
+        frame = encode_json_frame(payload)
+        if self.histograms is not None:
+            self.histograms.record({'serialize': (time.perf_counter() - started) * 1000.0})
+        with self.lock:
+            self.stream.write(frame)
+            self.stream.flush()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Micro-batching scheduler for the TalentSol XGBoost wrapper
+Coalesces score requests that arrive within a few milliseconds of each other
+into one batched predict_proba call, then fans the results back out
+"""
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+# Sentinel that tells the scheduler thread to drain and exit
+_STOP = object()
+
+# Number of recent queue waits kept for percentile reporting
+WAIT_SAMPLE_SIZE = 1024
+
+def batch_size_bucket(size):
+    """Histogram bucket label for a batch size (1, 2, 3-4, 5-8, ...)"""
+    if size <= 2:
+        return str(size)
+    upper = 1 << (size - 1).bit_length()
+    return f"{upper // 2 + 1}-{upper}"
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+class MicroBatcher:
+    """Collects submitted input lists and scores them together in one call"""
+
+    def __init__(self, score_batch, max_batch_size=64, max_wait_ms=2.0):
+        # score_batch(list of inputs) -> list of results in the same order
+        self.score_batch = score_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self._queue = queue.Queue()
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self._histogram = {}
+        self._batches = 0
+        self._rows = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._recent_waits = deque(maxlen=WAIT_SAMPLE_SIZE)
+
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, inputs):
+        """Queue a list of inputs; the returned Future resolves to their results"""
+        if self._closed:
+            raise RuntimeError('Micro-batcher is closed')
+
+        future = Future()
+        self._queue.put((list(inputs), future, time.monotonic()))
+        return future
+
+    def close(self):
+        """Score everything already queued, then stop the scheduler thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def queue_depth(self):
+        """Approximate number of submissions waiting to be batched"""
+        return self._queue.qsize()
+
+    def stats(self):
+        """Batch-size histogram and queue wait times for the stats output"""
+        with self._stats_lock:
+            waits = sorted(self._recent_waits)
+            return {
+                'batches': self._batches,
+                'rows': self._rows,
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0,
+                'queue_depth': self.queue_depth(),
+                'batch_size_histogram': dict(self._histogram),
+                'queue_wait_ms': {
+                    'mean': (self._wait_total / self._rows * 1000.0) if self._rows else 0.0,
+                    'p50': percentile(waits, 0.50) * 1000.0,
+                    'p95': percentile(waits, 0.95) * 1000.0,
+                    'max': self._wait_max * 1000.0
+                }
+            }
+
+    def _collect(self):
+        """Block for the first submission, then gather more until full or timed out"""
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+
+        batch = [first]
+        rows = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+
+        while rows < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if entry is _STOP:
+                return batch, True
+
+            batch.append(entry)
+            rows += len(entry[0])
+
+        return batch, False
+
+    def _dispatch(self, batch):
+        """Score one coalesced batch and resolve each caller's Future"""
+        started = time.monotonic()
+        inputs = [item for entry in batch for item in entry[0]]
+        self._record(batch, started, len(inputs))
+
+        try:
+            results = self.score_batch(inputs)
+            if len(results) != len(inputs):
+                raise RuntimeError(f"Scorer returned {len(results)} results for {len(inputs)} inputs")
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+
+        offset = 0
+        for entry_inputs, future, _ in batch:
+            future.set_result(results[offset:offset + len(entry_inputs)])
+            offset += len(entry_inputs)
+
+    def _record(self, batch, started, size):
+        """Update the histogram and per-row queue wait statistics"""
+        with self._stats_lock:
+            self._batches += 1
+            self._rows += size
+            bucket = batch_size_bucket(size)
+            self._histogram[bucket] = self._histogram.get(bucket, 0) + 1
+
+            for entry_inputs, _, enqueued in batch:
+                wait = started - enqueued
+                self._wait_total += wait * len(entry_inputs)
+                self._wait_max = max(self._wait_max, wait)
+                self._recent_waits.append(wait)
+
+    def _run(self):
+        while True:
+            batch, stop = self._collect()
+            if batch:
+                self._dispatch(batch)
+            if stop:
+                break
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped model loading tools for the TalentSol XGBoost wrapper
+--convert re-saves the pipeline uncompressed so joblib can map its numpy
+arrays read-only (wrapper --mmap); every process on the host then shares one
+copy of those pages through the page cache instead of holding its own.
+--report loads the model in fresh processes for each mode and prints load
+time plus RSS before and after, split into anonymous (private to each
+process) and file-backed (shareable) memory, for sizing scoring nodes.
+
+Usage:
+  python model_memory.py --convert [--output PATH]
+  python model_memory.py --report [--bundle DIR]
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+
+MB = 1024 * 1024
+
+def memory_usage():
+    """Current RSS breakdown in bytes from /proc (Linux); falls back to peak RSS elsewhere"""
+    try:
+        fields = {}
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                name, _, value = line.partition(':')
+                parts = value.split()
+                if len(parts) == 2 and parts[1] == 'kB':
+                    fields[name] = int(parts[0]) * 1024
+        return {
+            'rss': fields['Rss'],
+            'anonymous': fields.get('Anonymous', 0),
+            'file_backed': fields['Rss'] - fields.get('Anonymous', 0)
+        }
+    except (OSError, KeyError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {'rss': peak if sys.platform == 'darwin' else peak * 1024, 'anonymous': None, 'file_backed': None}
+
+def mapped_array_bytes(obj, seen=None):
+    """Bytes of numpy.memmap arrays reachable from a loaded model"""
+    import numpy as np
+    seen = seen if seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, np.memmap):
+        return obj.nbytes
+    if isinstance(obj, np.ndarray):
+        return 0
+    if isinstance(obj, dict):
+        return sum(mapped_array_bytes(value, seen) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(mapped_array_bytes(value, seen) for value in obj)
+    if hasattr(obj, '__dict__'):
+        return mapped_array_bytes(vars(obj), seen)
+    return 0
+
+def is_compressed(path):
+    """joblib pickles start with the pickle protocol opcode; compressed ones with a codec magic"""
+    with open(path, 'rb') as f:
+        return f.read(1) != b'\x80'
+
+def convert_for_mmap(source, target):
+    """Re-save a joblib pipeline uncompressed (arrays aligned for mmap); atomic replace"""
+    import joblib
+
+    pipeline = joblib.load(str(source))
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(target)), prefix='.convert-')
+    os.close(fd)
+    try:
+        joblib.dump(pipeline, temp_path, compress=0)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, target)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+    # Prove the result maps: at least one array must come back as a memmap
+    mapped = mapped_array_bytes(joblib.load(str(target), mmap_mode='r'))
+    return {'source': str(source), 'source_compressed': is_compressed(source),
+            'output': str(target), 'bytes': os.path.getsize(target), 'mapped_array_bytes': mapped}
+
+def measure(mode, bundle=None):
+    """Load the model once in this process; report timings and memory around the load"""
+    started = memory_usage()
+    import_start = time.perf_counter()
+    import xgboost_predict_wrapper as wrapper
+    import_seconds = time.perf_counter() - import_start
+
+    before = memory_usage()
+    load_start = time.perf_counter()
+    if mode == 'bundle':
+        from portable_model import PortableEngine
+        model = PortableEngine(bundle, engine='numpy')
+        source = bundle
+    else:
+        model = wrapper.load_model(mmap=(mode == 'mmap'))
+        source = str(wrapper.mmap_model_path() if mode == 'mmap' else wrapper.MODEL_PATH)
+    load_seconds = time.perf_counter() - load_start
+    after = memory_usage()
+
+    return {
+        'mode': mode,
+        'source': source,
+        'import_seconds': import_seconds,
+        'load_seconds': load_seconds,
+        'rss_at_start_mb': started['rss'] / MB,
+        'rss_before_load_mb': before['rss'] / MB,
+        'rss_after_load_mb': after['rss'] / MB,
+        'load_rss_delta_mb': (after['rss'] - before['rss']) / MB,
+        'load_anonymous_delta_mb': (after['anonymous'] - before['anonymous']) / MB
+                                   if after['anonymous'] is not None else None,
+        'load_file_backed_delta_mb': (after['file_backed'] - before['file_backed']) / MB
+                                     if after['file_backed'] is not None else None,
+        'mapped_array_mb': mapped_array_bytes(model) / MB
+    }
+
+def report(bundle=None):
+    """Run measure() for each mode in a fresh interpreter so imports and caches don't leak"""
+    modes = ['pickle', 'mmap'] + (['bundle'] if bundle else [])
+    results = []
+    for mode in modes:
+        command = [sys.executable, '-W', 'ignore', os.path.abspath(__file__), '--measure', mode]
+        if bundle:
+            command += ['--bundle', bundle]
+        completed = subprocess.run(command, capture_output=True, text=True, check=True)
+        results.append(json.loads(completed.stdout))
+    return {'modes': results}
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Convert the model for mmap loading and report load memory')
+    parser.add_argument('--convert', action='store_true', help='Re-save the pickle uncompressed for --mmap')
+    parser.add_argument('--output', help='Converted model path (default: the path wrapper --mmap looks for)')
+    parser.add_argument('--report', action='store_true', help='Measure load time and RSS per loading mode')
+    parser.add_argument('--bundle', metavar='DIR', help='Also measure a portable bundle (NumPy engine)')
+    parser.add_argument('--measure', choices=['pickle', 'mmap', 'bundle'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if not (args.convert or args.report or args.measure):
+        parser.error('nothing to do: pass --convert and/or --report')
+
+    try:
+        if args.measure:
+            print(json.dumps(measure(args.measure, args.bundle)))
+            return
+
+        # Imported here so --measure children see the wrapper's import cost
+        from xgboost_predict_wrapper import MODEL_PATH, MMAP_MODEL_PATH
+
+        output = {}
+        if args.convert:
+            output['converted'] = convert_for_mmap(MODEL_PATH, args.output or MMAP_MODEL_PATH)
+        if args.report:
+            output['report'] = report(args.bundle)
+        print(json.dumps(output, indent=2))
+    except subprocess.CalledProcessError as e:
+        print(json.dumps({'error': f"Measurement failed: {e.stderr.strip()}"}), file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(json.dumps({'error': str(e)}), file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
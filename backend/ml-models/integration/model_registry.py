@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Multi-model registry for the resident TalentSol XGBoost wrapper
+Serves named model versions from the versions/ tree that mlVersioningService
+maintains (versions/{model-name}/{version}/) next to the default model. A
+request selects one with a "model" field: "name" for the newest version or
+"name@version" for a specific one. Models load on first use and the least
+recently used are evicted beyond a model count or memory budget, so A/B
+tests and rollbacks don't need a process per model.
+"""
+import re
+import threading
+from pathlib import Path
+from collections import OrderedDict
+
+from prediction_cache import file_fingerprint
+from model_reloader import resolve_model, model_file
+
+VERSIONS_PATH = Path(__file__).parent.parent / "versions"
+
+# "name" or "name@version"; no path separators, so a request can't leave the root
+MODEL_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_-][A-Za-z0-9_.-]*(@[A-Za-z0-9_+-][A-Za-z0-9_.+-]*)?$')
+
+def model_size(kind, path):
+    """Bytes on disk: the memory estimate the budget is enforced against"""
+    if kind == 'bundle':
+        return sum(child.stat().st_size for child in Path(path).rglob('*') if child.is_file())
+    return Path(path).stat().st_size
+
+class ModelRegistry:
+    """Named models loaded on demand and kept in an LRU under a count and memory budget"""
+
+    def __init__(self, load, root=VERSIONS_PATH, max_models=4, max_bytes=1024 * 1024 * 1024, smoke_test=None):
+        # load(kind, path) -> engine, as for ModelReloader
+        self.load = load
+        self.root = Path(root)
+        self.max_models = max(1, int(max_models))
+        self.max_bytes = max_bytes
+        self.smoke_test = smoke_test
+
+        self._lock = threading.Lock()
+        self._resolved = {}           # name -> (kind, path, fingerprint, label)
+        self._models = OrderedDict()  # model path -> (engine, bytes, label), least recently used first
+        self._loading = {}            # model path -> Lock held while that model loads
+        self._bytes = 0
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+        self.failures = 0
+
+    def resolve(self, name):
+        """(kind, path, fingerprint, label) for a model name; pinned on first use"""
+        with self._lock:
+            resolved = self._resolved.get(name)
+        if resolved is not None:
+            return resolved
+
+        if not isinstance(name, str) or not MODEL_NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid model name {name!r}; expected name or name@version")
+        model, _, version = name.partition('@')
+        location = self.root / model / version if version else self.root / model
+        if not location.exists():
+            raise ValueError(f"Unknown model {name!r}")
+
+        kind, path = resolve_model(location)
+        # The version directory's name, e.g. decision-tree@1.2.0
+        version_dir = path if kind == 'bundle' else path.parent
+        label = f"{model}@{version_dir.name}" if version_dir.parent.name == model else model
+        resolved = (kind, path, file_fingerprint(model_file(kind, path)), label)
+
+        # A bare name stays on the version it first resolved to, keeping cached
+        # results and every worker consistent; request name@version to move on
+        with self._lock:
+            return self._resolved.setdefault(name, resolved)
+
+    def fingerprint(self, name):
+        return self.resolve(name)[2]
+
+    def label(self, name):
+        return self.resolve(name)[3]
+
+    def get(self, name):
+        """Engine for a model name, loading it (and evicting others) if needed"""
+        kind, path, _, label = self.resolve(name)
+        key = str(path)  # "name" and "name@version" may resolve to the same model
+
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return self._models[key][0]
+            loading = self._loading.setdefault(key, threading.Lock())
+
+        # One load per model; concurrent requests for it wait, others carry on
+        with loading:
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    self.hits += 1
+                    return self._models[key][0]
+
+            try:
+                engine = self.load(kind, path)
+                if self.smoke_test is not None:
+                    self.smoke_test(engine)
+                size = model_size(kind, path)
+            except Exception:
+                with self._lock:
+                    self.failures += 1
+                    self._loading.pop(key, None)  # Bad names must not pile up; a retry gets a fresh lock
+                raise
+
+            with self._lock:
+                self._models[key] = (engine, size, label)
+                self._bytes += size
+                self.loads += 1
+                self._evict_locked(keep=key)
+                self._loading.pop(key, None)
+            return engine
+
+    def _evict_locked(self, keep):
+        # Batches already scoring hold their own reference, so eviction never interrupts them
+        while len(self._models) > 1 and (len(self._models) > self.max_models or self._bytes > self.max_bytes):
+            key = next(iter(self._models))
+            if key == keep:
+                break
+            _, size, _ = self._models.pop(key)
+            self._bytes -= size
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'loaded': [{'model': label, 'bytes': size} for _, size, label in self._models.values()],
+                'bytes': self._bytes,
+                'max_models': self.max_models,
+                'max_bytes': self.max_bytes,
+                'loads': self.loads,
+                'hits': self.hits,
+                'evictions': self.evictions,
+                'failures': self.failures
+            }
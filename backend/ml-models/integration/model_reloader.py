@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Zero-downtime model hot reload for the resident TalentSol XGBoost wrapper
+A watcher thread polls the model source by stat signature: the joblib pickle,
+a portable bundle, or a versions/{model-name} directory as laid out by
+mlVersioningService (the newest version wins). A change that is still there
+on the next poll (so half-copied files are left alone) is loaded in the
+background and smoke-tested; only then is the live engine reference swapped.
+Batches already scoring keep the engine they started with, and the new
+fingerprint retires every prediction cached under the old one.
+"""
+import os
+import re
+import sys
+import json
+import time
+import threading
+from pathlib import Path
+
+from prediction_cache import file_fingerprint
+
+def version_key(name):
+    """Sort key for version directory names: 1.10.0 after 1.9.2, numbers before text"""
+    return [(0, int(part), '') if part.isdigit() else (1, 0, part) for part in re.split(r'[.\-+]', name)]
+
+def resolve_model(location):
+    """(kind, path) for a joblib pickle, a bundle directory, or a versions/{model-name} directory"""
+    path = Path(location)
+    if path.is_file():
+        return 'pickle', path
+    if not path.is_dir():
+        raise FileNotFoundError(f"Model not found: {path}")
+
+    from portable_model import MANIFEST_NAME
+    if (path / MANIFEST_NAME).is_file():
+        return 'bundle', path
+
+    # A version directory holds the stored pickle (and maybe its --mmap copy)
+    pickles = [child for child in path.glob('*.joblib') if not child.name.endswith('.mmap.joblib')]
+    if len(pickles) == 1:
+        return 'pickle', pickles[0]
+    if pickles:
+        raise ValueError(f"More than one model file in {path}")
+
+    versions = [child for child in path.iterdir() if child.is_dir() and not child.name.startswith('.')]
+    if not versions:
+        raise FileNotFoundError(f"No model file, bundle or version directory in {path}")
+    return resolve_model(max(versions, key=lambda child: version_key(child.name)))
+
+def model_file(kind, path):
+    """File whose bytes identify a resolved model (a bundle's manifest is written last)"""
+    if kind == 'bundle':
+        from portable_model import MANIFEST_NAME
+        return Path(path) / MANIFEST_NAME
+    return Path(path)
+
+def model_signature(location):
+    """Cheap change detector: the resolved model plus size, mtime and inode of its file"""
+    kind, path = resolve_model(location)
+    stat = os.stat(model_file(kind, path))
+    return (kind, str(path), stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+class ModelReloader:
+    """Live scoring engine for a model location, swapped atomically when the source changes"""
+
+    def __init__(self, location, load, smoke_test=None, on_swap=None):
+        # load(kind, path) -> engine; smoke_test(engine) raises if the engine can't score;
+        # on_swap() runs once the new engine is live, before its fingerprint is published
+        self.location = location
+        self.load = load
+        self.smoke_test = smoke_test
+        self.on_swap = on_swap
+
+        self._lock = threading.Lock()  # One check (and load) at a time
+        self._stop = threading.Event()
+        self._thread = None
+        self._candidate = None  # Changed signature seen on the previous poll
+        self._rejected = None   # Signature whose load or smoke test failed
+        self.reloads = 0
+        self.failures = 0
+        self.last_error = None
+
+        signature = model_signature(location)
+        self.engine, fingerprint = self._load(signature)
+        self._publish(signature, fingerprint)
+
+    def _load(self, signature):
+        kind, path = signature[0], Path(signature[1])
+        # Hashed before loading: a file replaced mid-load shows up as a new signature
+        fingerprint = file_fingerprint(model_file(kind, path))
+        engine = self.load(kind, path)
+        if self.smoke_test is not None:
+            self.smoke_test(engine)
+        return engine, fingerprint
+
+    def _publish(self, signature, fingerprint):
+        self._signature = signature
+        self._fingerprint = fingerprint
+        self.path = signature[1]
+        self.loaded_at = time.time()
+
+    def current(self):
+        """Fingerprint of the live model (the PredictionCache fingerprint protocol)"""
+        return self._fingerprint
+
+    def check(self):
+        """Poll the source once; load, test and swap in a changed model. True on a swap"""
+        with self._lock:
+            try:
+                signature = model_signature(self.location)
+            except (OSError, ValueError):
+                return False  # Mid-deploy: the file or version directory isn't complete yet
+
+            if signature in (self._signature, self._rejected):
+                self._candidate = None
+                return False
+            if signature != self._candidate:
+                # Wait one more poll: a file that is still being copied keeps changing
+                self._candidate = signature
+                return False
+            self._candidate = None
+
+            try:
+                engine, fingerprint = self._load(signature)
+            except Exception as e:
+                self._rejected = signature
+                self.failures += 1
+                self.last_error = str(e)
+                print(json.dumps({'warning': f"Model reload failed, keeping the current model: {str(e)}"}),
+                      file=sys.stderr)
+                return False
+
+            # Rebinding the attribute is atomic; batches hold whichever engine they read
+            self.engine = engine
+            if self.on_swap is not None:
+                self.on_swap()
+            self._publish(signature, fingerprint)
+            self.reloads += 1
+            self.last_error = None
+            print(json.dumps({'event': 'model_reloaded', 'model_path': self.path,
+                              'fingerprint': fingerprint[:16]}), file=sys.stderr)
+            return True
+
+    def start(self, interval=5.0):
+        """Poll every interval seconds on a daemon thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, args=(interval,),
+                                            name='model-reloader', daemon=True)
+            self._thread.start()
+        return self
+
+    def _watch(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.check()
+            except Exception as e:
+                # The watcher must outlive a failed swap hook; the old model keeps serving
+                self.failures += 1
+                self.last_error = str(e)
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'fingerprint': self._fingerprint[:16],
+            'loaded_at': self.loaded_at,
+            'watching': self._thread is not None,
+            'reloads': self.reloads,
+            'failures': self.failures,
+            'last_error': self.last_error
+        }
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Portable, version-independent export of the TalentSol XGBoost pipeline
+The joblib pickle ties loading to scikit-learn 1.6.1 (_RemainderColsList,
+HashingVectorizer and OneHotEncoder internals). A bundle stores only what
+inference needs, as plain data:
+
+  manifest.json        column mapping, HashingVectorizer parameters,
+                       OneHotEncoder category lists, prediction settings
+  inverse_scale.npy    1 / StandardScaler.scale_ (uncompressed, mmap-able)
+  booster.ubj          the XGBoost model in its native UBJ (or JSON) format
+  trees/*.npy          the same trees compiled for the NumPy evaluator
+
+Loading never imports scikit-learn: the stateless hashing vectorizers are
+replayed from their parameters by text_hashing.py, one-hot encoding is a
+lookup and the arrays are memory-mapped read-only. Only the booster engine
+imports xgboost; the NumPy engine needs NumPy and SciPy alone.
+
+Usage:
+  python portable_model.py --export DIR [--booster-format ubj|json]
+  python portable_model.py --check DIR [--rows N] [--engine booster|numpy]
+"""
+import os
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from booster_engine import BoosterEngine, one_hot_lookup
+from tree_ensemble import CompiledEnsemble, CHECK_TOLERANCE
+from prediction_cache import file_fingerprint
+from text_hashing import HashingTextVectorizer
+from stage_timing import stage
+
+BUNDLE_FORMAT = 1
+
+MANIFEST_NAME = 'manifest.json'
+
+# HashingVectorizer parameters that are plain data (callables can't be exported)
+HASHING_PARAMS = ('input', 'encoding', 'decode_error', 'strip_accents', 'lowercase', 'stop_words',
+                  'token_pattern', 'ngram_range', 'analyzer', 'n_features', 'binary', 'norm',
+                  'alternate_sign', 'dtype')
+
+def export_hashing_params(vectorizer):
+    """JSON-safe constructor arguments for a HashingVectorizer"""
+    params = vectorizer.get_params()
+    for name in ('preprocessor', 'tokenizer'):
+        if params.get(name) is not None:
+            raise ValueError(f"HashingVectorizer uses a custom {name}; it can't be exported as data")
+    if callable(params['analyzer']):
+        raise ValueError("HashingVectorizer uses a custom analyzer; it can't be exported as data")
+
+    if params['analyzer'] != 'word' or params['input'] != 'content':
+        raise ValueError("Only analyzer='word' with input='content' can be exported")
+
+    exported = {name: params[name] for name in HASHING_PARAMS if name in params}
+    exported['ngram_range'] = list(exported['ngram_range'])
+    exported['dtype'] = np.dtype(exported['dtype']).name
+    # Resolve named lists such as 'english' so loading doesn't need sklearn's copy
+    stop_words = vectorizer.get_stop_words()
+    exported['stop_words'] = sorted(stop_words) if stop_words else None
+    return exported
+
+def export_bundle(pipeline, directory, booster_format='ubj', source=None):
+    """Write pipeline as a portable bundle; returns the manifest"""
+    if booster_format not in ('ubj', 'json'):
+        raise ValueError(f"Unsupported booster format {booster_format}; use ubj or json")
+
+    import sklearn
+    import xgboost
+
+    engine = BoosterEngine(pipeline)  # Validates the pipeline shape the bundle can describe
+    directory = Path(directory)
+    (directory / 'trees').mkdir(parents=True, exist_ok=True)
+
+    branches = []
+    for name, transformer, columns in engine.branches:
+        if isinstance(columns, str):
+            branches.append({'name': name, 'kind': 'hashing', 'column': columns,
+                             'params': export_hashing_params(transformer)})
+        else:
+            branches.append({'name': name, 'kind': 'one_hot', 'columns': list(columns),
+                             'categories': [known.tolist() for known in transformer.categories_]})
+
+    if engine.inverse_scale is not None:
+        np.save(directory / 'inverse_scale.npy', np.ascontiguousarray(engine.inverse_scale, dtype=np.float64))
+
+    booster_file = f'booster.{booster_format}'
+    engine.booster.save_model(str(directory / booster_file))
+
+    ensemble = CompiledEnsemble.from_booster(engine.booster)
+    for name in CompiledEnsemble.ARRAYS:
+        np.save(directory / 'trees' / f'{name}.npy', np.ascontiguousarray(getattr(ensemble, name)))
+
+    missing = float(engine.missing)
+    manifest = {
+        'format': BUNDLE_FORMAT,
+        'source': {'file': Path(source).name, 'sha256': file_fingerprint(source)} if source else None,
+        'exported_with': {'scikit-learn': sklearn.__version__, 'xgboost': xgboost.__version__},
+        'classes': np.asarray(pipeline.classes_).tolist(),
+        'branches': branches,
+        'inverse_scale': 'inverse_scale.npy' if engine.inverse_scale is not None else None,
+        'booster': booster_file,
+        'iteration_range': list(engine.iteration_range),
+        'missing': None if np.isnan(missing) else missing,
+        'trees': {
+            'directory': 'trees',
+            'base_margin': float(ensemble.base_margin),
+            'max_depth': ensemble.max_depth,
+            'num_features': ensemble.num_features,
+            'objective': ensemble.objective
+        }
+    }
+
+    # Manifest last and atomically: a bundle without one is never mistaken for complete
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.manifest-')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.chmod(temp_path, 0o644)
+    os.replace(temp_path, directory / MANIFEST_NAME)
+    return manifest
+
+def read_manifest(directory):
+    with open(Path(directory) / MANIFEST_NAME) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != BUNDLE_FORMAT:
+        raise ValueError(f"Unsupported bundle format {manifest.get('format')}; expected {BUNDLE_FORMAT}")
+    return manifest
+
+def load_ensemble(directory, manifest, mmap=True):
+    """CompiledEnsemble over the bundle's tree arrays, memory-mapped read-only by default"""
+    trees = manifest['trees']
+    folder = Path(directory) / trees['directory']
+    arrays = {
+        name: np.load(folder / f'{name}.npy', mmap_mode='r' if mmap else None, allow_pickle=False)
+        for name in CompiledEnsemble.ARRAYS
+    }
+    return CompiledEnsemble(**arrays, base_margin=trees['base_margin'], max_depth=trees['max_depth'],
+                            num_features=trees['num_features'], objective=trees['objective'])
+
+class PortableEngine(BoosterEngine):
+    """BoosterEngine rebuilt from a bundle directory instead of an unpickled Pipeline"""
+
+    def __init__(self, directory, column_caches=None, engine='booster', mmap=True):
+        # BoosterEngine.__init__ decomposes a Pipeline; here the parts come from the manifest
+        self.directory = Path(directory)
+        self.manifest = read_manifest(self.directory)
+        self.column_caches = column_caches or {}
+        self.pipeline = None
+        self.middle_steps = []
+
+        self.branches = []
+        self.one_hot = {}
+        for branch in self.manifest['branches']:
+            if branch['kind'] == 'hashing':
+                self.branches.append((branch['name'], HashingTextVectorizer(branch['params']), branch['column']))
+            elif branch['kind'] == 'one_hot':
+                self.branches.append((branch['name'], None, branch['columns']))
+                self.one_hot[branch['name']] = one_hot_lookup(branch['columns'], branch['categories'])
+            else:
+                raise ValueError(f"Unknown branch kind {branch['kind']}")
+
+        scale_file = self.manifest['inverse_scale']
+        self.inverse_scale = None
+        if scale_file:
+            self.inverse_scale = np.load(self.directory / scale_file, mmap_mode='r' if mmap else None,
+                                         allow_pickle=False)
+
+        missing = self.manifest['missing']
+        self.missing = np.nan if missing is None else missing
+        self.iteration_range = tuple(self.manifest['iteration_range'])
+        self.classes = np.asarray(self.manifest['classes'])
+
+        # The NumPy engine never imports xgboost; the booster engine loads the native model
+        self.engine = engine
+        self.booster = None
+        self.ensemble = None
+        if engine == 'numpy':
+            self.ensemble = load_ensemble(self.directory, self.manifest, mmap=mmap)
+        else:
+            import xgboost
+            self.booster = xgboost.Booster(model_file=str(self.directory / self.manifest['booster']))
+
+    @property
+    def classes_(self):
+        return self.classes
+
+    @property
+    def steps(self):
+        return []
+
+    def predict_features(self, features, iteration_range=None):
+        if self.ensemble is None:
+            return super().predict_features(features, iteration_range)
+        with stage('trees'):
+            return self.ensemble.predict(features, iteration_range or self.iteration_range, self.missing)
+
+def check_bundle(pipeline, directory, inputs, engine='booster'):
+    """Compare a bundle's predictions with pipeline.predict_proba; returns a report dict"""
+    import pandas as pd
+
+    portable = PortableEngine(directory, engine=engine)
+    expected = pipeline.predict_proba(pd.DataFrame(inputs))[:, 1].astype(np.float64)
+    actual = np.asarray(portable.predict_rows(inputs), dtype=np.float64)
+    difference = np.abs(expected - actual)
+    return {
+        'rows': len(inputs),
+        'engine': engine,
+        'max_abs_diff': float(difference.max()) if len(difference) else 0.0,
+        'tolerance': CHECK_TOLERANCE,
+        'equivalent': bool(len(difference) == 0 or difference.max() <= CHECK_TOLERANCE)
+    }
+
+def main():
+    import argparse
+    import time
+    from xgboost_predict_wrapper import load_model, MODEL_PATH
+    from sample_corpus import synthetic_inputs, model_categories
+
+    parser = argparse.ArgumentParser(description='Export or check a portable model bundle')
+    parser.add_argument('--export', metavar='DIR', help='Write the pipeline as a bundle into DIR')
+    parser.add_argument('--booster-format', choices=['ubj', 'json'], default='ubj',
+                        help='Native format for the booster file (default ubj)')
+    parser.add_argument('--check', metavar='DIR', help='Compare a bundle with pipeline.predict_proba')
+    parser.add_argument('--engine', choices=['booster', 'numpy'], default='booster',
+                        help='Engine used by --check')
+    parser.add_argument('--rows', type=int, default=2000, help='Rows in the check corpus (default 2000)')
+    args = parser.parse_args()
+
+    if not args.export and not args.check:
+        parser.error('nothing to do: pass --export DIR and/or --check DIR')
+
+    try:
+        pipeline = load_model()
+        report = {}
+        if args.export:
+            manifest = export_bundle(pipeline, args.export, args.booster_format, source=MODEL_PATH)
+            report['exported'] = {'directory': args.export, 'booster': manifest['booster']}
+
+        if args.check:
+            started = time.perf_counter()
+            PortableEngine(args.check, engine=args.engine)
+            report['load_seconds'] = time.perf_counter() - started
+
+            job_roles, ethnicities = model_categories(pipeline)
+            inputs = synthetic_inputs(args.rows, distinct_jobs=max(1, args.rows // 20),
+                                      job_roles=job_roles, ethnicities=ethnicities)
+            report['check'] = check_bundle(pipeline, args.check, inputs, engine=args.engine)
+
+        print(json.dumps(report, indent=2))
+        if args.check and not report['check']['equivalent']:
+            sys.exit(1)
+    except Exception as e:
+        print(json.dumps({'error': str(e)}), file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Content-addressed prediction cache for the TalentSol XGBoost wrapper
+The pipeline is deterministic on its four input columns, so a result can be
+reused whenever the same (normalized) inputs are scored by the same model file.
+Keys are SHA-256 hashes of the model fingerprint plus the normalized row.
+"""
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# Columns that only reach the model through HashingVectorizer(lowercase=True) with the
+# default \b\w\w+\b token pattern: case and whitespace runs cannot change their features
+HASHED_TEXT_COLUMNS = ('Job Description', 'Resume')
+
+# Rough per-entry bookkeeping overhead (OrderedDict node, tuple, floats)
+ENTRY_OVERHEAD_BYTES = 200
+
+def file_fingerprint(path):
+    """SHA-256 of a model file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def normalize_text(value):
+    """Lowercase and collapse whitespace (invisible to the hashing vectorizers)"""
+    return ' '.join(value.lower().split())
+
+def cache_key(row, fingerprint):
+    """Content address of one validated input row under one model fingerprint"""
+    normalized = [
+        [column, normalize_text(value) if column in HASHED_TEXT_COLUMNS else value]
+        for column, value in sorted(row.items())
+    ]
+    payload = json.dumps([fingerprint, normalized], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class PredictionCache:
+    """Thread-safe LRU + TTL cache bounded by entry count and approximate bytes"""
+
+    def __init__(self, max_entries=10000, max_bytes=64 * 1024 * 1024, ttl_seconds=3600.0, fingerprint=None):
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self.ttl = float(ttl_seconds) if ttl_seconds else None
+        self.fingerprint = fingerprint  # Anything with current() (ModelReloader); None for a fixed model
+
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._active_fingerprint = fingerprint.current() if fingerprint else ''
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def model_fingerprint(self):
+        """Fingerprint to key new entries with; clears the cache when the model file changed"""
+        if self.fingerprint is None:
+            return self._active_fingerprint
+
+        current = self.fingerprint.current()
+        with self._lock:
+            if current != self._active_fingerprint:
+                self._active_fingerprint = current
+                self._clear_locked()
+                self.invalidations += 1
+            return current
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at, size = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                self._remove_locked(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        size = len(key) + len(json.dumps(value)) + ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return
+
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            if key in self._entries:
+                self._remove_locked(key)
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove_locked(oldest)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / lookups) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'model_fingerprint': self._active_fingerprint[:16]
+            }
+
+    def _remove_locked(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def _clear_locked(self):
+        self._entries.clear()
+        self._bytes = 0
+
+class CachedScheduler:
+    """Answers cached rows immediately and forwards only misses to the inner scheduler"""
+
+    def __init__(self, scheduler, cache, row_key):
+        # row_key(input, fingerprint) -> cache key, or None for rows that can't be cached
+        self.scheduler = scheduler
+        self.cache = cache
+        self.row_key = row_key
+
+    def _key(self, item, fingerprint):
+        try:
+            return self.row_key(item, fingerprint)
+        except Exception:
+            return None  # Invalid row: let the scorer report the error
+
+    def submit(self, inputs):
+        inputs = list(inputs)
+        fingerprint = self.cache.model_fingerprint()
+        keys = [self._key(item, fingerprint) for item in inputs]
+        results = [None] * len(inputs)
+        misses = []
+
+        for position, key in enumerate(keys):
+            cached = self.cache.get(key) if key is not None else None
+            if cached is not None:
+                results[position] = dict(cached, cached=True)
+            else:
+                misses.append(position)
+
+        future = Future()
+        if not misses:
+            future.set_result(results)
+            return future
+
+        def on_done(done):
+            try:
+                scored = done.result()
+            except Exception as e:
+                future.set_exception(e)
+                return
+
+            for position, result in zip(misses, scored):
+                results[position] = result
+                if keys[position] is not None and 'error' not in result and not result.get('degraded'):
+                    self.cache.put(keys[position], dict(result))
+            future.set_result(results)
+
+        self.scheduler.submit([inputs[position] for position in misses]).add_done_callback(on_done)
+        return future
+
+    def queue_depth(self):
+        return self.scheduler.queue_depth()
+
+    def stats(self):
+        stats = dict(self.scheduler.stats())
+        stats['cache'] = self.cache.stats()
+        return stats
+
+    def close(self):
+        self.scheduler.close()
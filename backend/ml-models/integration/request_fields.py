@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Request-level fields for the TalentSol XGBoost wrapper
+A scoring or ranking request may set "model", "debug", "deadline_ms",
+"rounds"/"tier" or "cascade" once for all of its rows instead of on each row.
+apply_request_fields copies them onto every input that has no value of its
+own; serve mode, every HTTP route and one-shot ranking all go through it, so
+each entry point honors the same fields.
+"""
+from cascade_scoring import row_cascade
+
+# Copied as groups: a row with its own "rounds" keeps it even when the request names a "tier"
+REQUEST_FIELDS = (('model',), ('debug',), ('deadline_ms',), ('rounds', 'tier'), ('cascade',))
+
+def apply_request_fields(inputs, payload):
+    """Give every input without its own value for a field group the request-level one"""
+    if 'cascade' in payload:
+        row_cascade(payload)  # A bad switch fails the whole request rather than each row
+    groups = []
+    for group in REQUEST_FIELDS:
+        fields = {field: payload[field] for field in group if payload.get(field) is not None}
+        if fields:
+            groups.append((group, fields))
+    if not groups:
+        return inputs
+
+    applied = []
+    for item in inputs:
+        if isinstance(item, dict):
+            missing = [fields for group, fields in groups if not any(field in item for field in group)]
+            if missing:
+                item = dict(item)
+                for fields in missing:
+                    item.update(fields)
+        applied.append(item)
+    return applied
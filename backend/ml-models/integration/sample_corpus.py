@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Synthetic input rows for checking and benchmarking the TalentSol XGBoost wrapper
+Generates job descriptions and resumes from a fixed recruiting vocabulary, with
+a configurable number of distinct jobs (many applicants share one posting) and
+an occasional unknown category, deterministically from a seed.
+"""
+import random
+
+VOCABULARY = (
+    'python java javascript typescript react node sql postgresql aws azure docker kubernetes '
+    'machine learning data analysis statistics excel tableau marketing sales customer support '
+    'product management agile scrum leadership communication teamwork design figma ux research '
+    'finance accounting budgeting operations logistics recruiting onboarding payroll compliance '
+    'security networking linux testing automation devops cloud api backend frontend mobile '
+    'senior junior lead manager engineer analyst intern director consultant specialist '
+    'bachelor master degree university certified years experience remote onsite hybrid '
+    'developed managed built improved delivered launched scaled mentored designed optimized'
+).split()
+
+JOB_ROLES = (
+    'Software Engineer', 'Data Scientist', 'Product Manager', 'UX Designer', 'Sales Manager',
+    'Marketing Specialist', 'Financial Analyst', 'HR Specialist', 'DevOps Engineer', 'Accountant'
+)
+
+ETHNICITIES = ('White', 'Asian', 'Black', 'Hispanic', 'Mixed', 'Other', 'Not Specified')
+
+def synthetic_text(rng, min_words, max_words):
+    return ' '.join(rng.choice(VOCABULARY) for _ in range(rng.randint(min_words, max_words)))
+
+def synthetic_inputs(count, seed=0, distinct_jobs=None, job_roles=JOB_ROLES, ethnicities=ETHNICITIES,
+                     job_words=(40, 200), resume_words=(60, 400)):
+    """count input dicts; applicants are spread over distinct_jobs postings (default: one per row)"""
+    rng = random.Random(seed)
+    jobs = [
+        (synthetic_text(rng, *job_words), rng.choice(job_roles))
+        for _ in range(distinct_jobs or count)
+    ]
+
+    inputs = []
+    for position in range(count):
+        description, role = jobs[position % len(jobs)]
+        inputs.append({
+            'Job Description': description,
+            'Resume': synthetic_text(rng, *resume_words),
+            # Roughly 1 in 20 rows carries a category the encoder never saw
+            'Job Roles': role if rng.random() > 0.05 else 'Underwater Basket Weaver',
+            'Ethnicity': rng.choice(ethnicities)
+        })
+    return inputs
+
+def model_categories(pipeline):
+    """(job roles, ethnicities) known to the pipeline's one-hot encoder, or the defaults"""
+    try:
+        for _, transformer, columns in pipeline.steps[0][1].transformers_:
+            if hasattr(transformer, 'categories_') and not isinstance(columns, str):
+                known = {column: tuple(categories.tolist())
+                         for column, categories in zip(columns, transformer.categories_)}
+                return known.get('Job Roles', JOB_ROLES), known.get('Ethnicity', ETHNICITIES)
+    except Exception:
+        pass
+    return JOB_ROLES, ETHNICITIES
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Local scoring server for the TalentSol XGBoost wrapper
+Minimal asyncio HTTP/1.1 server (keep-alive, Content-Length bodies) listening
+on a Unix domain socket or a localhost TCP port, so several Node processes can
+share one warm model instead of spawning Python per request.
+
+Endpoints:
+  POST /score         one input object (or {"input": {...}}) -> one result
+  POST /score/batch   JSON array (or {"inputs": [...]})      -> {"results": [...]}
+Score bodies may name a model version with "model": "name" or "name@version".
+  POST /rank          {"job": {...}, "candidates": [...], "top_k": K} -> {"ranked": [...]}
+  GET  /health        liveness and model information
+  GET  /stats         scheduler statistics (with per-stage latency histograms)
+Score and rank bodies may ask for a truncated ensemble with "rounds" or "tier",
+and with --cascade opt out of the pre-screen with "cascade": false.
+Score and rank bodies with "debug": true get per-stage timings back under
+"timings" (per result or ranked entry), and "deadline_ms": N bounds how long
+their rows may wait; a shed /score request is
+answered 503 (a batch reports shed rows per result); with --degrade, shed
+rows get a rule-based score marked "degraded": true instead.
+"""
+import os
+import json
+import time
+import signal
+import asyncio
+
+from candidate_ranking import parse_rank_request, submit_ranking
+from request_fields import apply_request_fields
+
+# Largest request body accepted (a 5k-resume batch is well under this)
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+DEFAULT_HOST = '127.0.0.1'
+
+STATUS_TEXT = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    411: 'Length Required',
+    413: 'Payload Too Large',
+    422: 'Unprocessable Entity',
+    500: 'Internal Server Error',
+    503: 'Service Unavailable'
+}
+
+class HttpError(Exception):
+    """Request failure that maps straight onto an HTTP status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+def parse_listen_address(address):
+    """'unix:/path.sock' -> ('unix', path); 'host:port' or 'port' -> ('tcp', host, port)"""
+    if address.startswith('unix:'):
+        return ('unix', address[len('unix:'):])
+
+    host, _, port = address.rpartition(':')
+    try:
+        return ('tcp', host or DEFAULT_HOST, int(port))
+    except ValueError:
+        raise ValueError(f"Invalid listen address: {address}")
+
+class ScoringServer:
+    """Serves score requests over HTTP using a micro-batcher or worker pool"""
+
+    def __init__(self, scheduler, info=None, max_body_bytes=MAX_BODY_BYTES, extra_stats=None, histograms=None):
+        # scheduler.submit(list of inputs) -> concurrent.futures.Future of results
+        self.scheduler = scheduler
+        self.info = info or {}
+        self.extra_stats = extra_stats
+        self.histograms = histograms  # StageHistograms for body parse and response serialization
+        self.max_body_bytes = max_body_bytes
+        self.connections = 0
+        self.requests = 0
+
+    async def read_request(self, reader):
+        """Parse one request; returns None when the client closed the connection"""
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+
+        try:
+            method, target, version = request_line.decode('latin-1').split()
+        except ValueError:
+            raise HttpError(400, 'Malformed request line')
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+        body = b''
+        if method == 'POST':
+            if 'transfer-encoding' in headers:
+                raise HttpError(411, 'Chunked bodies are not supported; send Content-Length')
+            try:
+                length = int(headers.get('content-length', '0'))
+            except ValueError:
+                raise HttpError(400, 'Invalid Content-Length')
+            if length > self.max_body_bytes:
+                raise HttpError(413, f"Body exceeds {self.max_body_bytes} bytes")
+            body = await reader.readexactly(length)
+
+        return method, target.split('?', 1)[0], body, keep_alive
+
+    async def score(self, inputs):
+        return await asyncio.wrap_future(self.scheduler.submit(inputs))
+
+    async def route(self, method, path, body):
+        """Dispatch to an endpoint; returns (status, payload)"""
+        if path == '/health':
+            if method != 'GET':
+                raise HttpError(405, 'Use GET')
+            return 200, dict(self.info, status='ok')
+
+        if path == '/stats':
+            if method != 'GET':
+                raise HttpError(405, 'Use GET')
+            stats = {
+                'scheduler': self.scheduler.stats(),
+                'server': {'connections': self.connections, 'requests': self.requests}
+            }
+            if self.extra_stats is not None:
+                stats.update(self.extra_stats())
+            return 200, stats
+
+        if path not in ('/score', '/score/batch', '/rank'):
+            raise HttpError(404, f"No endpoint at {path}")
+        if method != 'POST':
+            raise HttpError(405, 'Use POST')
+
+        started = time.perf_counter()
+        try:
+            payload = json.loads(body)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise HttpError(400, f"Invalid JSON: {str(e)}")
+        self.record('parse', started)
+
+        if path == '/rank':
+            if not isinstance(payload, dict):
+                raise HttpError(400, 'Body must be a JSON object')
+            try:
+                job, candidates, top_k = parse_rank_request(payload)
+                candidates = apply_request_fields(candidates, payload)
+            except ValueError as e:
+                raise HttpError(400, str(e))
+            ranking = submit_ranking(self.scheduler, job, candidates, top_k)
+            return 200, await asyncio.wrap_future(ranking)
+
+        if path == '/score':
+            if not isinstance(payload, dict):
+                raise HttpError(400, 'Body must be a JSON object')
+            try:
+                inputs = apply_request_fields([payload.get('input', payload)], payload)
+            except ValueError as e:
+                raise HttpError(400, str(e))
+            result = (await self.score(inputs))[0]
+            if 'shed' in result and 'error' in result:
+                return 503, result
+            return (422 if 'error' in result else 200), result
+
+        inputs = payload.get('inputs') if isinstance(payload, dict) else payload
+        if not isinstance(inputs, list):
+            raise HttpError(400, "Body must be a JSON array or {\"inputs\": [...]}")
+        if isinstance(payload, dict):
+            try:
+                inputs = apply_request_fields(inputs, payload)
+            except ValueError as e:
+                raise HttpError(400, str(e))
+        return 200, {'results': await self.score(inputs)}
+
+    def record(self, name, started):
+        if self.histograms is not None:
+            self.histograms.record({name: (time.perf_counter() - started) * 1000.0})
+
+    async def write_response(self, writer, status, payload, keep_alive):
+        started = time.perf_counter()
+        body = json.dumps(payload).encode('utf-8')
+        self.record('serialize', started)
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, 'Unknown')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            f"\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one connection until the client or an error closes it"""
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    request = await self.read_request(reader)
+                except HttpError as e:
+                    # The stream position is unknown after a framing error: close
+                    await self.write_response(writer, e.status, {'error': e.message}, False)
+                    break
+                except (asyncio.IncompleteReadError, ValueError):
+                    break
+
+                if request is None:
+                    break
+                method, path, body, keep_alive = request
+                self.requests += 1
+
+                try:
+                    status, payload = await self.route(method, path, body)
+                except HttpError as e:
+                    status, payload = e.status, {'error': e.message}
+                except Exception as e:
+                    status, payload = 500, {'error': f"Prediction failed: {str(e)}"}
+
+                await self.write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass  # Client went away, or the server is shutting down
+        finally:
+            writer.close()
+
+    async def start(self, address):
+        """Bind the listening socket described by parse_listen_address()"""
+        kind, *where = parse_listen_address(address)
+        if kind == 'unix':
+            path = where[0]
+            if os.path.exists(path):
+                os.unlink(path)  # Stale socket left by a previous run
+            return await asyncio.start_unix_server(self.handle_connection, path=path)
+
+        host, port = where
+        return await asyncio.start_server(self.handle_connection, host=host, port=port)
+
+    async def serve_forever(self, address, on_ready=None):
+        """Run until SIGTERM/SIGINT, then stop accepting and return"""
+        server = await self.start(address)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, stop.set)
+
+        if on_ready is not None:
+            on_ready(address)
+
+        async with server:
+            await stop.wait()
+
+        kind, *where = parse_listen_address(address)
+        if kind == 'unix' and os.path.exists(where[0]):
+            os.unlink(where[0])
+
+def run_server(scheduler, address, info=None, extra_stats=None, histograms=None):
+    """Serve over HTTP until signalled; prints a ready line on stdout once bound"""
+    server = ScoringServer(scheduler, info=info, extra_stats=extra_stats, histograms=histograms)
+
+    def announce(bound_address):
+        print(json.dumps(dict(info or {}, event='ready', listen=bound_address)), flush=True)
+
+    try:
+        asyncio.run(server.serve_forever(address, on_ready=announce))
+    finally:
+        scheduler.close()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Per-stage latency spans for the TalentSol XGBoost wrapper
+Scoring code marks its stages with `with stage('name'):` (row validation,
+DataFrame construction, each ColumnTransformer branch, scaling, tree
+evaluation). Spans are only timed while collect_stages() is active on the
+thread, so an untraced call pays one thread-local lookup per stage.
+A request with "debug": true gets its spans back under "timings"
+(milliseconds); the resident modes also fold every request's spans into
+per-stage latency histograms for the stats output.
+"""
+import time
+import bisect
+import threading
+from concurrent.futures import Future
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is open-ended
+BUCKET_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_active = threading.local()
+
+class stage:
+    """Context manager adding the block's wall time to the thread's collected spans"""
+    __slots__ = ('name', 'spans', 'started')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.spans = getattr(_active, 'spans', None)
+        if self.spans is not None:
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.spans is not None:
+            elapsed = (time.perf_counter() - self.started) * 1000.0
+            self.spans[self.name] = self.spans.get(self.name, 0.0) + elapsed
+        return False
+
+class collect_stages:
+    """Collect stage() spans on this thread; `as` yields the {stage: ms} dict being filled"""
+    __slots__ = ('spans', 'previous')
+
+    def __init__(self, spans=None):
+        self.spans = {} if spans is None else spans
+
+    def __enter__(self):
+        self.previous = getattr(_active, 'spans', None)
+        _active.spans = self.spans
+        return self.spans
+
+    def __exit__(self, *exc_info):
+        _active.spans = self.previous
+        return False
+
+def wants_timings(item):
+    return isinstance(item, dict) and item.get('debug') is True
+
+def traced_scorer(score_batch):
+    """Wrap score_batch so each result carries its batch's spans under "timings" """
+    def score(inputs):
+        started = time.perf_counter()
+        with collect_stages() as spans:
+            results = score_batch(inputs)
+        spans['batch'] = (time.perf_counter() - started) * 1000.0
+        for result in results:
+            result['timings'] = spans  # Shared per batch; StageRecorder copies before handing out
+        return results
+    return score
+
+def percentile_bound(buckets, count, fraction):
+    """Upper bound (ms) of the bucket holding the given fraction of samples"""
+    target = fraction * count
+    seen = 0
+    for bound, samples in zip(BUCKET_BOUNDS_MS + (None,), buckets):
+        seen += samples
+        if seen >= target:
+            return bound
+    return None
+
+class StageHistograms:
+    """Per-stage latency histograms: count, mean, max and bucketed percentiles"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}  # stage -> [count, total ms, max ms, bucket counts]
+
+    def record(self, spans):
+        with self._lock:
+            for name, elapsed in spans.items():
+                entry = self._stages.get(name)
+                if entry is None:
+                    entry = self._stages[name] = [0, 0.0, 0.0, [0] * (len(BUCKET_BOUNDS_MS) + 1)]
+                entry[0] += 1
+                entry[1] += elapsed
+                entry[2] = max(entry[2], elapsed)
+                entry[3][bisect.bisect_left(BUCKET_BOUNDS_MS, elapsed)] += 1
+
+    def stats(self):
+        with self._lock:
+            stages = {}
+            for name, (count, total, peak, buckets) in self._stages.items():
+                stages[name] = {
+                    'count': count,
+                    'mean_ms': total / count,
+                    'max_ms': peak,
+                    # Percentiles are bucket upper bounds; None means past the last bound
+                    'p50_ms': percentile_bound(buckets, count, 0.50),
+                    'p95_ms': percentile_bound(buckets, count, 0.95),
+                    'p99_ms': percentile_bound(buckets, count, 0.99),
+                    'buckets': {f"le_{bound}": samples for bound, samples in zip(BUCKET_BOUNDS_MS, buckets)
+                                if samples},
+                }
+                if buckets[-1]:
+                    stages[name]['buckets']['inf'] = buckets[-1]
+            return stages
+
+class StageRecorder:
+    """Scheduler wrapper over a traced_scorer scheduler: records spans, returns them only to debug rows"""
+
+    def __init__(self, scheduler, histograms):
+        self.scheduler = scheduler
+        self.histograms = histograms
+
+    def submit(self, inputs):
+        inputs = list(inputs)
+        started = time.perf_counter()
+        future = Future()
+
+        def on_done(done):
+            try:
+                results = done.result()
+            except Exception as e:
+                future.set_exception(e)
+                return
+
+            elapsed = (time.perf_counter() - started) * 1000.0
+            recorded = None
+            for item, result in zip(inputs, results):
+                spans = result.pop('timings', None)
+                if spans is None:
+                    continue
+                if recorded is None:
+                    # Time between submit and the batch starting: micro-batch wait or pool queue
+                    recorded = dict(spans, request=elapsed, queue_wait=max(0.0, elapsed - spans['batch']))
+                if wants_timings(item):
+                    result['timings'] = dict(recorded)
+            if recorded is not None:
+                self.histograms.record(recorded)
+            future.set_result(results)
+
+        self.scheduler.submit(inputs).add_done_callback(on_done)
+        return future
+
+    def queue_depth(self):
+        return self.scheduler.queue_depth()
+
+    def stats(self):
+        stats = dict(self.scheduler.stats())
+        stats['stages'] = self.histograms.stats()
+        return stats
+
+    def close(self):
+        self.scheduler.close()
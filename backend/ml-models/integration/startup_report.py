@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Cold-start profiling for the TalentSol prediction scripts (--startup-report)
+Wraps builtins.__import__ to time every import that loads new modules,
+keeping cumulative and self time per module (like python -X importtime, but
+summarized), and records named phases such as "model_loaded". The summary is
+printed to stderr as one JSON line so stdout stays a clean protocol stream.
+"""
+import sys
+import json
+import time
+import builtins
+import importlib.util
+
+class ImportProfiler:
+    """Per-module import timing plus startup phase marks, all in milliseconds"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.modules = {}  # module -> [cumulative ms, self ms, loads]
+        self.phases = []   # (phase, ms since start)
+        self._stack = []   # child time accumulated under each in-flight import
+        self._original = None
+
+    def install(self):
+        if self._original is None:
+            self._original = builtins.__import__
+            builtins.__import__ = self._import
+        return self
+
+    def uninstall(self):
+        if self._original is not None:
+            builtins.__import__ = self._original
+            self._original = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        loaded_before = len(sys.modules)
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000.0
+            children = self._stack.pop()
+            # Imports satisfied from sys.modules stay in the caller's self time
+            if len(sys.modules) != loaded_before:
+                record = self.modules.setdefault(self._module_name(name, globals, level), [0.0, 0.0, 0])
+                record[0] += elapsed
+                record[1] += elapsed - children
+                record[2] += 1
+                if self._stack:
+                    self._stack[-1] += elapsed
+
+    @staticmethod
+    def _module_name(name, globals, level):
+        if level == 0:
+            return name
+        try:
+            return importlib.util.resolve_name('.' * level + name, (globals or {}).get('__package__'))
+        except (ImportError, ValueError):
+            return name
+
+    def mark(self, phase):
+        """Record that a startup phase finished now"""
+        self.phases.append((phase, (time.perf_counter() - self.started) * 1000.0))
+
+    def report(self, top=25):
+        """Summary dict: phases, total import time and the slowest modules"""
+        # Top-level packages: their cumulative time includes every submodule they pulled in
+        packages = {}
+        for module, (cumulative, own, _) in self.modules.items():
+            package = module.split('.')[0]
+            packages[package] = packages.get(package, 0.0) + own
+
+        slowest = sorted(self.modules.items(), key=lambda item: item[1][0], reverse=True)[:top]
+        return {
+            'event': 'startup_report',
+            'elapsed_ms': (time.perf_counter() - self.started) * 1000.0,
+            'import_ms': sum(own for _, own, _ in self.modules.values()),
+            'modules_loaded': len(self.modules),
+            'phases': [{'phase': phase, 'at_ms': at} for phase, at in self.phases],
+            'by_package_ms': dict(sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]),
+            'slowest_imports': [
+                {'module': module, 'cumulative_ms': cumulative, 'self_ms': own}
+                for module, (cumulative, own, _) in slowest
+            ]
+        }
+
+    def emit(self, stream=None):
+        """Print the report as one JSON line (stderr by default)"""
+        print(json.dumps(self.report()), file=stream or sys.stderr, flush=True)
+
+def start_if_requested(argv):
+    """Install a profiler when --startup-report is on the command line, before any heavy import"""
+    if '--startup-report' not in argv:
+        return None
+    return ImportProfiler().install()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tests for admission control and load shedding, against a scheduler whose
+futures the test resolves by hand
+
+Run from backend/ml-models/integration:
+  python -m pytest -q test_admission_control.py
+"""
+import time
+import threading
+from concurrent.futures import Future
+
+from admission_control import (AdmissionControl, expire_overdue, DEADLINE_FIELD, SHED_QUEUE_FULL,
+                               SHED_DEADLINE, SHED_EXPIRED)
+
+ROW = {'Job Description': 'python engineer', 'Resume': 'python developer'}
+
+class ManualScheduler:
+    """Scheduler stand-in: each submit returns a Future the test completes"""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, inputs):
+        future = Future()
+        self.submitted.append((inputs, future))
+        return future
+
+    def answer(self, index=-1, probability=0.5):
+        inputs, future = self.submitted[index]
+        future.set_result([{'probability': probability} for _ in inputs])
+
+    def queue_depth(self):
+        return len(self.submitted)
+
+    def stats(self):
+        return {}
+
+    def close(self):
+        pass
+
+class CountingFallback:
+    """Degraded scorer that records how often it ran"""
+
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, inputs, reason):
+        with self.lock:
+            self.calls += 1
+        return [{'probability': 0.1, 'degraded': True, 'shed': reason} for _ in inputs]
+
+def test_admits_and_answers_from_the_model():
+    scheduler = ManualScheduler()
+    admission = AdmissionControl(scheduler)
+
+    future = admission.submit([ROW, ROW])
+    assert not future.done()
+    scheduler.answer(probability=0.7)
+
+    assert future.result(timeout=1) == [{'probability': 0.7}, {'probability': 0.7}]
+    assert admission.stats()['admission']['queued_rows'] == 0
+
+def test_sheds_a_submission_that_would_overflow_the_queue():
+    scheduler = ManualScheduler()
+    admission = AdmissionControl(scheduler, max_queue_rows=3)
+
+    admission.submit([ROW, ROW])
+    shed = admission.submit([ROW, ROW]).result(timeout=1)
+
+    assert [result['shed'] for result in shed] == [SHED_QUEUE_FULL, SHED_QUEUE_FULL]
+    assert len(scheduler.submitted) == 1
+    assert admission.stats()['admission']['shed_rows'][SHED_QUEUE_FULL] == 2
+
+def test_rejects_invalid_deadlines_without_scoring_them():
+    scheduler = ManualScheduler()
+    admission = AdmissionControl(scheduler)
+
+    future = admission.submit([dict(ROW, deadline_ms=-5), ROW])
+    scheduler.answer()
+
+    results = future.result(timeout=1)
+    assert 'deadline_ms' in results[0]['error']
+    assert results[1] == {'probability': 0.5}
+    assert scheduler.submitted[0][0] == [ROW]
+
+def test_stamps_admitted_rows_with_their_deadline():
+    scheduler = ManualScheduler()
+    admission = AdmissionControl(scheduler, default_deadline_ms=1000)
+
+    before = time.monotonic()
+    admission.submit([ROW])
+    deadline = scheduler.submitted[0][0][0][DEADLINE_FIELD]
+
+    assert before + 1.0 <= deadline <= time.monotonic() + 1.0
+
+def test_sheds_rows_whose_budget_is_shorter_than_the_estimated_wait():
+    scheduler = ManualScheduler()
+    admission = AdmissionControl(scheduler)
+    admission._row_seconds = 0.5  # As if measured: each queued row takes 500 ms to drain
+
+    results = admission.submit([dict(ROW, deadline_ms=100)]).result(timeout=1)
+
+    assert results[0]['shed'] == SHED_DEADLINE
+    assert scheduler.submitted == []
+
+def test_fallback_answers_when_the_deadline_passes_first():
+    scheduler = ManualScheduler()
+    fallback = CountingFallback()
+    admission = AdmissionControl(scheduler, fallback=fallback)
+
+    future = admission.submit([dict(ROW, deadline_ms=20)])
+    results = future.result(timeout=1)
+    scheduler.answer()  # The late model answer doesn't replace the degraded one
+
+    assert results == [{'probability': 0.1, 'degraded': True, 'shed': SHED_EXPIRED}]
+    assert future.result() is results
+    assert admission.stats()['admission']['degraded_rows'] == 1
+
+def test_model_answer_cancels_the_deadline_fallback():
+    scheduler = ManualScheduler()
+    fallback = CountingFallback()
+    admission = AdmissionControl(scheduler, fallback=fallback)
+
+    future = admission.submit([dict(ROW, deadline_ms=30)])
+    scheduler.answer(probability=0.9)
+    time.sleep(0.1)
+
+    assert future.result(timeout=1) == [{'probability': 0.9}]
+    assert fallback.calls == 0
+
+def test_expire_overdue_sheds_only_rows_past_their_deadline():
+    scored = []
+
+    def score_batch(inputs):
+        scored.extend(inputs)
+        return [{'probability': 0.5} for _ in inputs]
+
+    now = time.monotonic()
+    overdue = dict(ROW, **{DEADLINE_FIELD: now - 1.0})
+    live = dict(ROW, **{DEADLINE_FIELD: now + 60.0})
+    results = expire_overdue(score_batch)([overdue, live, ROW])
+
+    assert results[0]['shed'] == SHED_EXPIRED
+    assert results[1:] == [{'probability': 0.5}, {'probability': 0.5}]
+    assert scored == [live, ROW]
+
+def test_expire_overdue_uses_the_fallback_for_overdue_rows():
+    overdue = dict(ROW, **{DEADLINE_FIELD: time.monotonic() - 1.0})
+    results = expire_overdue(lambda inputs: [], CountingFallback())([overdue])
+
+    assert results == [{'probability': 0.1, 'degraded': True, 'shed': SHED_EXPIRED}]
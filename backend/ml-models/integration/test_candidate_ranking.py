@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for top-K candidate ranking, in-process and through a scheduler, with
+fake scorers so the expected order is known
+
+Run from backend/ml-models/integration:
+  python -m pytest -q test_candidate_ranking.py
+"""
+from concurrent.futures import Future
+
+import pytest
+
+from candidate_ranking import rank_candidates, submit_ranking, parse_rank_request, candidate_input
+
+JOB = {'Job Description': 'python engineer', 'Job Roles': 'Software Engineer'}
+
+def candidates(scores):
+    return [{'id': f"c{index}", 'Resume': str(score)} for index, score in enumerate(scores)]
+
+def score_resumes(inputs):
+    """Probability is the number in the Resume; 'bad' fails, 'rule:x' is a degraded score of x"""
+    results = []
+    for item in inputs:
+        resume = item['Resume']
+        if resume == 'bad':
+            results.append({'error': 'Prediction failed'})
+        elif resume.startswith('rule:'):
+            results.append({'probability': float(resume[5:]), 'degraded': True, 'shed': 'expired'})
+        else:
+            results.append({'probability': float(resume), 'cascade': 'full'})
+    return results
+
+class ImmediateScheduler:
+    """Scheduler stand-in scoring each submission synchronously"""
+
+    def __init__(self):
+        self.submissions = 0
+
+    def submit(self, inputs):
+        self.submissions += 1
+        future = Future()
+        future.set_result(score_resumes(inputs))
+        return future
+
+def ids(entries):
+    return [entry['id'] for entry in entries]
+
+def test_candidate_input_takes_the_job_fields_over_the_candidate():
+    row = candidate_input(JOB, {'id': 'c0', 'Resume': 'python', 'Job Roles': 'Accountant'})
+    assert row == {'Resume': 'python', 'Job Description': 'python engineer', 'Job Roles': 'Software Engineer'}
+
+def test_keeps_the_top_k_in_order_with_earlier_candidates_winning_ties():
+    report = rank_candidates(score_resumes, JOB, candidates([0.2, 0.9, 0.5, 0.9, 0.1]), top_k=3, chunk_rows=2)
+
+    assert ids(report['ranked']) == ['c1', 'c3', 'c2']
+    assert [entry['rank'] for entry in report['ranked']] == [1, 2, 3]
+    assert report['ranked'][0] == {'rank': 1, 'index': 1, 'id': 'c1', 'probability': 0.9, 'cascade': 'full'}
+    assert report['scored'] == 5
+
+def test_ranks_degraded_scores_apart_from_model_scores():
+    report = rank_candidates(score_resumes, JOB, candidates([0.3, 'rule:0.95', 0.6, 'rule:0.4']), top_k=2)
+
+    assert ids(report['ranked']) == ['c2', 'c0']
+    assert ids(report['degraded']) == ['c1', 'c3']
+    assert all(entry['degraded'] is True and entry['shed'] == 'expired' for entry in report['degraded'])
+    assert (report['scored'], report['degraded_rows']) == (2, 2)
+
+def test_counts_failed_candidates():
+    report = rank_candidates(score_resumes, JOB, candidates([0.3, 'bad']), top_k=5)
+
+    assert ids(report['ranked']) == ['c0']
+    assert report['failed'] == 1
+    assert report['errors'] == [{'index': 1, 'id': 'c1', 'error': 'Prediction failed'}]
+
+def test_scheduler_ranking_matches_in_process_ranking():
+    pool = candidates([0.2, 'rule:0.7', 0.9, 'bad', 0.5, 0.8, 0.1])
+    scheduler = ImmediateScheduler()
+
+    report = submit_ranking(scheduler, JOB, pool, top_k=3, chunk_rows=2).result(timeout=1)
+
+    assert report == rank_candidates(score_resumes, JOB, pool, top_k=3, chunk_rows=2)
+    assert scheduler.submissions == 4
+
+def test_empty_candidate_list_ranks_nothing():
+    report = submit_ranking(ImmediateScheduler(), JOB, [], top_k=3).result(timeout=1)
+    assert (report['ranked'], report['candidates']) == ([], 0)
+
+@pytest.mark.parametrize('request_body', [
+    {'candidates': []},
+    {'job': JOB, 'candidates': {}},
+    {'job': JOB, 'candidates': [], 'top_k': 0},
+    {'job': JOB, 'candidates': [], 'top_k': True},
+])
+def test_rejects_malformed_requests(request_body):
+    with pytest.raises(ValueError):
+        parse_rank_request(request_body)
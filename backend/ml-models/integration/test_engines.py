@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Smoke test: every scoring engine agrees with the sklearn pipeline
+Scores synthetic rows with pipeline.predict_proba and with the feature-caching
+pipeline, the booster engine (--engine booster) and the compiled NumPy trees
+(--engine numpy), cold and with warm feature caches.
+
+Run from backend/ml-models/integration:
+  python -m pytest -q test_engines.py
+"""
+import pytest
+
+ROWS = 200
+
+@pytest.fixture(scope='module')
+def pipeline():
+    from xgboost_predict_wrapper import load_model
+    return load_model()
+
+@pytest.fixture(scope='module')
+def rows(pipeline):
+    from xgboost_predict_wrapper import build_row
+    from sample_corpus import synthetic_inputs, model_categories
+
+    job_roles, ethnicities = model_categories(pipeline)
+    inputs = synthetic_inputs(ROWS, distinct_jobs=10, job_roles=job_roles, ethnicities=ethnicities)
+    return [build_row(item, record=False) for item in inputs]
+
+@pytest.fixture(scope='module')
+def expected(pipeline, rows):
+    import pandas as pd
+    return pipeline.predict_proba(pd.DataFrame(rows))[:, 1]
+
+def text_caches():
+    from feature_cache import SparseRowCache
+    return {'Job Description': SparseRowCache(), 'Resume': SparseRowCache()}
+
+def assert_matches(expected, actual):
+    import numpy as np
+    from tree_ensemble import CHECK_TOLERANCE
+
+    difference = np.abs(np.asarray(expected, dtype=np.float64) - np.asarray(actual, dtype=np.float64))
+    assert difference.max() <= CHECK_TOLERANCE, f"max abs diff {difference.max()}"
+
+def test_feature_cache_matches_pipeline(pipeline, rows, expected):
+    import pandas as pd
+    from feature_cache import wrap_feature_cache
+
+    cached = wrap_feature_cache(pipeline, text_caches())
+    for _ in range(2):
+        assert_matches(expected, cached.predict_proba(pd.DataFrame(rows))[:, 1])
+
+@pytest.mark.parametrize('engine_name', ['BoosterEngine', 'CompiledTreeEngine'])
+def test_engine_matches_pipeline(pipeline, rows, expected, engine_name):
+    import booster_engine
+
+    engine = getattr(booster_engine, engine_name)(pipeline, text_caches())
+    for _ in range(2):
+        assert_matches(expected, engine.predict_rows(rows))
+
+def test_predict_batch_matches_pipeline(pipeline, rows, expected):
+    from xgboost_predict_wrapper import predict_batch
+    from booster_engine import CompiledTreeEngine
+
+    results = predict_batch(CompiledTreeEngine(pipeline), rows)
+    assert_matches(expected, [result['probability'] for result in results])
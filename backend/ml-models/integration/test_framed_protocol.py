@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for the length-prefixed framing used by --serve --framed: frames
+encoded here decode to the same requests, and broken input fails cleanly
+
+Run from backend/ml-models/integration:
+  python -m pytest -q test_framed_protocol.py
+"""
+import io
+import json
+
+import pytest
+
+from framed_protocol import (iter_frames, decode_frame, encode_frame, encode_json_frame, encode_batch_frame,
+                             FrameWriter, KIND_JSON, KIND_BATCH)
+
+INPUTS = [
+    {'Job Description': 'python engineer', 'Resume': 'python, sql', 'Job Roles': 'Software Engineer'},
+    {'Job Description': 'python engineer', 'Resume': 'résumé – ünïcode', 'Ethnicity': 'Asian'},
+    {'Job Description': 'python engineer', 'Resume': ''},
+]
+
+def decode_all(data, **options):
+    return [decode_frame(frame) for frame in iter_frames(io.BytesIO(data), **options)]
+
+def test_batch_frames_round_trip_with_their_header_fields():
+    frame = encode_batch_frame(INPUTS, id=7, model='decision-tree@1.2.0', debug=True)
+    assert decode_all(frame) == [{'id': 7, 'model': 'decision-tree@1.2.0', 'debug': True, 'inputs': INPUTS}]
+
+@pytest.mark.parametrize('inputs', [[], [{}], [{'Resume': 'only one row'}], [{'Resume': 'a'}, {'Ethnicity': 'b'}]])
+def test_batch_frames_round_trip_edge_shapes(inputs):
+    assert decode_all(encode_batch_frame(inputs))[0]['inputs'] == inputs
+
+def test_json_frames_round_trip_back_to_back():
+    requests = [{'id': 1, 'op': 'ping'}, {'id': 2, 'input': INPUTS[1]}]
+    data = b''.join(encode_json_frame(request) for request in requests) + encode_batch_frame(INPUTS, id=3)
+
+    decoded = decode_all(data)
+
+    assert decoded[:2] == requests
+    assert decoded[2]['id'] == 3
+
+def test_oversized_frame_is_skipped_and_the_next_one_still_read():
+    data = encode_json_frame({'id': 1, 'padding': 'x' * 200}) + encode_json_frame({'id': 2})
+    frames = list(iter_frames(io.BytesIO(data), max_frame_bytes=100))
+
+    assert frames[0] == (KIND_JSON, None)
+    with pytest.raises(ValueError, match='Frame exceeds'):
+        decode_frame(frames[0])
+    assert decode_frame(frames[1]) == {'id': 2}
+
+def test_truncated_input_ends_the_stream():
+    data = encode_json_frame({'id': 1}) + encode_json_frame({'id': 2})[:-3]
+    assert decode_all(data) == [{'id': 1}]
+
+@pytest.mark.parametrize('frame, message', [
+    ((KIND_JSON, b'{not json'), 'Invalid JSON'),
+    ((KIND_JSON, b'[1, 2]'), 'must be a JSON object'),
+    ((ord('X'), b'{}'), 'Unknown frame kind'),
+    ((KIND_BATCH, b'\x05\x00'), 'Malformed batch frame'),
+])
+def test_rejects_malformed_frames(frame, message):
+    with pytest.raises(ValueError, match=message):
+        decode_frame(frame)
+
+def test_rejects_batch_frames_with_trailing_bytes():
+    frame = encode_batch_frame(INPUTS)
+    padded = encode_frame(KIND_BATCH, frame[5:] + b'\x00')
+    with pytest.raises(ValueError, match='trailing bytes'):
+        decode_all(padded)
+
+def test_writer_emits_json_frames():
+    stream = io.BytesIO()
+    FrameWriter(stream)({'id': 1, 'results': [{'probability': 0.5}]})
+
+    assert decode_all(stream.getvalue()) == [{'id': 1, 'results': [{'probability': 0.5}]}]
+    assert json.loads(stream.getvalue()[5:]) == {'id': 1, 'results': [{'probability': 0.5}]}
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for the micro-batching scheduler, with a scorer the test can hold so
+submissions pile up behind it
+
+Run from backend/ml-models/integration:
+  python -m pytest -q test_micro_batcher.py
+"""
+import threading
+
+import pytest
+
+from micro_batcher import MicroBatcher, batch_size_bucket, percentile
+
+class GatedScorer:
+    """Doubles its inputs; the first call waits until release() so later submissions queue"""
+
+    def __init__(self):
+        self.batches = []
+        self.started = threading.Event()
+        self.gate = threading.Event()
+
+    def __call__(self, inputs):
+        self.batches.append(list(inputs))
+        self.started.set()
+        self.gate.wait(timeout=10)
+        return [item * 2 for item in inputs]
+
+    def release(self):
+        self.gate.set()
+
+def hold_first_batch(batcher, scorer):
+    """Submit one row and wait until the scorer is busy with it"""
+    future = batcher.submit([0])
+    assert scorer.started.wait(timeout=10)
+    return future
+
+def test_coalesces_queued_submissions_and_splits_the_results():
+    scorer = GatedScorer()
+    batcher = MicroBatcher(scorer, max_batch_size=64, max_wait_ms=0)
+    try:
+        first = hold_first_batch(batcher, scorer)
+        queued = [batcher.submit([index, index + 10]) for index in range(1, 4)]
+        scorer.release()
+
+        assert first.result(timeout=10) == [0]
+        assert [future.result(timeout=10) for future in queued] == [[2, 22], [4, 24], [6, 26]]
+        assert scorer.batches == [[0], [1, 11, 2, 12, 3, 13]]
+        assert batcher.stats()['batch_size_histogram'] == {'1': 1, '5-8': 1}
+    finally:
+        batcher.close()
+
+def test_stops_coalescing_at_the_batch_size():
+    scorer = GatedScorer()
+    batcher = MicroBatcher(scorer, max_batch_size=4, max_wait_ms=0)
+    try:
+        hold_first_batch(batcher, scorer)
+        queued = [batcher.submit([index, index]) for index in range(1, 4)]
+        scorer.release()
+
+        assert [future.result(timeout=10) for future in queued] == [[2, 2], [4, 4], [6, 6]]
+        assert [len(batch) for batch in scorer.batches] == [1, 4, 2]
+    finally:
+        batcher.close()
+
+def test_scorer_errors_fail_every_submission_in_the_batch():
+    def fail(inputs):
+        raise ValueError('Prediction failed')
+
+    batcher = MicroBatcher(fail)
+    try:
+        with pytest.raises(ValueError, match='Prediction failed'):
+            batcher.submit([1]).result(timeout=10)
+    finally:
+        batcher.close()
+
+def test_rejects_a_result_count_that_does_not_match_the_inputs():
+    batcher = MicroBatcher(lambda inputs: inputs[:-1])
+    try:
+        with pytest.raises(RuntimeError, match='1 results for 2 inputs'):
+            batcher.submit([1, 2]).result(timeout=10)
+    finally:
+        batcher.close()
+
+def test_close_scores_what_is_queued_then_refuses_more():
+    scorer = GatedScorer()
+    batcher = MicroBatcher(scorer, max_wait_ms=0)
+    hold_first_batch(batcher, scorer)
+    queued = batcher.submit([5])
+    scorer.release()
+    batcher.close()
+
+    assert queued.result(timeout=10) == [10]
+    with pytest.raises(RuntimeError, match='closed'):
+        batcher.submit([1])
+
+@pytest.mark.parametrize('size, bucket', [(1, '1'), (2, '2'), (3, '3-4'), (4, '3-4'), (5, '5-8'), (64, '33-64')])
+def test_batch_size_buckets(size, bucket):
+    assert batch_size_bucket(size) == bucket
+
+def test_percentile_uses_the_nearest_rank():
+    assert percentile([], 0.5) == 0.0
+    assert percentile([1, 2, 3, 4, 5], 0.5) == 3
+    assert percentile([1, 2, 3, 4, 5], 0.95) == 5
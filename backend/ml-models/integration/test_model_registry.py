@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for the multi-model registry over a temporary versions/ tree, with a
+stand-in loader in place of joblib
+
+Run from backend/ml-models/integration:
+  python -m pytest -q test_model_registry.py
+"""
+import pytest
+
+from model_registry import ModelRegistry
+
+def write_version(root, model, version, content=b'model'):
+    directory = root / model / version
+    directory.mkdir(parents=True)
+    (directory / 'model.joblib').write_bytes(content)
+
+@pytest.fixture
+def root(tmp_path):
+    write_version(tmp_path, 'decision-tree', '1.0.0')
+    write_version(tmp_path, 'decision-tree', '1.2.0', b'newer model')
+    write_version(tmp_path, 'broken', '1.0.0')
+    return tmp_path
+
+def load_by_name(kind, path):
+    if 'broken' in path.parts:
+        raise ValueError('Failed to load model')
+    return f"engine:{path.parent.name}"
+
+def test_bare_name_loads_the_newest_version_once(root):
+    registry = ModelRegistry(load_by_name, root=root)
+
+    assert registry.get('decision-tree') == 'engine:1.2.0'
+    assert registry.get('decision-tree@1.2.0') == 'engine:1.2.0'
+    assert registry.get('decision-tree@1.0.0') == 'engine:1.0.0'
+    assert registry.label('decision-tree') == 'decision-tree@1.2.0'
+    assert (registry.stats()['loads'], registry.stats()['hits']) == (2, 1)
+
+def test_evicts_the_least_recently_used_model(root):
+    registry = ModelRegistry(load_by_name, root=root, max_models=1)
+
+    registry.get('decision-tree@1.0.0')
+    registry.get('decision-tree@1.2.0')
+
+    assert [entry['model'] for entry in registry.stats()['loaded']] == ['decision-tree@1.2.0']
+    assert registry.stats()['evictions'] == 1
+
+def test_failed_loads_leave_nothing_behind(root):
+    registry = ModelRegistry(load_by_name, root=root)
+
+    for _ in range(3):
+        with pytest.raises(ValueError, match='Failed to load model'):
+            registry.get('broken@1.0.0')
+
+    assert registry._loading == {}
+    assert registry.stats()['failures'] == 3
+    assert registry.stats()['loaded'] == []
+
+def test_failed_smoke_test_leaves_nothing_behind(root):
+    def smoke_test(engine):
+        raise ValueError('Smoke prediction failed')
+
+    registry = ModelRegistry(load_by_name, root=root, smoke_test=smoke_test)
+
+    with pytest.raises(ValueError, match='Smoke prediction failed'):
+        registry.get('decision-tree')
+    assert registry._loading == {}
+
+@pytest.mark.parametrize('name', ['../decision-tree', 'decision-tree@', 'missing', 'decision-tree@9.9.9'])
+def test_rejects_invalid_or_unknown_names(root, name):
+    with pytest.raises(ValueError):
+        ModelRegistry(load_by_name, root=root).get(name)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-addressed prediction cache and the scheduler wrapper
+that answers cached rows without scoring them
+
+Run from backend/ml-models/integration:
+  python -m pytest -q test_prediction_cache.py
+"""
+import time
+from concurrent.futures import Future
+
+from prediction_cache import PredictionCache, CachedScheduler, cache_key
+
+ROW = {'Job Description': 'Python Engineer', 'Resume': 'python developer',
+       'Job Roles': 'Software Engineer', 'Ethnicity': 'Asian'}
+
+class Fingerprint:
+    """Stand-in for ModelReloader.current()"""
+
+    def __init__(self, value):
+        self.value = value
+
+    def current(self):
+        return self.value
+
+class RecordingScheduler:
+    """Scheduler stand-in answering every row at once with answer(row)"""
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.submitted = []
+
+    def submit(self, inputs):
+        self.submitted.append(inputs)
+        future = Future()
+        future.set_result([self.answer(item) for item in inputs])
+        return future
+
+    def queue_depth(self):
+        return 0
+
+    def stats(self):
+        return {}
+
+    def close(self):
+        pass
+
+def test_key_ignores_case_and_whitespace_in_hashed_text_only():
+    spaced = dict(ROW, **{'Job Description': '  python   ENGINEER ', 'Resume': 'Python\tDeveloper'})
+    assert cache_key(spaced, 'model') == cache_key(ROW, 'model')
+    assert cache_key(dict(ROW, Ethnicity='asian'), 'model') != cache_key(ROW, 'model')
+    assert cache_key(ROW, 'other model') != cache_key(ROW, 'model')
+
+def test_evicts_least_recently_used_entries():
+    cache = PredictionCache(max_entries=2)
+    cache.put('a', {'probability': 0.1})
+    cache.put('b', {'probability': 0.2})
+    cache.get('a')
+    cache.put('c', {'probability': 0.3})
+
+    assert cache.get('b') is None
+    assert cache.get('a') == {'probability': 0.1}
+    assert cache.stats()['evictions'] == 1
+
+def test_bounds_entries_by_bytes():
+    cache = PredictionCache(max_bytes=300)  # Room for one small entry
+    cache.put('a', {'probability': 0.1})
+    cache.put('b', {'probability': 0.2})
+    cache.put('huge', {'text': 'x' * 1000})  # Larger than the whole cache: never stored
+
+    assert cache.get('huge') is None
+    assert cache.get('a') is None
+    assert cache.get('b') == {'probability': 0.2}
+    assert cache.stats()['bytes'] <= 300
+
+def test_expires_entries_after_the_ttl():
+    cache = PredictionCache(ttl_seconds=0.01)
+    cache.put('a', {'probability': 0.1})
+    time.sleep(0.02)
+
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1
+
+def test_model_change_invalidates_every_entry():
+    fingerprint = Fingerprint('v1')
+    cache = PredictionCache(fingerprint=fingerprint)
+    cache.put(cache_key(ROW, cache.model_fingerprint()), {'probability': 0.1})
+
+    fingerprint.value = 'v2'
+    assert cache.model_fingerprint() == 'v2'
+    assert cache.stats()['entries'] == 0
+    assert cache.stats()['invalidations'] == 1
+
+def test_scheduler_forwards_only_misses():
+    scheduler = RecordingScheduler(lambda item: {'probability': 0.4})
+    cached = CachedScheduler(scheduler, PredictionCache(), cache_key)
+
+    first = cached.submit([ROW]).result(timeout=1)
+    second = cached.submit([ROW, dict(ROW, Resume='java developer')]).result(timeout=1)
+
+    assert first == [{'probability': 0.4}]
+    assert second == [{'probability': 0.4, 'cached': True}, {'probability': 0.4}]
+    assert scheduler.submitted[1] == [dict(ROW, Resume='java developer')]
+
+def test_scheduler_never_caches_errors_or_degraded_scores():
+    answers = iter([{'error': 'Prediction failed'}, {'probability': 0.1, 'degraded': True}, {'probability': 0.6}])
+    scheduler = RecordingScheduler(lambda item: next(answers))
+    cached = CachedScheduler(scheduler, PredictionCache(), cache_key)
+
+    results = [cached.submit([ROW]).result(timeout=1)[0] for _ in range(4)]
+
+    assert results[2] == {'probability': 0.6}
+    assert results[3] == {'probability': 0.6, 'cached': True}
+    assert len(scheduler.submitted) == 3
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Tests for the local HTTP scoring server, serving on a loopback port (and a
+Unix socket) in a background thread with a stand-in scheduler
+
+Run from backend/ml-models/integration:
+  python -m pytest -q test_scoring_server.py
+"""
+import json
+import socket
+import asyncio
+import threading
+import http.client
+from concurrent.futures import Future
+
+import pytest
+
+from scoring_server import ScoringServer, parse_listen_address
+
+ROW = {'Job Description': 'python engineer', 'Resume': 'python developer'}
+
+class RecordingScheduler:
+    """Answers each row at once: 'bad' rows fail, 'busy' rows are shed, the rest score 0.5"""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, inputs):
+        self.submitted.append(inputs)
+        results = []
+        for item in inputs:
+            if item.get('Resume') == 'bad':
+                results.append({'error': 'Prediction failed'})
+            elif item.get('Resume') == 'busy':
+                results.append({'error': 'Overloaded: queue full', 'shed': 'queue_full'})
+            else:
+                results.append({'probability': 0.5})
+        future = Future()
+        future.set_result(results)
+        return future
+
+    def stats(self):
+        return {'batches': len(self.submitted)}
+
+def serve(address):
+    """(scheduler, bound address, stop) for a server running on its own event loop thread"""
+    scheduler = RecordingScheduler()
+    server = ScoringServer(scheduler, info={'model': 'test'}, max_body_bytes=4096)
+    loop = asyncio.new_event_loop()
+    listening = loop.run_until_complete(server.start(address))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    async def shutdown():
+        listening.close()
+        await listening.wait_closed()
+        # Connections the clients left open end like they do when the server is stopped
+        handlers = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in handlers:
+            task.cancel()
+        await asyncio.gather(*handlers, return_exceptions=True)
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(shutdown(), loop).result(timeout=10)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    return scheduler, listening.sockets[0].getsockname(), stop
+
+@pytest.fixture
+def server():
+    scheduler, (host, port), stop = serve('127.0.0.1:0')
+    yield scheduler, port
+    stop()
+
+def call(port, method, path, body=None, connection=None):
+    """(status, JSON body) for one request, on a fresh connection unless one is passed"""
+    client = connection or http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    data = body if isinstance(body, bytes) or body is None else json.dumps(body).encode('utf-8')
+    client.request(method, path, body=data, headers={'Content-Type': 'application/json'})
+    response = client.getresponse()
+    result = response.status, json.loads(response.read())
+    if connection is None:
+        client.close()
+    return result
+
+def test_health_reports_the_server_info(server):
+    _, port = server
+    assert call(port, 'GET', '/health') == (200, {'model': 'test', 'status': 'ok'})
+
+def test_score_applies_request_level_fields(server):
+    scheduler, port = server
+    status, result = call(port, 'POST', '/score', {'input': ROW, 'model': 'decision-tree', 'deadline_ms': 250,
+                                                   'cascade': False})
+
+    assert (status, result) == (200, {'probability': 0.5})
+    assert scheduler.submitted == [[dict(ROW, model='decision-tree', deadline_ms=250, cascade=False)]]
+
+@pytest.mark.parametrize('resume, status', [('bad', 422), ('busy', 503)])
+def test_score_maps_failed_and_shed_rows_to_statuses(server, resume, status):
+    _, port = server
+    assert call(port, 'POST', '/score', dict(ROW, Resume=resume))[0] == status
+
+def test_batch_accepts_an_array_or_an_inputs_object(server):
+    scheduler, port = server
+
+    assert call(port, 'POST', '/score/batch', [ROW, ROW]) == (200, {'results': [{'probability': 0.5}] * 2})
+    status, body = call(port, 'POST', '/score/batch', {'inputs': [ROW, dict(ROW, Resume='bad')], 'debug': True})
+
+    assert status == 200
+    assert body['results'][1] == {'error': 'Prediction failed'}
+    assert all(item['debug'] is True for item in scheduler.submitted[1])
+
+def test_rank_returns_the_top_candidates(server):
+    scheduler, port = server
+    status, body = call(port, 'POST', '/rank', {
+        'job': {'Job Description': 'python engineer', 'Job Roles': 'Software Engineer'},
+        'candidates': [{'id': 'a', 'Resume': 'python'}, {'id': 'b', 'Resume': 'bad'}],
+        'top_k': 1,
+        'deadline_ms': 500
+    })
+
+    assert status == 200
+    assert [entry['id'] for entry in body['ranked']] == ['a']
+    assert body['failed'] == 1
+    assert all(item['deadline_ms'] == 500 for item in scheduler.submitted[0])
+
+@pytest.mark.parametrize('method, path, body, status', [
+    ('POST', '/score', {'input': ROW, 'cascade': 'yes'}, 400),
+    ('POST', '/rank', {'candidates': []}, 400),
+    ('POST', '/score/batch', {'rows': []}, 400),
+    ('POST', '/score', b'{not json', 400),
+    ('GET', '/score', None, 405),
+    ('POST', '/health', {}, 405),
+    ('POST', '/predict', {}, 404),
+])
+def test_rejects_bad_requests_without_scoring(server, method, path, body, status):
+    scheduler, port = server
+    assert call(port, method, path, body)[0] == status
+    assert scheduler.submitted == []
+
+def test_rejects_a_body_over_the_limit(server):
+    scheduler, port = server
+    status, body = call(port, 'POST', '/score/batch', [dict(ROW, Resume='x' * 5000)])
+
+    assert status == 413
+    assert scheduler.submitted == []
+
+def test_keeps_the_connection_alive_between_requests(server):
+    _, port = server
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    try:
+        assert call(port, 'POST', '/score', ROW, connection)[0] == 200
+        status, stats = call(port, 'GET', '/stats', None, connection)
+    finally:
+        connection.close()
+
+    assert status == 200
+    assert stats['server'] == {'connections': 1, 'requests': 2}
+    assert stats['scheduler'] == {'batches': 1}
+
+def test_serves_on_a_unix_socket(tmp_path):
+    path = str(tmp_path / 'scorer.sock')
+    _, _, stop = serve(f"unix:{path}")
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(10)
+            client.connect(path)
+            client.sendall(b'GET /health HTTP/1.1\r\nConnection: close\r\n\r\n')
+            response = b''
+            while chunk := client.recv(65536):
+                response += chunk
+    finally:
+        stop()
+
+    head, _, body = response.partition(b'\r\n\r\n')
+    assert head.startswith(b'HTTP/1.1 200 OK')
+    assert json.loads(body) == {'model': 'test', 'status': 'ok'}
+
+@pytest.mark.parametrize('address, parsed', [
+    ('unix:/tmp/scorer.sock', ('unix', '/tmp/scorer.sock')),
+    ('8080', ('tcp', '127.0.0.1', 8080)),
+    ('0.0.0.0:9000', ('tcp', '0.0.0.0', 9000)),
+])
+def test_parses_listen_addresses(address, parsed):
+    assert parse_listen_address(address) == parsed
+
+def test_rejects_an_invalid_listen_address():
+    with pytest.raises(ValueError, match='Invalid listen address'):
+        parse_listen_address('localhost:http')
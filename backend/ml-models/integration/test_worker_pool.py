@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for the pre-fork worker pool: scoring through forked workers, recycling
+them under load, and replacing a worker that dies
+
+Run from backend/ml-models/integration:
+  python -m pytest -q test_worker_pool.py
+"""
+import os
+import time
+import signal
+import threading
+
+import pytest
+
+import worker_pool
+from worker_pool import PreforkPool
+
+def double(inputs):
+    """Stand-in scorer; 'hang' keeps the worker busy until it is killed"""
+    if 'hang' in inputs:
+        time.sleep(60)
+    return [{'value': item * 2} for item in inputs]
+
+@pytest.fixture
+def fast_polling(monkeypatch):
+    # Workers and the collector check on each other every 10 ms, so reaping races with replies
+    monkeypatch.setattr(worker_pool, 'POLL_INTERVAL', 0.01)
+
+def test_scores_through_the_workers():
+    pool = PreforkPool(double, workers=2)
+    try:
+        futures = [pool.submit([index, index + 1]) for index in range(20)]
+        assert [future.result(timeout=10) for future in futures] == [
+            [{'value': index * 2}, {'value': (index + 1) * 2}] for index in range(20)
+        ]
+    finally:
+        pool.close()
+    assert pool.queue_depth() == 0
+
+def test_recycling_under_load_fails_no_request(fast_polling):
+    pool = PreforkPool(double, workers=2, max_wait_ms=0)
+    futures = []
+    stop = threading.Event()
+
+    def load():
+        index = 0
+        while not stop.is_set():
+            futures.append((index, pool.submit([index])))
+            index += 1
+            time.sleep(0.0005)
+
+    clients = [threading.Thread(target=load) for _ in range(4)]
+    for client in clients:
+        client.start()
+    try:
+        for _ in range(40):
+            time.sleep(0.02)
+            pool.recycle()
+    finally:
+        stop.set()
+        for client in clients:
+            client.join()
+
+    try:
+        for index, future in futures:
+            assert future.result(timeout=10) == [{'value': index * 2}]
+        assert pool.stats()['recycles'] == 40
+    finally:
+        pool.close()
+
+def test_replaces_a_worker_that_dies_and_fails_its_requests(fast_polling):
+    pool = PreforkPool(double, workers=1)
+    try:
+        pid = pool.stats()['per_worker'][0]['pid']
+        stuck = pool.submit(['hang'])
+        time.sleep(0.2)  # Let the worker pick it up
+        os.kill(pid, signal.SIGKILL)
+
+        with pytest.raises(RuntimeError, match='exited with code'):
+            stuck.result(timeout=10)
+        assert pool.submit([3]).result(timeout=10) == [{'value': 6}]
+        stats = pool.stats()
+        assert stats['restarts'] == 1
+        assert stats['per_worker'][0]['pid'] != pid
+    finally:
+        pool.close()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+sklearn-free replica of HashingVectorizer for portable model bundles
+Reproduces HashingVectorizer(analyzer='word').transform bit for bit from its
+exported parameters: the same preprocessing and token pattern, signed 32-bit
+MurmurHash3 (seed 0) of each token's UTF-8 bytes, alternate signs, duplicate
+summing and row normalization. Hashing runs vectorized in NumPy over the
+distinct tokens of a batch, so loading a bundle never imports scikit-learn.
+"""
+import re
+import unicodedata
+
+import numpy as np
+from scipy import sparse
+
+C1 = np.uint32(0xcc9e2d51)
+C2 = np.uint32(0x1b873593)
+
+def _rotl(values, bits):
+    return (values << np.uint32(bits)) | (values >> np.uint32(32 - bits))
+
+def _mix_block(k):
+    k = k * C1
+    k = _rotl(k, 15)
+    return k * C2
+
+def murmurhash3_32(keys, seed=0):
+    """Signed MurmurHash3_x86_32 of each bytes object, as int32 (sklearn's murmurhash3_32)"""
+    count = len(keys)
+    lengths = np.fromiter((len(key) for key in keys), dtype=np.int64, count=count)
+    offsets = np.zeros(count, dtype=np.int64)
+    if count > 1:
+        offsets[1:] = np.cumsum(lengths[:-1])
+    # Three bytes of padding so every 4-byte gather stays in bounds
+    buffer = np.frombuffer(b''.join(keys) + b'\0\0\0', dtype=np.uint8).astype(np.uint32)
+
+    with np.errstate(over='ignore'):
+        h = np.full(count, seed, dtype=np.uint32)
+        blocks = lengths // 4
+        for block in range(int(blocks.max()) if count else 0):
+            active = np.flatnonzero(blocks > block)
+            at = offsets[active] + 4 * block
+            k = buffer[at] | (buffer[at + 1] << 8) | (buffer[at + 2] << 16) | (buffer[at + 3] << 24)
+            mixed = h[active] ^ _mix_block(k)
+            h[active] = _rotl(mixed, 13) * np.uint32(5) + np.uint32(0xe6546b64)
+
+        tail = lengths & 3
+        at = offsets + 4 * blocks
+        k = np.zeros(count, dtype=np.uint32)
+        k ^= np.where(tail >= 3, buffer[at + 2] << 16, 0).astype(np.uint32)
+        k ^= np.where(tail >= 2, buffer[at + 1] << 8, 0).astype(np.uint32)
+        k ^= np.where(tail >= 1, buffer[at], 0).astype(np.uint32)
+        h = np.where(tail > 0, h ^ _mix_block(k), h)
+
+        # Finalization mix
+        h ^= lengths.astype(np.uint32)
+        h ^= h >> np.uint32(16)
+        h *= np.uint32(0x85ebca6b)
+        h ^= h >> np.uint32(13)
+        h *= np.uint32(0xc2b2ae35)
+        h ^= h >> np.uint32(16)
+    return h.view(np.int32)
+
+def strip_accents_unicode(text):
+    try:
+        text.encode('ASCII', errors='strict')
+        return text
+    except UnicodeEncodeError:
+        normalized = unicodedata.normalize('NFKD', text)
+        return ''.join([c for c in normalized if not unicodedata.combining(c)])
+
+def strip_accents_ascii(text):
+    return unicodedata.normalize('NFKD', text).encode('ASCII', 'ignore').decode('ASCII')
+
+ACCENT_STRIPPERS = {None: None, 'unicode': strip_accents_unicode, 'ascii': strip_accents_ascii}
+
+class HashingTextVectorizer:
+    """transform(list of texts) -> CSR matrix identical to HashingVectorizer.transform"""
+
+    def __init__(self, params):
+        # params as written by portable_model.export_hashing_params
+        if params.get('analyzer', 'word') != 'word':
+            raise ValueError(f"Only analyzer='word' is supported, not {params['analyzer']!r}")
+        if params.get('input', 'content') != 'content':
+            raise ValueError(f"Only input='content' is supported, not {params['input']!r}")
+        if params.get('strip_accents') not in ACCENT_STRIPPERS:
+            raise ValueError(f"Unsupported strip_accents {params['strip_accents']!r}")
+        if params.get('norm') not in (None, 'l1', 'l2'):
+            raise ValueError(f"Unsupported norm {params['norm']!r}")
+
+        self.n_features = int(params['n_features'])
+        self.lowercase = params.get('lowercase', True)
+        self.strip_accents = ACCENT_STRIPPERS[params.get('strip_accents')]
+        self.tokenize = re.compile(params['token_pattern']).findall
+        self.stop_words = frozenset(params['stop_words']) if params.get('stop_words') else None
+        self.ngram_range = tuple(params.get('ngram_range', (1, 1)))
+        self.binary = params.get('binary', False)
+        self.norm = params.get('norm')
+        self.alternate_sign = params.get('alternate_sign', True)
+        self.encoding = params.get('encoding', 'utf-8')
+        self.decode_error = params.get('decode_error', 'strict')
+        self.dtype = np.dtype(params.get('dtype', 'float64'))
+
+    def analyze(self, doc):
+        """Tokens (and n-grams) of one document, as HashingVectorizer's word analyzer yields them"""
+        if isinstance(doc, bytes):
+            doc = doc.decode(self.encoding, self.decode_error)
+        if self.lowercase:
+            doc = doc.lower()
+        if self.strip_accents is not None:
+            doc = self.strip_accents(doc)
+
+        tokens = self.tokenize(doc)
+        if self.stop_words is not None:
+            tokens = [token for token in tokens if token not in self.stop_words]
+
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+        grams = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), min(max_n + 1, len(tokens) + 1)):
+            grams.extend(' '.join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return grams
+
+    def transform(self, docs):
+        if isinstance(docs, str):
+            raise ValueError('Iterable over raw text documents expected, string object received.')
+
+        # Hash each distinct token of the batch once
+        token_ids = {}
+        occurrences = []
+        indptr = [0]
+        for doc in docs:
+            occurrences.extend(token_ids.setdefault(token, len(token_ids)) for token in self.analyze(doc))
+            indptr.append(len(occurrences))
+
+        hashes = murmurhash3_32([token.encode('utf-8') for token in token_ids]).astype(np.int64)
+        columns = np.abs(hashes) % self.n_features  # int64: abs(-2**31) is exact here
+        signs = np.where(hashes >= 0, 1, -1) if self.alternate_sign else np.ones(len(hashes), dtype=np.int64)
+
+        occurrences = np.asarray(occurrences, dtype=np.intp)
+        matrix = sparse.csr_matrix(
+            (signs[occurrences].astype(self.dtype), columns[occurrences].astype(np.int32),
+             np.asarray(indptr, dtype=np.int32)),
+            shape=(len(indptr) - 1, self.n_features)
+        )
+        matrix.sum_duplicates()
+        if self.binary:
+            matrix.data.fill(1)
+        if self.norm is not None:
+            self._normalize(matrix)
+        return matrix
+
+    def _normalize(self, matrix):
+        """In-place row normalization, as sklearn.preprocessing.normalize on CSR"""
+        rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+        if self.norm == 'l2':
+            norms = np.sqrt(np.bincount(rows, weights=matrix.data * matrix.data, minlength=matrix.shape[0]))
+        else:
+            norms = np.bincount(rows, weights=np.abs(matrix.data), minlength=matrix.shape[0])
+        norms[norms == 0] = 1
+        matrix.data /= norms[rows]
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Pure-NumPy evaluator for the TalentSol XGBoost tree ensemble
+Flattens every tree of the trained booster into contiguous node arrays (split
+feature, threshold, left/right child, default direction, leaf value) and walks
+all trees for a whole batch at once, one tree level per step, over CSR input.
+Scoring needs only NumPy: compile once from the booster, save the arrays with
+save(), and load() them anywhere without importing xgboost or scikit-learn.
+
+Usage:
+  python tree_ensemble.py --check [--rows N]   # compare with pipeline.predict_proba
+  python tree_ensemble.py --export trees.npz   # write the compiled arrays
+"""
+import sys
+import json
+import math
+
+import numpy as np
+
+# Objectives whose prediction is sigmoid(margin)
+LOGISTIC_OBJECTIVES = ('binary:logistic', 'reg:logistic')
+
+# Rows evaluated per dense block (bounds memory at CHUNK_ROWS x split features)
+CHUNK_ROWS = 4096
+
+# Largest |probability difference| the equivalence check accepts (float32 rounding)
+CHECK_TOLERANCE = 1e-6
+
+class CompiledEnsemble:
+    """Flattened tree ensemble; predict(csr) -> positive-class probabilities"""
+
+    ARRAYS = ('feature', 'threshold', 'left', 'right', 'default_left', 'is_leaf',
+              'value', 'tree_roots', 'iteration_indptr')
+
+    def __init__(self, feature, threshold, left, right, default_left, is_leaf, value,
+                 tree_roots, iteration_indptr, base_margin, max_depth, num_features, objective):
+        # Node arrays are indexed by global node id; leaves point at themselves
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.is_leaf = is_leaf
+        self.value = value
+        self.tree_roots = tree_roots
+        self.iteration_indptr = iteration_indptr
+        self.base_margin = np.float32(base_margin)
+        self.max_depth = int(max_depth)
+        self.num_features = int(num_features)
+        self.objective = str(objective)
+
+        # Only features some tree splits on are ever read; give each a dense column
+        self.split_features = np.unique(self.feature[~self.is_leaf])
+        self.column_of_feature = np.full(self.num_features, -1, dtype=np.int64)
+        self.column_of_feature[self.split_features] = np.arange(len(self.split_features))
+        self.split_column = np.where(self.is_leaf, 0, self.column_of_feature[self.feature])
+
+    @property
+    def num_trees(self):
+        return len(self.tree_roots)
+
+    @property
+    def num_iterations(self):
+        return len(self.iteration_indptr) - 1
+
+    @classmethod
+    def from_booster(cls, booster):
+        """Compile an xgboost.Booster from its JSON model (numeric splits only)"""
+        return cls.from_json(json.loads(booster.save_raw('json')))
+
+    @classmethod
+    def from_json(cls, model):
+        learner = model['learner']
+        objective = learner['objective']['name']
+        if objective not in LOGISTIC_OBJECTIVES:
+            raise ValueError(f"Unsupported objective {objective}; expected {' or '.join(LOGISTIC_OBJECTIVES)}")
+
+        params = learner['learner_model_param']
+        if int(params.get('num_class', 0)) > 1 or int(params.get('num_target', 1)) > 1:
+            raise ValueError('Only single-output binary models can be compiled')
+
+        booster = learner['gradient_booster']
+        if booster['name'] != 'gbtree':
+            raise ValueError(f"Unsupported booster {booster['name']}; expected gbtree")
+        trees = booster['model']['trees']
+
+        # base_score is stored in probability space ('[5E-1]' in xgboost >= 2)
+        base_score = float(params['base_score'].strip('[]'))
+        base_margin = math.log(base_score / (1 - base_score))
+
+        parts = {name: [] for name in ('feature', 'threshold', 'left', 'right', 'default_left', 'is_leaf', 'value')}
+        tree_roots = []
+        max_depth = 0
+        offset = 0
+        for tree in trees:
+            if any(tree['split_type']):
+                raise ValueError(f"Tree {tree['id']} has categorical splits; only numeric splits are supported")
+
+            left = np.asarray(tree['left_children'], dtype=np.int32)
+            right = np.asarray(tree['right_children'], dtype=np.int32)
+            is_leaf = left < 0
+            nodes = np.arange(len(left), dtype=np.int32)
+            conditions = np.asarray(tree['split_conditions'], dtype=np.float32)
+
+            parts['feature'].append(np.where(is_leaf, 0, tree['split_indices']).astype(np.int32))
+            parts['threshold'].append(np.where(is_leaf, 0, conditions).astype(np.float32))
+            parts['left'].append(np.where(is_leaf, nodes, left) + offset)
+            parts['right'].append(np.where(is_leaf, nodes, right) + offset)
+            parts['default_left'].append(np.asarray(tree['default_left'], dtype=bool))
+            parts['is_leaf'].append(is_leaf)
+            # A leaf's split_condition holds its (learning-rate scaled) output
+            parts['value'].append(np.where(is_leaf, conditions, 0).astype(np.float32))
+
+            tree_roots.append(offset)
+            max_depth = max(max_depth, cls._depth(left, right))
+            offset += len(left)
+
+        indptr = booster['model'].get('iteration_indptr')
+        if indptr is None:
+            per_iteration = int(booster['model']['gbtree_model_param'].get('num_parallel_tree', 1))
+            indptr = np.arange(0, len(trees) + 1, per_iteration)
+
+        return cls(
+            **{name: np.concatenate(arrays) if arrays else np.empty(0) for name, arrays in parts.items()},
+            tree_roots=np.asarray(tree_roots, dtype=np.int32),
+            iteration_indptr=np.asarray(indptr, dtype=np.int64),
+            base_margin=base_margin,
+            max_depth=max_depth,
+            num_features=int(params['num_feature']),
+            objective=objective
+        )
+
+    @staticmethod
+    def _depth(left, right):
+        """Number of splits on the longest root-to-leaf path"""
+        depth = 0
+        level = [0]
+        while True:
+            level = [child for node in level if left[node] >= 0 for child in (left[node], right[node])]
+            if not level:
+                return depth
+            depth += 1
+
+    def save(self, path):
+        """Write the compiled arrays as an uncompressed .npz"""
+        np.savez(path, base_margin=self.base_margin, max_depth=self.max_depth,
+                 num_features=self.num_features, objective=self.objective,
+                 **{name: getattr(self, name) for name in self.ARRAYS})
+
+    @classmethod
+    def load(cls, path):
+        """Load arrays written by save(); needs nothing but NumPy"""
+        with np.load(path, allow_pickle=False) as arrays:
+            return cls(
+                **{name: arrays[name] for name in cls.ARRAYS},
+                base_margin=arrays['base_margin'],
+                max_depth=arrays['max_depth'],
+                num_features=arrays['num_features'],
+                objective=arrays['objective']
+            )
+
+    def tree_slice(self, iteration_range=None):
+        """Trees covered by an xgboost-style (begin, end) iteration range; (0, 0) means all"""
+        begin, end = iteration_range or (0, 0)
+        if end <= 0 or end > self.num_iterations:
+            end = self.num_iterations
+        return slice(int(self.iteration_indptr[begin]), int(self.iteration_indptr[end]))
+
+    def _dense_split_features(self, features, begin, end, missing):
+        """Rows begin:end as a dense float32 block over split features only; NaN = missing"""
+        indptr = np.asarray(features.indptr[begin:end + 1], dtype=np.int64)
+        start, stop = indptr[0], indptr[-1]
+        columns = self.column_of_feature[np.asarray(features.indices[start:stop], dtype=np.int64)]
+        values = np.asarray(features.data[start:stop], dtype=np.float32)
+        row_of_entry = np.repeat(np.arange(end - begin), np.diff(indptr))
+
+        # Absent entries stay NaN and follow each node's default direction
+        block = np.full((end - begin, len(self.split_features)), np.nan, dtype=np.float32)
+        used = columns >= 0
+        block[row_of_entry[used], columns[used]] = values[used]
+        if not (missing is None or (isinstance(missing, float) and math.isnan(missing))):
+            block[block == np.float32(missing)] = np.nan
+        return block
+
+    def predict_margin(self, features, iteration_range=None, missing=np.nan):
+        """Raw scores for a CSR matrix (anything with indptr/indices/data/shape)"""
+        roots = self.tree_roots[self.tree_slice(iteration_range)]
+        margins = [
+            self._margin_chunk(features, begin, min(begin + CHUNK_ROWS, features.shape[0]), roots, missing)
+            for begin in range(0, features.shape[0], CHUNK_ROWS)
+        ]
+        return np.concatenate(margins) if margins else np.empty(0, dtype=np.float32)
+
+    def _margin_chunk(self, features, begin, end, roots, missing):
+        block = self._dense_split_features(features, begin, end, missing)
+        rows = end - begin
+
+        # One cursor per (row, tree); every step advances all non-leaf cursors one level
+        nodes = np.tile(roots, rows)
+        cursor_row = np.repeat(np.arange(rows), len(roots))
+        for _ in range(self.max_depth):
+            active = np.flatnonzero(~self.is_leaf[nodes])
+            if len(active) == 0:
+                break
+            node = nodes[active]
+            value = block[cursor_row[active], self.split_column[node]]
+            # NaN compares False, so missing values take the default branch
+            go_left = np.where(np.isnan(value), self.default_left[node], value < self.threshold[node])
+            nodes[active] = np.where(go_left, self.left[node], self.right[node])
+
+        # Accumulate leaves tree by tree in float32, the order xgboost adds them
+        leaves = self.value[nodes].reshape(rows, len(roots))
+        margin = np.full(rows, self.base_margin, dtype=np.float32)
+        for tree in range(len(roots)):
+            margin += leaves[:, tree]
+        return margin
+
+    def predict(self, features, iteration_range=None, missing=np.nan):
+        """Positive-class probabilities, as booster.inplace_predict returns them"""
+        margin = self.predict_margin(features, iteration_range, missing)
+        return (np.float32(1) / (np.float32(1) + np.exp(-margin))).astype(np.float32)
+
+def check_equivalence(pipeline, inputs, ensemble=None):
+    """Score inputs with pipeline.predict_proba and the compiled trees; returns a report dict"""
+    import pandas as pd
+    from booster_engine import BoosterEngine
+
+    engine = BoosterEngine(pipeline)
+    if ensemble is None:
+        ensemble = CompiledEnsemble.from_booster(engine.booster)
+
+    expected = pipeline.predict_proba(pd.DataFrame(inputs))[:, 1]
+    actual = ensemble.predict(engine.transform_rows(inputs), engine.iteration_range, engine.missing)
+    difference = np.abs(expected.astype(np.float64) - actual.astype(np.float64))
+    return {
+        'rows': len(inputs),
+        'trees': ensemble.num_trees,
+        'max_depth': ensemble.max_depth,
+        'max_abs_diff': float(difference.max()) if len(difference) else 0.0,
+        'mean_abs_diff': float(difference.mean()) if len(difference) else 0.0,
+        'tolerance': CHECK_TOLERANCE,
+        'equivalent': bool(len(difference) == 0 or difference.max() <= CHECK_TOLERANCE)
+    }
+
+def main():
+    import argparse
+    from xgboost_predict_wrapper import load_model
+    from sample_corpus import synthetic_inputs, model_categories
+
+    parser = argparse.ArgumentParser(description='Compile and check the NumPy tree evaluator')
+    parser.add_argument('--check', action='store_true',
+                        help='Compare against pipeline.predict_proba on a synthetic corpus')
+    parser.add_argument('--rows', type=int, default=2000, help='Rows in the check corpus (default 2000)')
+    parser.add_argument('--seed', type=int, default=0, help='Corpus random seed')
+    parser.add_argument('--export', metavar='PATH', help='Write the compiled arrays to an .npz file')
+    args = parser.parse_args()
+
+    if not args.check and not args.export:
+        parser.error('nothing to do: pass --check and/or --export PATH')
+
+    try:
+        pipeline = load_model()
+        ensemble = CompiledEnsemble.from_booster(pipeline.steps[-1][1].get_booster())
+        report = {'trees': ensemble.num_trees, 'nodes': len(ensemble.feature), 'max_depth': ensemble.max_depth}
+
+        if args.export:
+            ensemble.save(args.export)
+            report['exported'] = args.export
+
+        if args.check:
+            job_roles, ethnicities = model_categories(pipeline)
+            inputs = synthetic_inputs(args.rows, seed=args.seed, distinct_jobs=max(1, args.rows // 20),
+                                      job_roles=job_roles, ethnicities=ethnicities)
+            report['check'] = check_equivalence(pipeline, inputs, ensemble)
+
+        print(json.dumps(report, indent=2))
+        if args.check and not report['check']['equivalent']:
+            sys.exit(1)
+    except Exception as e:
+        print(json.dumps({'error': str(e)}), file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
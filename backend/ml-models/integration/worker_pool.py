@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Pre-fork worker pool for the TalentSol XGBoost wrapper
+The supervisor loads the pipeline once, freezes the heap and forks N workers
+that share the model pages copy-on-write. Each worker coalesces the requests
+queued for it into one predict_proba call, like the in-process micro-batcher.
+recycle() replaces the workers with fresh forks (after a model hot reload)
+while the old ones drain what was already queued for them.
+"""
+import os
+import gc
+import queue
+import time
+import signal
+import itertools
+import threading
+import multiprocessing as mp
+from concurrent.futures import Future
+
+from micro_batcher import batch_size_bucket
+
+# How often idle workers and the collector check on their counterpart
+POLL_INTERVAL = 0.5
+
+def worker_main(serial, score_batch, requests, results, max_batch_size, max_wait, on_start=None):
+    """Worker process loop: pull queued jobs, score them together, report back"""
+    # The supervisor owns shutdown; Ctrl+C in a terminal must not kill workers mid-batch
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    parent_pid = os.getppid()
+
+    if on_start is not None:
+        on_start()
+
+    while True:
+        try:
+            job = requests.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            if os.getppid() != parent_pid:
+                return  # Supervisor died; don't linger as an orphan
+            continue
+
+        if job is None:
+            return
+
+        jobs = [job]
+        rows = len(job[1])
+        stop = False
+
+        # Coalesce whatever else is already waiting for this worker
+        while rows < max_batch_size:
+            try:
+                extra = requests.get(timeout=max_wait) if max_wait > 0 else requests.get_nowait()
+            except queue.Empty:
+                break
+            if extra is None:
+                stop = True
+                break
+            jobs.append(extra)
+            rows += len(extra[1])
+
+        inputs = [item for _, job_inputs in jobs for item in job_inputs]
+        try:
+            scored = score_batch(inputs)
+            error = None
+        except Exception as e:
+            scored = None
+            error = str(e)
+
+        replies = []
+        offset = 0
+        for key, job_inputs in jobs:
+            replies.append((key, scored[offset:offset + len(job_inputs)] if scored is not None else None))
+            offset += len(job_inputs)
+
+        results.put((serial, replies, error, len(inputs)))
+
+        if stop:
+            return
+
+class WorkerHandle:
+    """Supervisor-side view of one forked worker"""
+
+    def __init__(self, index, serial, process, requests):
+        self.index = index
+        self.serial = serial   # unique per fork; replies are routed by it
+        self.process = process
+        self.requests = requests
+        self.pending = {}      # key -> (Future, row count)
+        self.pending_rows = 0
+        self.rows_scored = 0
+
+class PreforkPool:
+    """Fan score requests out to forked workers that share one loaded pipeline"""
+
+    def __init__(self, score_batch, workers=None, max_batch_size=64, max_wait_ms=2.0, on_start=None):
+        # score_batch(list of inputs) -> list of results; called inside the workers
+        self.score_batch = score_batch
+        self.num_workers = max(1, int(workers or os.cpu_count() or 1))
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.on_start = on_start
+
+        self._ctx = mp.get_context('fork')
+        self._results = self._ctx.Queue()
+        self._lock = threading.Lock()
+        self._keys = itertools.count()
+        self._serials = itertools.count()
+        self._by_serial = {}
+        self._draining = []    # recycled workers still finishing their queues
+        self._histogram = {}
+        self._batches = 0
+        self._restarts = 0
+        self._recycles = 0
+        self._closed = False
+
+        # Collect garbage once and move everything loaded so far (the model) into the
+        # permanent generation, so later collections in the workers don't write to
+        # those pages and break copy-on-write sharing
+        gc.collect()
+        gc.freeze()
+
+        self._workers = [self._spawn(index) for index in range(self.num_workers)]
+        self._collector = threading.Thread(target=self._collect, name='pool-collector', daemon=True)
+        self._collector.start()
+
+    def _spawn(self, index):
+        serial = next(self._serials)
+        requests = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=worker_main,
+            args=(serial, self.score_batch, requests, self._results,
+                  self.max_batch_size, self.max_wait, self.on_start),
+            name=f'scoring-worker-{index}',
+            daemon=True
+        )
+        process.start()
+        worker = WorkerHandle(index, serial, process, requests)
+        self._by_serial[serial] = worker
+        return worker
+
+    def submit(self, inputs):
+        """Queue a list of inputs on the least-loaded worker; returns a Future of results"""
+        inputs = list(inputs)
+        future = Future()
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('Worker pool is closed')
+
+            key = next(self._keys)
+            worker = min(self._workers, key=lambda handle: handle.pending_rows)
+            worker.pending[key] = (future, len(inputs))
+            worker.pending_rows += len(inputs)
+            worker.requests.put((key, inputs))
+
+        return future
+
+    def recycle(self):
+        """Fork a fresh set of workers from the supervisor as it is now; old ones finish their queues"""
+        # Unfreeze so a replaced model's reference cycles can be collected, then
+        # freeze what is loaded now before forking, as at startup
+        gc.unfreeze()
+        gc.collect()
+        gc.freeze()
+
+        with self._lock:
+            if self._closed:
+                return
+            retired = self._workers
+            self._workers = [self._spawn(worker.index) for worker in retired]
+            self._draining.extend(retired)
+            self._recycles += 1
+
+        # Queued after their pending jobs, so nothing already accepted is dropped
+        for worker in retired:
+            worker.requests.put(None)
+
+    def _all_workers(self):
+        return self._workers + self._draining
+
+    def queue_depth(self):
+        """Rows handed to workers but not yet answered"""
+        with self._lock:
+            return sum(worker.pending_rows for worker in self._all_workers())
+
+    def stats(self):
+        """Per-worker load plus the pool-wide batch-size histogram"""
+        with self._lock:
+            return {
+                'workers': self.num_workers,
+                'restarts': self._restarts,
+                'recycles': self._recycles,
+                'draining': len(self._draining),
+                'batches': self._batches,
+                'rows': sum(worker.rows_scored for worker in self._workers),
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0,
+                'queue_depth': sum(worker.pending_rows for worker in self._all_workers()),
+                'batch_size_histogram': dict(self._histogram),
+                'per_worker': [
+                    {
+                        'pid': worker.process.pid,
+                        'in_flight': worker.pending_rows,
+                        'rows': worker.rows_scored
+                    }
+                    for worker in self._workers
+                ]
+            }
+
+    def close(self):
+        """Let workers finish their queues, then stop them and the collector"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            workers = self._all_workers()
+
+        for worker in workers:
+            worker.requests.put(None)
+        for worker in workers:
+            worker.process.join()
+
+        self._results.put(None)
+        self._collector.join()
+
+        # Anything still pending belonged to a worker that died during shutdown
+        with self._lock:
+            for worker in workers:
+                self._fail_pending(worker, 'Worker pool closed before the request completed')
+
+    def _collect(self):
+        """Resolve Futures from worker replies; replace workers that die"""
+        checked = time.monotonic()
+        while True:
+            # Checked under load too, so recycled workers are reaped promptly
+            if time.monotonic() - checked >= POLL_INTERVAL:
+                self._check_workers()
+                checked = time.monotonic()
+            try:
+                message = self._results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+
+            if message is None:
+                return
+
+            serial, replies, error, batch_size = message
+            with self._lock:
+                worker = self._by_serial.get(serial)
+                self._batches += 1
+                bucket = batch_size_bucket(batch_size)
+                self._histogram[bucket] = self._histogram.get(bucket, 0) + 1
+                if worker is None:
+                    continue  # Its pending requests were already failed when it was reaped
+
+                for key, scored in replies:
+                    future, rows = worker.pending.pop(key, (None, 0))
+                    worker.pending_rows -= rows
+                    worker.rows_scored += rows
+                    if future is None:
+                        continue
+                    if error is not None:
+                        future.set_exception(RuntimeError(error))
+                    else:
+                        future.set_result(scored)
+
+    def _check_workers(self):
+        with self._lock:
+            if self._closed:
+                return
+            for position, worker in enumerate(self._workers):
+                if worker.process.is_alive():
+                    continue
+                self._fail_pending(worker, f"Scoring worker exited with code {worker.process.exitcode}")
+                del self._by_serial[worker.serial]
+                self._workers[position] = self._spawn(worker.index)
+                self._restarts += 1
+
+            # A recycled worker exits once its queue is drained; after a clean exit its last
+            # replies may still be on the results queue, so wait for the collector to read them
+            for worker in list(self._draining):
+                if worker.process.is_alive():
+                    continue
+                worker.process.join()
+                if worker.process.exitcode == 0 and worker.pending:
+                    continue
+                self._fail_pending(worker, f"Scoring worker exited with code {worker.process.exitcode}")
+                del self._by_serial[worker.serial]
+                self._draining.remove(worker)
+
+    def _fail_pending(self, worker, message):
+        for future, _ in worker.pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError(message))
+        worker.pending.clear()
+        worker.pending_rows = 0
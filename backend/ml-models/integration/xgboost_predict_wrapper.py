@@ -2,71 +2,902 @@
 """
 XGBoost Model Prediction Wrapper for TalentSol
 Loads your trained best_performing_model_pipeline.joblib and makes predictions
+
+Modes:
+  one-shot (default)  read one JSON object from stdin, print one JSON result
+                      (an object with "job" and "candidates" is ranked, top K)
+  --stream            read NDJSON from stdin in --chunk-rows chunks and write
+                      each chunk's NDJSON results as soon as it is scored
+  --serve             load the model once, then answer newline-delimited JSON
+                      requests from stdin until EOF (one response line each);
+                      requests arriving together are micro-batched
+  --serve --workers N fork N workers that share the loaded model copy-on-write
+  --serve --framed    length-prefixed frames instead of JSON lines, with a
+                      column-encoded binary form for batches (framed_protocol.py)
+  --listen ADDRESS    serve HTTP (score, batch, health, stats) on a Unix socket
+                      (unix:/path.sock) or localhost port; --workers applies too
+  --reload            resident modes: hot-swap the model when --model changes
+
+In resident modes a request may name a model version from ml-models/versions
+("model": "name" or "name@version"); those load on first use into an LRU
+registry (model_registry.py) beside the default model.
+
+Any request with "debug": true gets per-stage timings in milliseconds under
+"timings" (stdin read, JSON parse, validation, DataFrame construction, each
+ColumnTransformer branch, scaling, tree evaluation, serialization in one-shot
+mode; queue wait and the whole request in resident modes). Resident modes
+also keep per-stage latency histograms in the stats output (stage_timing.py).
+
+Resident modes bound the rows waiting to be scored (--max-queue-rows) and
+accept a "deadline_ms" budget per request or row (--deadline-ms sets a
+default). Work that would overflow the queue or miss its deadline is answered
+with {"error": ..., "shed": reason} instead of being scored
+(admission_control.py). With --degrade rule such rows, and requests whose
+deadline passes before the model answers, get a rule-based score marked
+"degraded": true instead (degraded_scoring.py).
+
+A request or row with "rounds": N, or "tier": NAME (--tier NAME=N; triage
+and screen are built in), is scored with only the first N boosting rounds
+and its result carries "rounds"; ensemble_tiers.py measures what each N
+costs in accuracy.
+
+With --cascade FILE (fitted by cascade_scoring.py), a linear pre-screen
+scores every row of a batch first and only rows in its uncertain band reach
+the trees; results carry "cascade": "prescreen" or "full", and a request or
+row with "cascade": false is scored in full. It fronts the default model only.
+
+Heavy libraries (pandas, joblib, scikit-learn, xgboost, scipy) are imported
+on first use, so bad arguments and bad JSON fail without paying for them;
+--startup-report prints a per-module import-time breakdown to stderr.
 """
+import os
 import sys
 import json
-import joblib
-import pandas as pd
-import numpy as np
+import time
+import argparse
+import threading
 from pathlib import Path
 
+from startup_report import start_if_requested
+
+# Installed before any other import so the report sees every module load
+STARTUP_PROFILER = start_if_requested(sys.argv)
+
+from micro_batcher import MicroBatcher
+from prediction_cache import PredictionCache, CachedScheduler, cache_key, file_fingerprint
+from model_reloader import ModelReloader, resolve_model, model_file
+from model_registry import ModelRegistry, VERSIONS_PATH
+from text_normalization import TextNormalizer
+from stage_timing import (stage, collect_stages, traced_scorer, wants_timings,
+                          StageHistograms, StageRecorder)
+from admission_control import AdmissionControl, expire_overdue
+from ensemble_tiers import DEFAULT_TIERS, row_rounds, truncated_range, parse_tier
+from cascade_scoring import row_cascade, STAGE_PRESCREEN, STAGE_FULL, PRESCREEN_MODEL_TYPE
+from request_fields import apply_request_fields
+
 # Model path — resolved relative to this script's location
 MODEL_PATH = Path(__file__).parent.parent / "decision-tree" / "best_performing_model_pipeline.joblib"
 
-def load_model():
-    """Load the trained XGBoost pipeline"""
+# Uncompressed copy written by model_memory.py --convert
+MMAP_MODEL_PATH = MODEL_PATH.with_suffix('.mmap.joblib')
+
+def mmap_model_path(path=MODEL_PATH):
+    """Converted copy when present; the original pickle is mmap-able while it stays uncompressed"""
+    path = Path(path)
+    converted = path.with_suffix('.mmap.joblib')
+    # A copy older than its source predates a model deploy and must not shadow it
+    if converted.exists() and converted.stat().st_mtime_ns >= path.stat().st_mtime_ns:
+        return converted
+    return path
+
+def load_model(mmap=False, path=MODEL_PATH):
+    """Load the trained XGBoost pipeline (numpy arrays mapped read-only when mmap is set)"""
+    import joblib  # Unpickling pulls in scikit-learn and xgboost as well
     try:
-        pipeline = joblib.load(str(MODEL_PATH))
+        if mmap:
+            return joblib.load(str(mmap_model_path(path)), mmap_mode='r')
+        pipeline = joblib.load(str(path))
         return pipeline
     except Exception as e:
         raise Exception(f"Failed to load model: {str(e)}")
 
+# Input columns the pipeline was trained on, with the defaults applied when absent
+FEATURE_DEFAULTS = {
+    'Job Description': '',
+    'Resume': '',
+    'Job Roles': '',
+    'Ethnicity': 'Not Specified'
+}
+
+MODEL_TYPE = 'xgboost_decision_tree_ensemble'
+
+# Cleans and caps the free-text columns before vectorization (--text-max-chars/--text-max-tokens)
+TEXT_NORMALIZER = TextNormalizer()
+
+# Named truncated-ensemble tiers: name -> boosting rounds (--tier NAME=N adds or overrides)
+TIERS = dict(DEFAULT_TIERS)
+
+# Cascade pre-screen for the default model (--cascade), None when rows always go through the trees
+PRESCREEN = None
+
+def build_row(input_data, record=True):
+    """Validate one input object and map it onto the training columns"""
+    if not isinstance(input_data, dict):
+        raise ValueError('Input must be a JSON object')
+
+    row = {}
+    for column, default in FEATURE_DEFAULTS.items():
+        value = input_data.get(column)
+        if value is None:
+            value = default
+        elif not isinstance(value, str):
+            raise ValueError(f"Field '{column}' must be a string")
+        if column in TEXT_NORMALIZER.fields:
+            value = TEXT_NORMALIZER.normalize(value, record)
+        row[column] = value
+
+    return row
+
 def preprocess_input(input_data):
     """Preprocess input to match training format"""
+    import pandas as pd
+
     # Create DataFrame with exact column names from training
-    df = pd.DataFrame([{
-        'Job Description': input_data.get('Job Description', ''),
-        'Resume': input_data.get('Resume', ''),
-        'Job Roles': input_data.get('Job Roles', ''),
-        'Ethnicity': input_data.get('Ethnicity', 'Not Specified')
-    }])
+    with stage('validate'):
+        row = build_row(input_data)
+    with stage('dataframe'):
+        df = pd.DataFrame([row], columns=list(FEATURE_DEFAULTS))
 
     return df
 
-def predict(pipeline, input_df):
+def validate_batch(inputs):
+    """Validate every input; returns (rows, row positions, (requested rounds, cascade allowed) per row, errors by position)"""
+    rows = []
+    positions = []
+    modes = []
+    errors = {}
+
+    for position, input_data in enumerate(inputs):
+        try:
+            mode = (row_rounds(input_data, TIERS), row_cascade(input_data))
+            row = build_row(input_data)
+        except Exception as e:
+            errors[position] = str(e)
+            continue
+        rows.append(row)
+        positions.append(position)
+        modes.append(mode)
+
+    return rows, positions, modes, errors
+
+def score_rows(pipeline, rows, iteration_range=None):
+    """Positive-class probabilities for validated rows (the first rounds only, given an iteration_range)"""
+    # The direct booster engine takes row dicts as-is and skips pandas entirely
+    if hasattr(pipeline, 'predict_rows'):
+        return pipeline.predict_rows(rows, iteration_range)
+
+    import pandas as pd
+    with stage('dataframe'):
+        df = pd.DataFrame(rows, columns=list(FEATURE_DEFAULTS))
+    if iteration_range is not None:
+        return pipeline.predict_proba(df, iteration_range=iteration_range)[:, 1]
+    return pipeline.predict_proba(df)[:, 1]
+
+def predict(pipeline, input_df, rounds=None):
     """Make prediction using the loaded pipeline"""
     try:
         # Get probability for positive class (Best Match)
-        probabilities = pipeline.predict_proba(input_df)
+        iteration_range = truncated_range(pipeline, rounds)
+        if iteration_range is not None:
+            probabilities = pipeline.predict_proba(input_df, iteration_range=iteration_range)
+        else:
+            probabilities = pipeline.predict_proba(input_df)
         probability = float(probabilities[0][1])  # Positive class probability
 
-        return {
-            'probability': probability,
-            'model_type': 'xgboost_decision_tree_ensemble'
-        }
+        return scored_result(probability, iteration_range)
     except Exception as e:
         raise Exception(f"Prediction failed: {str(e)}")
 
+def scored_result(probability, iteration_range=None):
+    result = {'probability': float(probability), 'model_type': MODEL_TYPE}
+    if iteration_range is not None:
+        result['rounds'] = iteration_range[1]
+    return result
+
+def score_validated(pipeline, rows, positions, results, iteration_range=None):
+    """Fill results[position] for validated rows with one scoring call"""
+    try:
+        probabilities = score_rows(pipeline, rows, iteration_range)
+        for position, probability in zip(positions, probabilities):
+            results[position] = scored_result(probability, iteration_range)
+    except Exception:
+        # A row the pipeline rejects must not sink the batch: isolate it
+        for row, position in zip(rows, positions):
+            try:
+                results[position] = scored_result(score_rows(pipeline, [row], iteration_range)[0], iteration_range)
+            except Exception as e:
+                results[position] = {'error': f"Prediction failed: {str(e)}"}
+
+def score_cascaded(pipeline, prescreen, rows, positions, results, iteration_range=None):
+    """Fill results[position] from the pre-screen, sending only its uncertain band through the trees"""
+    from cascade_scoring import scaled_features, classify_features
+
+    try:
+        features = scaled_features(pipeline, rows, list(FEATURE_DEFAULTS))
+        with stage('prescreen'):
+            screened = prescreen.probabilities(features)
+            band = prescreen.uncertain(screened)
+        uncertain = band.nonzero()[0]
+        full = classify_features(pipeline, features[uncertain], iteration_range) if len(uncertain) else []
+    except Exception:
+        # The row-by-row fallback isolates whichever row broke the batch
+        score_validated(pipeline, rows, positions, results, iteration_range)
+        return
+
+    prescreen.record(len(rows) - len(uncertain), len(uncertain))
+    for position, probability, deferred in zip(positions, screened, band):
+        if not deferred:
+            results[position] = {'probability': float(probability), 'model_type': PRESCREEN_MODEL_TYPE,
+                                 'cascade': STAGE_PRESCREEN}
+    for index, probability in zip(uncertain, full):
+        results[positions[index]] = dict(scored_result(probability, iteration_range), cascade=STAGE_FULL)
+
+def predict_batch(pipeline, inputs, prescreen=None):
+    """Score many inputs with one predict_proba call per ensemble depth (and cascade mode), results in input order"""
+    results = [None] * len(inputs)
+    with stage('validate'):
+        rows, positions, modes, errors = validate_batch(inputs)
+
+    for position, message in errors.items():
+        results[position] = {'error': message}
+
+    groups = {}
+    for index, mode in enumerate(modes):
+        groups.setdefault(mode, []).append(index)
+
+    for (requested, cascaded), indexes in groups.items():
+        if len(groups) > 1:
+            group_rows, group_positions = [rows[index] for index in indexes], [positions[index] for index in indexes]
+        else:
+            group_rows, group_positions = rows, positions
+        iteration_range = truncated_range(pipeline, requested)
+        if prescreen is not None and cascaded:
+            score_cascaded(pipeline, prescreen, group_rows, group_positions, results, iteration_range)
+        else:
+            score_validated(pipeline, group_rows, group_positions, results, iteration_range)
+    return results
+
+def default_prescreen(reloader):
+    """PRESCREEN while the live model is the one it was fitted on, else None"""
+    if PRESCREEN is None or reloader.current() != PRESCREEN.fingerprint:
+        return None  # A hot-reloaded model needs its own pre-screen
+    return PRESCREEN
+
+def predict_routed(reloader, registry, inputs):
+    """predict_batch per requested model; inputs without a "model" field use the default"""
+    groups = {}
+    for position, item in enumerate(inputs):
+        groups.setdefault(item.get('model') if isinstance(item, dict) else None, []).append(position)
+    if list(groups) == [None]:
+        return predict_batch(reloader.engine, inputs, default_prescreen(reloader))
+
+    results = [None] * len(inputs)
+    for name, positions in groups.items():
+        try:
+            engine = reloader.engine if name is None else registry.get(name)
+        except Exception as e:
+            for position in positions:
+                results[position] = {'error': f"Model unavailable: {str(e)}"}
+            continue
+
+        prescreen = default_prescreen(reloader) if name is None else None
+        scored = predict_batch(engine, [inputs[position] for position in positions], prescreen)
+        for position, result in zip(positions, scored):
+            if name is not None and 'error' not in result:
+                result['model'] = registry.label(name)
+            results[position] = result
+    return results
+
+def request_inputs(request):
+    """Return (inputs, is_batch) for a serve-mode scoring request"""
+    if 'inputs' in request:
+        inputs = request['inputs']
+        if not isinstance(inputs, list):
+            raise ValueError("'inputs' must be a JSON array")
+        return apply_request_fields(inputs, request), True
+
+    # Model fields may be nested under "input" or sent alongside the id
+    return apply_request_fields([request.get('input', request)], request), False
+
+def format_response(request_id, results, is_batch):
+    """Shape scored rows into the response for one request"""
+    if is_batch:
+        return {'id': request_id, 'results': results}
+
+    response = dict(results[0])
+    response['id'] = request_id
+    return response
+
+def dispatch_request(scheduler, request, respond, extra_stats=None):
+    """Route one serve-mode request; scoring goes through the batcher or worker pool"""
+    request_id = request.get('id')
+    op = request.get('op')
+
+    if op == 'ping':
+        respond({'id': request_id, 'status': 'ok'})
+        return
+    if op == 'stats':
+        stats = {'scheduler': scheduler.stats()}
+        if extra_stats is not None:
+            stats.update(extra_stats())
+        respond({'id': request_id, 'stats': stats})
+        return
+    if op == 'rank':
+        dispatch_ranking(scheduler, request, respond)
+        return
+
+    try:
+        inputs, is_batch = request_inputs(request)
+        future = scheduler.submit(inputs)
+    except Exception as e:
+        respond({'id': request_id, 'error': str(e)})
+        return
+
+    def on_done(done):
+        try:
+            respond(format_response(request_id, done.result(), is_batch))
+        except Exception as e:
+            respond({'id': request_id, 'error': f"Prediction failed: {str(e)}"})
+
+    future.add_done_callback(on_done)
+
+def dispatch_ranking(scheduler, request, respond):
+    """Serve-mode top-K ranking of one job's candidates"""
+    from candidate_ranking import parse_rank_request, submit_ranking
+
+    request_id = request.get('id')
+    try:
+        job, candidates, top_k = parse_rank_request(request)
+        candidates = apply_request_fields(candidates, request)
+        future = submit_ranking(scheduler, job, candidates, top_k)
+    except Exception as e:
+        respond({'id': request_id, 'error': str(e)})
+        return
+
+    def on_done(done):
+        try:
+            respond(dict(done.result(), id=request_id))
+        except Exception as e:
+            respond({'id': request_id, 'error': f"Ranking failed: {str(e)}"})
+
+    future.add_done_callback(on_done)
+
+class LineWriter:
+    """Thread-safe JSON-lines writer shared by the reader and batcher threads"""
+
+    def __init__(self, stream, histograms=None):
+        self.stream = stream
+        self.lock = threading.Lock()
+        self.histograms = histograms
+
+    def __call__(self, payload):
+        started = time.perf_counter()
+        line = json.dumps(payload) + '\n'
+        if self.histograms is not None:
+            self.histograms.record({'serialize': (time.perf_counter() - started) * 1000.0})
+        with self.lock:
+            self.stream.write(line)
+            self.stream.flush()
+
+def iter_lines(stream):
+    """Yield text lines read straight from the stream's file descriptor"""
+    # Iterating sys.stdin holds its buffer lock while blocked; a worker forked
+    # meanwhile (pool respawn) would deadlock when multiprocessing closes its stdin
+    try:
+        fd = stream.fileno()
+    except (AttributeError, OSError, ValueError):
+        yield from stream
+        return
+
+    # Pieces of the unfinished line; joined once its newline arrives, so a
+    # 50 MB batch line costs one copy rather than one per 64 KB read
+    pending = []
+    while True:
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            break
+        if b'\n' not in chunk:
+            pending.append(chunk)
+            continue
+        first, *lines, rest = chunk.split(b'\n')
+        pending.append(first)
+        lines.insert(0, b''.join(pending))
+        pending = [rest]
+        for line in lines:
+            yield line.decode('utf-8', errors='replace')
+
+    tail = b''.join(pending)
+    if tail:
+        yield tail.decode('utf-8', errors='replace')
+
+def limit_model_threads(pipeline):
+    """Pin the booster to one thread; forked workers supply the parallelism"""
+    if getattr(pipeline, 'booster', None) is not None:
+        pipeline.booster.set_param({'nthread': 1})
+        return
+    for _, step in getattr(pipeline, 'steps', []):
+        if hasattr(step, 'get_booster'):
+            step.get_booster().set_param({'nthread': 1})
+
+def feature_caches(args):
+    """Per-column feature caches for the hashed text columns, sized from the command line"""
+    from feature_cache import SparseRowCache
+
+    job_cache = None
+    if args.job_cache_entries > 0:
+        job_cache = SparseRowCache(max_entries=args.job_cache_entries,
+                                   max_bytes=args.job_cache_mb * 1024 * 1024)
+
+    # HashingVectorizer is stateless, so a resume's features can be reused across jobs
+    resume_cache = None
+    if args.resume_cache_entries > 0:
+        resume_cache = SparseRowCache(max_entries=args.resume_cache_entries,
+                                      max_bytes=args.resume_cache_mb * 1024 * 1024)
+
+    return {'Job Description': job_cache, 'Resume': resume_cache}
+
+def prepare_pipeline(pipeline, args):
+    """Wrap the loaded pipeline so shared job and resume text is vectorized once per value"""
+    from feature_cache import wrap_feature_cache
+    from booster_engine import BoosterEngine, CompiledTreeEngine
+
+    column_caches = feature_caches(args)
+
+    engines = {'booster': BoosterEngine, 'numpy': CompiledTreeEngine}
+    if args.engine in engines:
+        try:
+            return engines[args.engine](pipeline, column_caches)
+        except Exception as e:
+            print(json.dumps({'warning': f"{args.engine.capitalize()} engine unavailable, using pipeline: {str(e)}"}),
+                  file=sys.stderr)
+
+    return wrap_feature_cache(pipeline, column_caches)
+
+def model_location(args):
+    """Model file, bundle directory or versions/{model-name} directory from the command line"""
+    return args.bundle or args.model or MODEL_PATH
+
+def build_engine(kind, path, args):
+    """Scoring engine for a resolved model: a portable bundle or a joblib pipeline"""
+    if kind == 'bundle':
+        from portable_model import PortableEngine
+
+        # A bundle has no sklearn Pipeline; 'pipeline' falls back to the booster
+        engine = 'numpy' if args.engine == 'numpy' else 'booster'
+        return PortableEngine(path, feature_caches(args), engine=engine)
+    return prepare_pipeline(load_model(args.mmap, path), args)
+
+def load_engine(args):
+    """Scoring engine for --model / --bundle (default: the joblib pipeline)"""
+    return build_engine(*resolve_model(model_location(args)), args)
+
+def model_source(args):
+    """File whose content identifies the loaded model"""
+    return model_file(*resolve_model(model_location(args)))
+
+# Scored once by every newly loaded model before it may serve traffic
+SMOKE_INPUT = {'Job Description': 'software engineer python sql', 'Resume': 'python developer',
+               'Job Roles': 'Software Engineer', 'Ethnicity': 'Not Specified'}
+
+def smoke_test(engine):
+    """Raise unless the engine returns a probability for a known-good row"""
+    result = predict_batch(engine, [SMOKE_INPUT])[0]
+    if 'error' in result:
+        raise ValueError(f"Smoke prediction failed: {result['error']}")
+    if not 0.0 <= result['probability'] <= 1.0:
+        raise ValueError(f"Smoke prediction returned {result['probability']}, not a probability")
+
+def create_reloader(args):
+    """Live model holder for the resident modes; --reload starts watching its source"""
+    reloader = ModelReloader(model_location(args), lambda kind, path: build_engine(kind, path, args),
+                             smoke_test=smoke_test)
+    if args.reload:
+        reloader.start(args.reload_interval)
+    return reloader
+
+def create_registry(args):
+    """Named model versions served beside the default model, loaded on first request"""
+    return ModelRegistry(lambda kind, path: build_engine(kind, path, args), root=args.models_dir,
+                         max_models=args.max_models, max_bytes=args.models_mb * 1024 * 1024,
+                         smoke_test=smoke_test)
+
+def resident_stats(reloader, registry, args):
+    """Stats callback: live model details plus in-process caches (forked workers keep their own)"""
+    def stats():
+        result = {'model': reloader.stats()}
+        if args.workers == 1:
+            result['registry'] = registry.stats()
+            result['text'] = TEXT_NORMALIZER.stats()
+            if hasattr(reloader.engine, 'cache_stats'):
+                result['features'] = reloader.engine.cache_stats()
+            if PRESCREEN is not None:
+                result['cascade'] = PRESCREEN.stats()
+        return result
+    return stats
+
+def row_cache_key(input_data, fingerprint):
+    """Prediction-cache key for one raw input (raises for invalid rows)"""
+    # Counted when the row is scored, not on every lookup
+    return cache_key(build_row(input_data, record=False), fingerprint)
+
+def routed_cache_key(registry):
+    """row_cache_key that keys rows naming a model by that model's fingerprint"""
+    def row_key(input_data, fingerprint):
+        if wants_timings(input_data):
+            return None  # A cached answer has no stages to time
+        name = input_data.get('model') if isinstance(input_data, dict) else None
+        if name is not None:
+            fingerprint = registry.fingerprint(name)
+        rounds = row_rounds(input_data, TIERS)
+        if rounds is not None:
+            fingerprint = f"{fingerprint}:rounds={rounds}"  # A truncated score is a different prediction
+        if PRESCREEN is not None and name is None and row_cascade(input_data):
+            fingerprint = f"{fingerprint}:cascade"  # So may be a pre-screened one
+        return row_cache_key(input_data, fingerprint)
+    return row_key
+
+def create_scheduler(reloader, registry, args, histograms):
+    """Micro-batcher or pre-fork pool per the command line, behind admission control and the prediction cache"""
+    # Each batch reads the live engine once, so a hot reload never splits a batch;
+    # its stage spans ride back on the results (from forked workers too)
+    fallback = None
+    if args.degrade == 'rule':
+        from degraded_scoring import rule_based_fallback
+        fallback = rule_based_fallback(lambda item: build_row(item, record=False))
+    score_batch = traced_scorer(expire_overdue(lambda inputs: predict_routed(reloader, registry, inputs), fallback))
+
+    if args.workers > 1:
+        from worker_pool import PreforkPool
+        scheduler = PreforkPool(score_batch, workers=args.workers, max_batch_size=args.max_batch_size,
+                                max_wait_ms=args.max_wait_ms,
+                                on_start=lambda: limit_model_threads(reloader.engine))
+        # Workers hold the engine they were forked with; replace them after a swap
+        reloader.on_swap = scheduler.recycle
+    else:
+        scheduler = MicroBatcher(score_batch, max_batch_size=args.max_batch_size,
+                                 max_wait_ms=args.max_wait_ms)
+    # Below the cache: only scored rows have stages to record
+    scheduler = StageRecorder(scheduler, histograms)
+    # Below the cache too: hits are answered however full the queue is
+    scheduler = AdmissionControl(scheduler, max_queue_rows=args.max_queue_rows,
+                                 default_deadline_ms=args.deadline_ms, fallback=fallback)
+
+    if args.cache_entries > 0:
+        cache = PredictionCache(max_entries=args.cache_entries, max_bytes=args.cache_mb * 1024 * 1024,
+                                ttl_seconds=args.cache_ttl, fingerprint=reloader)
+        scheduler = CachedScheduler(scheduler, cache, routed_cache_key(registry))
+
+    return scheduler
+
+def decode_line(line):
+    """Request dict from one JSON line; raises ValueError with the client-facing message"""
+    try:
+        request = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON: {str(e)}")
+    if not isinstance(request, dict):
+        raise ValueError('Request must be a JSON object')
+    return request
+
+def serve(scheduler, stdin=None, stdout=None, info=None, extra_stats=None, histograms=None, framed=False):
+    """Process requests from stdin until it closes: JSON lines, or length-prefixed frames"""
+    stdin = stdin or sys.stdin
+    if framed:
+        from framed_protocol import FrameWriter, iter_frames, decode_frame
+        respond = FrameWriter(stdout or sys.stdout, histograms)
+        messages, decode = iter_frames(stdin), decode_frame
+    else:
+        respond = LineWriter(stdout or sys.stdout, histograms)
+        messages = (line for line in iter_lines(stdin) if line.strip())
+        decode = decode_line
+    respond(dict(info or {}, event='ready', protocol='framed' if framed else 'lines'))
+
+    try:
+        for message in messages:
+            started = time.perf_counter()
+            try:
+                request = decode(message)
+            except ValueError as e:
+                respond({'id': None, 'error': str(e)})
+                continue
+            if histograms is not None:
+                histograms.record({'parse': (time.perf_counter() - started) * 1000.0})
+
+            dispatch_request(scheduler, request, respond, extra_stats)
+    finally:
+        # Answer everything already read before exiting
+        scheduler.close()
+
+def split_ndjson(text):
+    """Split an NDJSON stream into its non-blank lines"""
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+def predict_ndjson(pipeline, lines):
+    """Score NDJSON lines as one batch; undecodable lines become per-row errors"""
+    results = [None] * len(lines)
+    decoded = {}
+
+    for position, line in enumerate(lines):
+        try:
+            decoded[position] = json.loads(line)
+        except json.JSONDecodeError as e:
+            results[position] = {'error': f"Invalid JSON: {str(e)}"}
+
+    scored = predict_batch(pipeline, list(decoded.values()), PRESCREEN)
+    for position, result in zip(decoded, scored):
+        results[position] = result
+
+    return results
+
+def stream_ndjson(pipeline, stream, out, chunk_rows):
+    """Score an NDJSON stream chunk by chunk, flushing each chunk's results before reading on"""
+    # Memory stays bounded by one chunk however long the stream is
+    chunk = []
+    for line in iter_lines(stream):
+        line = line.strip()
+        if line:
+            chunk.append(line)
+        if len(chunk) >= chunk_rows:
+            out.write(''.join(json.dumps(result) + '\n' for result in predict_ndjson(pipeline, chunk)))
+            out.flush()
+            chunk = []
+
+    if chunk:
+        out.write(''.join(json.dumps(result) + '\n' for result in predict_ndjson(pipeline, chunk)))
+        out.flush()
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description='TalentSol XGBoost prediction wrapper')
+    parser.add_argument('--serve', action='store_true',
+                        help='keep the model loaded and answer JSON-lines requests from stdin')
+    parser.add_argument('--listen', metavar='ADDRESS',
+                        help='serve HTTP on unix:/path.sock or [host:]port instead of stdin')
+    parser.add_argument('--framed', action='store_true',
+                        help='serve mode: length-prefixed frames (framed_protocol.py) instead of JSON lines')
+    parser.add_argument('--stream', action='store_true',
+                        help='one-shot: score NDJSON from stdin in chunks, streaming NDJSON results')
+    parser.add_argument('--chunk-rows', type=int, default=1000,
+                        help='--stream: rows read, scored and written per chunk')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='serve mode: fork this many workers sharing one loaded model')
+    parser.add_argument('--max-batch-size', type=int, default=64,
+                        help='serve mode: most rows coalesced into one predict_proba call')
+    parser.add_argument('--max-wait-ms', type=float, default=2.0,
+                        help='serve mode: longest a request waits for others to batch with')
+    parser.add_argument('--max-queue-rows', type=int, default=20000,
+                        help='resident modes: rows allowed to wait for scoring before submissions are shed (0: no bound)')
+    parser.add_argument('--deadline-ms', type=float, default=0,
+                        help='resident modes: default per-row deadline budget; rows that would miss it are shed (0: none)')
+    parser.add_argument('--degrade', choices=['none', 'rule'], default='none',
+                        help='resident modes: answer shed or overdue rows with a rule-based score marked '
+                             '"degraded" instead of an error')
+    parser.add_argument('--tier', action='append', type=parse_tier, default=[], metavar='NAME=ROUNDS',
+                        help='named truncated-ensemble tier for "tier": NAME requests (repeatable; '
+                             f"built in: {', '.join(f'{name}={rounds}' for name, rounds in DEFAULT_TIERS.items())})")
+    parser.add_argument('--cascade', metavar='FILE',
+                        help='batch scoring: linear pre-screen from cascade_scoring.py; rows outside its uncertain '
+                             'band skip the trees')
+    parser.add_argument('--engine', choices=['pipeline', 'booster', 'numpy'], default='pipeline',
+                        help='pipeline: sklearn predict_proba; booster: decomposed transforms + inplace_predict; '
+                             'numpy: decomposed transforms + pure-NumPy tree evaluator')
+    parser.add_argument('--startup-report', action='store_true',
+                        help='print per-module import times and startup phases to stderr as JSON')
+    parser.add_argument('--model', metavar='PATH',
+                        help='joblib pipeline, bundle directory, or versions/{model-name} directory '
+                             '(newest version) to load instead of the default pickle')
+    parser.add_argument('--bundle', metavar='DIR',
+                        help='load a portable bundle (portable_model.py --export) instead of the joblib pickle')
+    parser.add_argument('--reload', action='store_true',
+                        help='resident modes: watch the model source and hot-swap a changed model')
+    parser.add_argument('--reload-interval', type=float, default=5.0,
+                        help='resident modes: seconds between model source checks with --reload')
+    parser.add_argument('--mmap', action='store_true',
+                        help='map the pickle\'s arrays read-only so processes share page cache (see model_memory.py)')
+    parser.add_argument('--models-dir', default=str(VERSIONS_PATH),
+                        help='resident modes: versions/{model-name}/{version} tree for requests with a "model" field')
+    parser.add_argument('--max-models', type=int, default=4,
+                        help='resident modes: named models kept loaded before the least recently used is evicted')
+    parser.add_argument('--models-mb', type=float, default=1024,
+                        help='resident modes: on-disk size budget for loaded named models in megabytes')
+    parser.add_argument('--text-max-chars', type=int, default=50000,
+                        help='cap on Resume / Job Description characters after cleanup (0: no cap)')
+    parser.add_argument('--text-max-tokens', type=int, default=8000,
+                        help='cap on Resume / Job Description tokens after cleanup (0: no cap)')
+    parser.add_argument('--job-cache-entries', type=int, default=256,
+                        help='distinct Job Description feature rows kept across requests (0: per call only)')
+    parser.add_argument('--job-cache-mb', type=float, default=32,
+                        help='memory budget for cached Job Description features in megabytes')
+    parser.add_argument('--resume-cache-entries', type=int, default=4096,
+                        help='distinct Resume feature rows kept across requests (0: per call only)')
+    parser.add_argument('--resume-cache-mb', type=float, default=64,
+                        help='memory budget for cached Resume features in megabytes')
+    parser.add_argument('--cache-entries', type=int, default=10000,
+                        help='resident modes: prediction cache size in entries (0 disables)')
+    parser.add_argument('--cache-mb', type=float, default=64,
+                        help='resident modes: prediction cache budget in megabytes')
+    parser.add_argument('--cache-ttl', type=float, default=3600,
+                        help='resident modes: seconds a cached prediction stays valid')
+    return parser.parse_args(argv)
+
+def service_info(args):
+    """Model and process details reported in ready events and health checks"""
+    return {'model_path': str(model_source(args)), 'workers': args.workers, 'engine': args.engine,
+            'reload': args.reload}
+
+def startup_mark(phase):
+    """Record a startup phase for --startup-report (no-op otherwise)"""
+    if STARTUP_PROFILER is not None:
+        STARTUP_PROFILER.mark(phase)
+
+def emit_startup_report():
+    if STARTUP_PROFILER is not None:
+        STARTUP_PROFILER.emit()
+
+def print_with_timings(payload, spans, targets):
+    """Print a one-shot result; each target dict within it gets the spans, serialization included"""
+    if targets:
+        started = time.perf_counter()
+        json.dumps(payload)
+        spans['serialize'] = (time.perf_counter() - started) * 1000.0
+        for target in targets:
+            target['timings'] = dict(spans)
+    print(json.dumps(payload))
+
+def configure_text_limits(args):
+    """Replace the default text normalizer with the command line's caps"""
+    global TEXT_NORMALIZER
+    TEXT_NORMALIZER = TextNormalizer(max_chars=args.text_max_chars, max_tokens=args.text_max_tokens)
+
+def configure_tiers(args):
+    """Add or override named tiers from --tier"""
+    TIERS.update(args.tier)
+
+def configure_cascade(args, fingerprint):
+    """Load the --cascade pre-screen, refusing one fitted on another model"""
+    global PRESCREEN
+    if args.cascade:
+        from cascade_scoring import load_prescreen
+        PRESCREEN = load_prescreen(args.cascade, fingerprint)
+
 def main():
+    args = parse_args()
+    configure_text_limits(args)
+    configure_tiers(args)
+    startup_mark('arguments_parsed')
+
+    if args.listen or args.serve:
+        try:
+            reloader = create_reloader(args)
+            configure_cascade(args, reloader.current())
+        except Exception as e:
+            print(json.dumps({'error': str(e)}), file=sys.stderr)
+            emit_startup_report()
+            sys.exit(1)
+        startup_mark('model_loaded')
+
+        registry = create_registry(args)
+        histograms = StageHistograms()
+        scheduler = create_scheduler(reloader, registry, args, histograms)
+        startup_mark('scheduler_ready')
+        if args.listen:
+            from scoring_server import run_server
+            emit_startup_report()
+            run_server(scheduler, args.listen, info=service_info(args),
+                       extra_stats=resident_stats(reloader, registry, args), histograms=histograms)
+        else:
+            emit_startup_report()
+            serve(scheduler, info=service_info(args), extra_stats=resident_stats(reloader, registry, args),
+                  histograms=histograms, framed=args.framed)
+        reloader.stop()
+        return
+
+    if args.stream:
+        try:
+            pipeline = load_engine(args)
+            configure_cascade(args, file_fingerprint(model_source(args)))
+            startup_mark('model_loaded')
+            stream_ndjson(pipeline, sys.stdin, sys.stdout, max(1, args.chunk_rows))
+            startup_mark('results_written')
+        except Exception as e:
+            print(json.dumps({'error': str(e)}), file=sys.stderr)
+            sys.exit(1)
+        finally:
+            emit_startup_report()
+        return
+
+    # Spans cost a few clock reads per stage; only "debug": true prints them
+    spans = {}
     try:
-        # Read input from stdin
-        input_data = json.loads(sys.stdin.read())
+        with collect_stages(spans):
+            # Read input from stdin
+            with stage('stdin_read'):
+                raw = sys.stdin.read()
+            try:
+                with stage('json_parse'):
+                    input_data = json.loads(raw)
+            except json.JSONDecodeError:
+                # More than one JSON document: treat stdin as an NDJSON batch
+                lines = split_ndjson(raw)
+                if len(lines) < 2:
+                    raise
+
+                pipeline = load_engine(args)
+                configure_cascade(args, file_fingerprint(model_source(args)))
+                startup_mark('model_loaded')
+                for result in predict_ndjson(pipeline, lines):
+                    print(json.dumps(result))
+                startup_mark('results_written')
+                return
+
+            if isinstance(input_data, list):
+                with stage('model_load'):
+                    pipeline = load_engine(args)
+                    configure_cascade(args, file_fingerprint(model_source(args)))
+                startup_mark('model_loaded')
+                results = predict_batch(pipeline, input_data, PRESCREEN)
+                print_with_timings(results, spans, [result for item, result in zip(input_data, results)
+                                                    if wants_timings(item)])
+                startup_mark('results_written')
+                return
+
+            if isinstance(input_data, dict) and 'candidates' in input_data:
+                from candidate_ranking import parse_rank_request, rank_candidates
+
+                job, candidates, top_k = parse_rank_request(input_data)
+                candidates = apply_request_fields(candidates, input_data)
+                with stage('model_load'):
+                    pipeline = load_engine(args)
+                    configure_cascade(args, file_fingerprint(model_source(args)))
+                startup_mark('model_loaded')
+                ranking = rank_candidates(lambda inputs: predict_batch(pipeline, inputs, PRESCREEN), job,
+                                          candidates, top_k)
+                print_with_timings(ranking, spans, [ranking] if wants_timings(input_data) else [])
+                startup_mark('results_written')
+                return
 
-        # Load model
-        pipeline = load_model()
+            # Load model (the --engine the batch and resident paths would use)
+            with stage('model_load'):
+                pipeline = load_engine(args)
+            startup_mark('model_loaded')
 
-        # Preprocess input
-        input_df = preprocess_input(input_data)
+            rounds = row_rounds(input_data, TIERS)
+            if hasattr(pipeline, 'predict_rows'):
+                # Row engines take the validated dict directly, without importing pandas
+                with stage('validate'):
+                    row = build_row(input_data)
+                iteration_range = truncated_range(pipeline, rounds)
+                try:
+                    probability = float(score_rows(pipeline, [row], iteration_range)[0])
+                except Exception as e:
+                    raise Exception(f"Prediction failed: {str(e)}")
+                result = scored_result(probability, iteration_range)
+            else:
+                # Preprocess input
+                input_df = preprocess_input(input_data)
 
-        # Make prediction
-        result = predict(pipeline, input_df)
+                # Make prediction
+                result = predict(pipeline, input_df, rounds)
 
-        # Output result as JSON
-        print(json.dumps(result))
+            # Output result as JSON
+            print_with_timings(result, spans, [result] if wants_timings(input_data) else [])
+            startup_mark('result_written')
 
     except Exception as e:
         print(json.dumps({'error': str(e)}), file=sys.stderr)
         sys.exit(1)
+    finally:
+        emit_startup_report()
 
 if __name__ == "__main__":
     main()
@@ -2,18 +2,28 @@
 """
 TalentSol ML Prediction Service
 Integrates Kaggle datasets for candidate prioritization
+
+numpy is imported only when a trained model is actually used, so the
+rule-based fallback and argument/JSON errors start fast. Pass
+--startup-report to print per-module import times to stderr.
 """
+from __future__ import annotations
 
 import sys
 import json
 import pickle
-import numpy as np
-import pandas as pd
 from pathlib import Path
 from typing import Dict, List, Any
 import warnings
 warnings.filterwarnings('ignore')
 
+STARTUP_PROFILER = None
+if '--startup-report' in sys.argv:
+    # The profiler lives with the integration wrappers
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'integration'))
+    from startup_report import start_if_requested
+    STARTUP_PROFILER = start_if_requested(sys.argv)
+
 class CandidatePrioritizationModel:
     """
     ML Model for candidate prioritization using Kaggle dataset features
@@ -44,6 +54,8 @@ class CandidatePrioritizationModel:
         Extract features from candidate data for ML prediction
         Maps TalentSol data to Kaggle dataset format
         """
+        import numpy as np
+
         features = []
         
         # Experience features (from Kaggle resume datasets)
@@ -87,12 +99,12 @@ class CandidatePrioritizationModel:
         Make prediction for candidate prioritization
         """
         try:
-            features = self.extract_features(candidate_data)
-            
             if self.model is None:
                 # Fallback to rule-based prediction
                 return self.rule_based_prediction(candidate_data)
             
+            features = self.extract_features(candidate_data)
+            
             # Scale features if scaler is available
             if self.scaler:
                 features = self.scaler.transform(features)
@@ -250,12 +262,13 @@ class CandidatePrioritizationModel:
 
 def main():
     """Main function to handle prediction requests"""
-    if len(sys.argv) != 3:
-        print("Usage: python predict.py <model_path> <candidate_data_json>", file=sys.stderr)
+    args = [arg for arg in sys.argv[1:] if arg != '--startup-report']
+    if len(args) != 2:
+        print("Usage: python predict.py <model_path> <candidate_data_json> [--startup-report]", file=sys.stderr)
         sys.exit(1)
     
-    model_path = sys.argv[1]
-    candidate_data_json = sys.argv[2]
+    model_path = args[0]
+    candidate_data_json = args[1]
     
     try:
         candidate_data = json.loads(candidate_data_json)
@@ -275,6 +288,9 @@ def main():
     except Exception as e:
         print(f"Prediction failed: {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        if STARTUP_PROFILER is not None:
+            STARTUP_PROFILER.emit()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,256 @@
+import { describe, it, expect, vi, beforeEach, afterEach } from 'vitest'
+import { EventEmitter } from 'events'
+import { PassThrough } from 'stream'
+import http from 'http'
+import { AddressInfo } from 'net'
+import { spawn } from 'child_process'
+import { prisma } from '../../lib/prisma'
+import { XGBoostModelService, XGBoostModelInput } from '../xgboostModelService'
+
+vi.mock('child_process', () => ({
+  spawn: vi.fn()
+}))
+
+vi.mock('../../lib/prisma', () => ({
+  prisma: { mlPrediction: { create: vi.fn() } }
+}))
+
+vi.mock('../../utils/logger', () => ({
+  logger: { info: vi.fn(), warn: vi.fn(), error: vi.fn(), debug: vi.fn() }
+}))
+
+const ENV_KEYS = [
+  'XGBOOST_SCORER_ADDRESS', 'XGBOOST_RESIDENT_PROTOCOL', 'XGBOOST_DEADLINE_MS',
+  'XGBOOST_MAX_PROCESSES', 'XGBOOST_MAX_QUEUED_CALLS'
+]
+
+function applicationInput(applicationId: string, resume = 'Python developer with machine learning experience. '.repeat(3)): XGBoostModelInput {
+  return {
+    candidateId: `candidate-${applicationId}`,
+    jobId: 'job-1',
+    applicationId,
+    data: {
+      jobDescription: 'Software Engineer position requiring Python and machine learning experience',
+      resume,
+      jobRoles: 'Software Engineer',
+      ethnicity: 'Not Specified'
+    }
+  }
+}
+
+/**
+ * Stand-in for one wrapper process: answer(stdin) is written to stdout and the process exits 0
+ * once stdin ends; without answer it stays running until the test calls exit()
+ */
+function fakeProcess(answer?: (stdin: string) => string) {
+  const child: any = new EventEmitter()
+  child.stdin = new PassThrough()
+  child.stdout = new PassThrough()
+  child.stderr = new PassThrough()
+  child.received = ''
+  child.exit = (output: string, code = 0) => {
+    child.stdout.end(output)
+    setImmediate(() => child.emit('close', code))
+  }
+  child.stdin.on('data', (chunk: Buffer) => {
+    child.received += chunk.toString()
+  })
+  child.stdin.on('end', () => {
+    if (answer) {
+      child.exit(answer(child.received))
+    }
+  })
+  return child
+}
+
+function createService(): XGBoostModelService {
+  const service = new XGBoostModelService()
+  // Skip the model file and Python environment checks
+  ;(service as any).isInitialized = true
+  return service
+}
+
+const tick = () => new Promise(resolve => setImmediate(resolve))
+
+describe('XGBoostModelService', () => {
+  beforeEach(() => {
+    vi.clearAllMocks()
+    vi.spyOn(console, 'log').mockImplementation(() => {})
+    ENV_KEYS.forEach(key => delete process.env[key])
+  })
+
+  afterEach(() => {
+    vi.restoreAllMocks()
+  })
+
+  describe('spawn limiter', () => {
+    it('should queue calls beyond XGBOOST_MAX_PROCESSES and shed them beyond XGBOOST_MAX_QUEUED_CALLS', async () => {
+      process.env.XGBOOST_MAX_PROCESSES = '1'
+      process.env.XGBOOST_MAX_QUEUED_CALLS = '1'
+      const children: any[] = []
+      vi.mocked(spawn).mockImplementation((() => {
+        const child = fakeProcess()
+        children.push(child)
+        return child
+      }) as any)
+      const service = createService()
+
+      const first = service.predict(applicationInput('a'))
+      const second = service.predict(applicationInput('b'))
+      const third = service.predict(applicationInput('c'))
+
+      await expect(third).rejects.toThrow('XGBoost scorer overloaded')
+      await tick()
+      expect(children).toHaveLength(1)
+      expect(service.getProcessStats()).toMatchObject({ activeProcesses: 1, queuedCalls: 1, shedCalls: 1 })
+
+      children[0].exit(JSON.stringify({ probability: 0.9 }))
+      await expect(first).resolves.toMatchObject({ applicationId: 'a', binaryPrediction: 1 })
+      await tick()
+      expect(children).toHaveLength(2)
+
+      children[1].exit(JSON.stringify({ probability: 0.1 }))
+      await expect(second).resolves.toMatchObject({ applicationId: 'b', binaryPrediction: 0 })
+      expect(service.getProcessStats()).toMatchObject({ activeProcesses: 0, queuedCalls: 0, shedCalls: 1 })
+    })
+
+    it('should free the slot when the wrapper fails', async () => {
+      process.env.XGBOOST_MAX_PROCESSES = '1'
+      vi.mocked(spawn).mockImplementation((() => {
+        const child = fakeProcess()
+        setImmediate(() => child.emit('close', 1))
+        return child
+      }) as any)
+      const service = createService()
+
+      await expect(service.predict(applicationInput('a'))).rejects.toThrow('Python process failed with code 1')
+      expect(service.getProcessStats().activeProcesses).toBe(0)
+    })
+  })
+
+  describe('predictBatch without a scorer', () => {
+    it('should stream valid rows through one --stream wrapper and store each scored row', async () => {
+      let child: any
+      vi.mocked(spawn).mockImplementation((() => {
+        child = fakeProcess(stdin => stdin.trim().split('\n').map((line, index) => (
+          JSON.stringify(index === 0 ? { probability: 0.8 } : { error: 'Prediction failed' })
+        )).join('\n') + '\n')
+        return child
+      }) as any)
+      const service = createService()
+
+      const predictions = await service.predictBatch([
+        applicationInput('a'),
+        applicationInput('short', 'too short'),
+        applicationInput('c')
+      ])
+
+      expect(vi.mocked(spawn).mock.calls[0][1]).toContain('--stream')
+      const streamed = child.received.trim().split('\n').map((line: string) => JSON.parse(line))
+      expect(streamed).toHaveLength(2)
+      expect(streamed[0]).toMatchObject({ 'Resume': applicationInput('a').data.resume, 'Job Roles': 'Software Engineer' })
+
+      expect(predictions).toHaveLength(1)
+      expect(predictions[0]).toMatchObject({ applicationId: 'a', probability: 0.8, binaryPrediction: 1 })
+      expect(prisma.mlPrediction.create).toHaveBeenCalledTimes(1)
+    })
+
+    it('should reject when the streaming wrapper exits with an error', async () => {
+      vi.mocked(spawn).mockImplementation((() => {
+        const child = fakeProcess()
+        child.stdin.on('end', () => {
+          child.stderr.write('model not found')
+          setImmediate(() => child.emit('close', 1))
+        })
+        return child
+      }) as any)
+      const service = createService()
+
+      await expect(service.predictBatch([applicationInput('a')])).rejects.toThrow('model not found')
+    })
+  })
+
+  describe('scoring server client', () => {
+    let server: http.Server
+    let requests: Array<{ path?: string; body: any }>
+    let respond: (path: string | undefined, body: any) => [number, any]
+
+    beforeEach(async () => {
+      requests = []
+      server = http.createServer((request, response) => {
+        let data = ''
+        request.on('data', chunk => { data += chunk })
+        request.on('end', () => {
+          const body = JSON.parse(data)
+          requests.push({ path: request.url, body })
+          const [status, result] = respond(request.url, body)
+          response.writeHead(status, { 'Content-Type': 'application/json' })
+          response.end(JSON.stringify(result))
+        })
+      })
+      await new Promise<void>(resolve => server.listen(0, '127.0.0.1', resolve))
+      process.env.XGBOOST_SCORER_ADDRESS = `127.0.0.1:${(server.address() as AddressInfo).port}`
+    })
+
+    afterEach(async () => {
+      server.closeAllConnections()
+      await new Promise(resolve => server.close(resolve))
+    })
+
+    it('should post batches to /score/batch with the request deadline', async () => {
+      process.env.XGBOOST_DEADLINE_MS = '250'
+      respond = (_, body) => [200, { results: body.inputs.map(() => ({ probability: 0.7 })) }]
+      const service = createService()
+
+      const predictions = await service.predictBatch([applicationInput('a'), applicationInput('b')])
+
+      expect(requests).toHaveLength(1)
+      expect(requests[0].path).toBe('/score/batch')
+      expect(requests[0].body.deadline_ms).toBe(250)
+      expect(requests[0].body.inputs).toHaveLength(2)
+      expect(predictions.map(prediction => prediction.applicationId)).toEqual(['a', 'b'])
+      expect(vi.mocked(spawn)).not.toHaveBeenCalled()
+    })
+
+    it('should surface the server error for a non-200 response', async () => {
+      respond = () => [503, { error: 'Scorer overloaded' }]
+      const service = createService()
+
+      await expect(service.predict(applicationInput('a'))).rejects.toThrow('Scoring server returned 503: Scorer overloaded')
+    })
+
+    it('should never threshold a degraded score into a positive prediction', async () => {
+      respond = () => [200, { probability: 0.9, degraded: true, shed: 'expired' }]
+      const service = createService()
+
+      const prediction = await service.predict(applicationInput('a'))
+
+      expect(prediction).toMatchObject({ probability: 0.9, binaryPrediction: 0, confidence: 0, degraded: true })
+      expect(prisma.mlPrediction.create).toHaveBeenCalledTimes(1)
+    })
+
+    it('should rank model-scored candidates ahead of degraded ones', async () => {
+      respond = () => [200, {
+        candidates: 3,
+        failed: 0,
+        ranked: [{ id: 'a', rank: 1, probability: 0.9, cascade: 'full' }],
+        degraded: [{ id: 'b', rank: 1, probability: 0.95, degraded: true }, { id: 'c', rank: 2, probability: 0.2, degraded: true }],
+        degraded_rows: 2
+      }]
+      const service = createService()
+
+      const ranked = await service.rankCandidates(
+        { jobDescription: 'Python engineer', jobRoles: 'Software Engineer' },
+        ['a', 'b', 'c'].map(applicationId => ({ applicationId, resume: 'python' })),
+        2
+      )
+
+      expect(requests[0].path).toBe('/rank')
+      expect(requests[0].body.top_k).toBe(2)
+      expect(ranked).toEqual([
+        { applicationId: 'a', rank: 1, probability: 0.9, binaryPrediction: 1, cascade: 'full' },
+        { applicationId: 'b', rank: 2, probability: 0.95, binaryPrediction: 0, degraded: true }
+      ])
+    })
+  })
+})
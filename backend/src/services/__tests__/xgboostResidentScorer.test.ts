@@ -0,0 +1,108 @@
+import { describe, it, expect, vi, beforeEach } from 'vitest'
+import { EventEmitter } from 'events'
+import { PassThrough } from 'stream'
+import { spawnSync } from 'child_process'
+import path from 'path'
+import { fileURLToPath } from 'url'
+import { ResidentScorer, encodeBatchFrame } from '../xgboostResidentScorer'
+
+vi.mock('../../utils/logger', () => ({
+  logger: { info: vi.fn(), warn: vi.fn(), error: vi.fn(), debug: vi.fn() }
+}))
+
+const integrationDir = path.resolve(path.dirname(fileURLToPath(import.meta.url)), '../../../ml-models/integration')
+const python = process.env.XGBOOST_TEST_PYTHON || 'python3'
+const hasPython = spawnSync(python, ['-c', 'import framed_protocol'], { cwd: integrationDir }).status === 0
+
+/**
+ * Stand-in for a `--serve` wrapper speaking JSON lines: answer(request) returns the response, or undefined to stay silent
+ */
+function fakeWrapper(answer: (request: any) => any) {
+  const child: any = new EventEmitter()
+  child.stdin = new PassThrough()
+  child.stdout = new PassThrough()
+  child.stderr = new PassThrough()
+
+  let buffered = ''
+  child.stdin.on('data', (chunk: Buffer) => {
+    buffered += chunk.toString()
+    let newline: number
+    while ((newline = buffered.indexOf('\n')) !== -1) {
+      const request = JSON.parse(buffered.slice(0, newline))
+      buffered = buffered.slice(newline + 1)
+      const response = answer(request)
+      if (response !== undefined) {
+        child.stdout.write(JSON.stringify({ ...response, id: request.id }) + '\n')
+      }
+    }
+  })
+  child.stdout.write(JSON.stringify({ event: 'ready' }) + '\n')
+  return child
+}
+
+describe('ResidentScorer', () => {
+  beforeEach(() => {
+    vi.clearAllMocks()
+  })
+
+  it('should match responses to requests by id', async () => {
+    const child = fakeWrapper(request => ({ echo: request.input.Resume }))
+    const scorer = new ResidentScorer(() => child, 'lines')
+
+    const responses = await Promise.all([
+      scorer.request({ input: { Resume: 'first' } }),
+      scorer.request({ input: { Resume: 'second' } })
+    ])
+
+    expect(responses.map(response => response.echo)).toEqual(['first', 'second'])
+  })
+
+  it('should reject a request the wrapper never answers once the timeout passes', async () => {
+    const child = fakeWrapper(request => (request.op === 'ping' ? { status: 'ok' } : undefined))
+    const scorer = new ResidentScorer(() => child, 'lines', 20)
+
+    await expect(scorer.request({ op: 'ping' })).resolves.toMatchObject({ status: 'ok' })
+    await expect(scorer.request({ input: { Resume: 'x' } })).rejects.toThrow('did not answer within 20 ms')
+  })
+
+  it('should reject instead of writing when the wrapper exits between start and send', async () => {
+    const child = fakeWrapper(() => ({ status: 'ok' }))
+    const scorer = new ResidentScorer(() => child, 'lines')
+    await scorer.request({ op: 'ping' })
+
+    const request = scorer.request({ op: 'ping' })
+    child.emit('close', 1)
+
+    await expect(request).rejects.toThrow('Resident scorer is not running')
+  })
+
+  it('should reject pending requests when the wrapper exits', async () => {
+    const child = fakeWrapper(request => (request.op === 'ping' ? { status: 'ok' } : undefined))
+    const scorer = new ResidentScorer(() => child, 'lines')
+    await scorer.request({ op: 'ping' })
+
+    const request = scorer.request({ input: { Resume: 'x' } })
+    await new Promise(resolve => setImmediate(resolve))
+    child.emit('close', 1)
+
+    await expect(request).rejects.toThrow('exited with code 1')
+  })
+
+  it.skipIf(!hasPython)('should encode batch frames that framed_protocol.py decodes to the same rows', () => {
+    const inputs = [
+      { 'Job Description': 'python engineer', 'Resume': 'python, sql', 'Job Roles': 'Software Engineer' },
+      { 'Job Description': 'python engineer', 'Resume': 'résumé – ünïcode', 'Ethnicity': 'Asian' },
+      { 'Job Description': 'python engineer', 'Resume': '' }
+    ]
+    const frame = encodeBatchFrame(inputs, { id: 7, deadline_ms: 250 })
+
+    const decoded = spawnSync(python, ['-c', [
+      'import sys, json',
+      'from framed_protocol import iter_frames, decode_frame',
+      'print(json.dumps([decode_frame(frame) for frame in iter_frames(sys.stdin.buffer)]))'
+    ].join('\n')], { cwd: integrationDir, input: frame })
+
+    expect(decoded.status).toBe(0)
+    expect(JSON.parse(decoded.stdout.toString())).toEqual([{ id: 7, deadline_ms: 250, inputs }])
+  })
+})
@@ -1,8 +1,11 @@
-import { spawn, ChildProcess } from 'child_process';
+import { spawn, ChildProcess, ChildProcessWithoutNullStreams } from 'child_process';
+import http from 'http';
+import os from 'os';
 import path from 'path';
 import fs from 'fs/promises';
 import { logger } from '../utils/logger';
 import { prisma } from '../lib/prisma';
+import { ResidentScorer, DEFAULT_REQUEST_TIMEOUT_MS } from './xgboostResidentScorer';
 
 export interface XGBoostModelInput {
   candidateId: string;
@@ -30,6 +33,32 @@ export interface XGBoostPrediction {
   inferenceTimeMs: number;
   reasoning: string[];          // Explanation for the prediction
   timestamp: string;
+  degraded?: boolean;           // Rule-based fallback score from an overloaded wrapper (--degrade)
+}
+
+export interface RankingCandidate {
+  applicationId: string;
+  resume: string;
+  ethnicity?: string;
+}
+
+export interface RankedCandidate {
+  applicationId: string;
+  rank: number;
+  probability: number;
+  binaryPrediction: 0 | 1;
+  rounds?: number;                  // Truncated-ensemble score (tier) rather than the full model
+  cascade?: 'prescreen' | 'full';   // Stage that settled the score under --cascade
+  degraded?: boolean;               // Rule-based keyword score, ranked after every model score
+}
+
+interface RankedEntry {
+  id: string;
+  rank: number;
+  probability: number;
+  rounds?: number;
+  cascade?: 'prescreen' | 'full';
+  degraded?: boolean;
 }
 
 export class XGBoostModelService {
@@ -42,6 +71,14 @@ export class XGBoostModelService {
   private readonly targetRecall = 0.70;
   private readonly targetPrecision = 0.57;
   private isInitialized = false;
+  private readonly scorerAgent = new http.Agent({ keepAlive: true });
+  private residentScorer: ResidentScorer | null = null;
+  // Spawn mode: wrapper processes running at once, and calls allowed to wait for one
+  private readonly maxProcesses = Number(process.env.XGBOOST_MAX_PROCESSES) || os.cpus().length;
+  private readonly maxQueuedCalls = Number(process.env.XGBOOST_MAX_QUEUED_CALLS) || 64;
+  private activeProcesses = 0;
+  private readonly processQueue: Array<() => void> = [];
+  private shedCalls = 0;
 
   constructor() {
     // Use local development paths from environment or defaults
@@ -93,12 +130,7 @@ export class XGBoostModelService {
       const featureExtractionStart = Date.now();
       
       // Prepare input in your model's expected format
-      const modelInput = {
-        'Job Description': input.data.jobDescription,
-        'Resume': input.data.resume,
-        'Job Roles': input.data.jobRoles,
-        'Ethnicity': input.data.ethnicity || 'Not Specified'
-      };
+      const modelInput = this.toModelInput(input);
 
       const featureExtractionTime = Date.now() - featureExtractionStart;
       const inferenceStart = Date.now();
@@ -109,35 +141,16 @@ export class XGBoostModelService {
       const inferenceTime = Date.now() - inferenceStart;
       const totalTime = Date.now() - startTime;
 
-      // Apply your optimized threshold
-      const binaryPrediction = rawPrediction.probability >= this.optimizedThreshold ? 1 : 0;
-      
-      // Calculate confidence (distance from decision boundary)
-      const confidence = Math.abs(rawPrediction.probability - 0.5) * 2;
-
-      // Generate reasoning based on prediction
-      const reasoning = this.generateReasoning(rawPrediction, binaryPrediction);
-
-      const prediction: XGBoostPrediction = {
-        applicationId: input.applicationId,
-        candidateId: input.candidateId,
-        jobId: input.jobId,
-        probability: rawPrediction.probability,
-        binaryPrediction,
-        confidence,
-        thresholdUsed: this.optimizedThreshold,
-        modelVersion: this.modelVersion,
+      const prediction = this.buildPrediction(input, rawPrediction.probability, {
         processingTimeMs: totalTime,
         featureExtractionTimeMs: featureExtractionTime,
-        inferenceTimeMs: inferenceTime,
-        reasoning,
-        timestamp: new Date().toISOString()
-      };
+        inferenceTimeMs: inferenceTime
+      }, rawPrediction.degraded === true);
 
       // Store prediction in database
       await this.storePrediction(prediction);
 
-      logger.info(`XGBoost prediction completed for application ${input.applicationId}: ${binaryPrediction} (${rawPrediction.probability.toFixed(4)})`);
+      logger.info(`XGBoost prediction completed for application ${input.applicationId}: ${prediction.binaryPrediction} (${prediction.probability.toFixed(4)})`);
       
       return prediction;
 
@@ -149,29 +162,228 @@ export class XGBoostModelService {
 
   /**
    * Batch prediction for multiple applications
+   * Without a scoring server or resident scorer, one `--stream` wrapper process scores every
+   * row and each prediction is stored as soon as its chunk is scored; with one, chunks are sent to it
    */
   async predictBatch(inputs: XGBoostModelInput[]): Promise<XGBoostPrediction[]> {
     const predictions: XGBoostPrediction[] = [];
+
+    if (!this.isInitialized) {
+      await this.initializeModel();
+    }
+
+    if (!process.env.XGBOOST_SCORER_ADDRESS && !process.env.XGBOOST_RESIDENT_PROTOCOL) {
+      return this.predictBatchStreaming(inputs);
+    }
     
-    // Process in batches to manage memory
-    const batchSize = 10;
+    // Process in chunks to bound memory per Python call
+    const batchSize = 500;
     for (let i = 0; i < inputs.length; i += batchSize) {
-      const batch = inputs.slice(i, i + batchSize);
-      const batchPromises = batch.map(input => this.predict(input));
-      const batchResults = await Promise.allSettled(batchPromises);
-      
-      batchResults.forEach((result, index) => {
-        if (result.status === 'fulfilled') {
-          predictions.push(result.value);
-        } else {
-          logger.error(`Batch prediction failed for input ${i + index}:`, result.reason);
+      const batch: XGBoostModelInput[] = [];
+
+      inputs.slice(i, i + batchSize).forEach((input, index) => {
+        try {
+          this.validateInput(input);
+          batch.push(input);
+        } catch (error) {
+          logger.error(`Batch prediction failed for input ${i + index}:`, error);
         }
       });
+
+      if (batch.length === 0) {
+        continue;
+      }
+
+      const startTime = Date.now();
+      let rawResults: Array<{ probability?: number; error?: string; degraded?: boolean }>;
+      try {
+        rawResults = await this.runPythonWrapper(batch.map(input => this.toModelInput(input)));
+      } catch (error) {
+        logger.error(`Batch prediction failed for inputs ${i}-${i + batch.length - 1}:`, error);
+        continue;
+      }
+      const inferenceTime = Date.now() - startTime;
+
+      for (let index = 0; index < batch.length; index++) {
+        const input = batch[index];
+        const rawResult = rawResults[index];
+
+        if (!rawResult || typeof rawResult.probability !== 'number') {
+          logger.error(`Batch prediction failed for application ${input.applicationId}:`, rawResult?.error);
+          continue;
+        }
+
+        const prediction = this.buildPrediction(input, rawResult.probability, {
+          processingTimeMs: inferenceTime,
+          featureExtractionTimeMs: 0,
+          inferenceTimeMs: inferenceTime
+        }, rawResult.degraded === true);
+
+        try {
+          await this.storePrediction(prediction);
+          predictions.push(prediction);
+        } catch (error) {
+          logger.error(`Failed to store prediction for application ${input.applicationId}:`, error);
+        }
+      }
     }
     
     return predictions;
   }
 
+  /**
+   * Score all valid inputs through one streaming wrapper process, storing predictions as they arrive
+   */
+  private async predictBatchStreaming(inputs: XGBoostModelInput[]): Promise<XGBoostPrediction[]> {
+    const predictions: XGBoostPrediction[] = [];
+    const batch: XGBoostModelInput[] = [];
+
+    inputs.forEach((input, index) => {
+      try {
+        this.validateInput(input);
+        batch.push(input);
+      } catch (error) {
+        logger.error(`Batch prediction failed for input ${index}:`, error);
+      }
+    });
+
+    if (batch.length === 0) {
+      return predictions;
+    }
+
+    const startTime = Date.now();
+    await this.streamPythonWrapper(batch.map(input => this.toModelInput(input)), async (index, rawResult) => {
+      const input = batch[index];
+      if (!input || typeof rawResult.probability !== 'number') {
+        logger.error(`Batch prediction failed for application ${input?.applicationId}:`, rawResult.error);
+        return;
+      }
+
+      const elapsed = Date.now() - startTime;
+      const prediction = this.buildPrediction(input, rawResult.probability, {
+        processingTimeMs: elapsed,
+        featureExtractionTimeMs: 0,
+        inferenceTimeMs: elapsed
+      });
+
+      try {
+        await this.storePrediction(prediction);
+        predictions.push(prediction);
+      } catch (error) {
+        logger.error(`Failed to store prediction for application ${input.applicationId}:`, error);
+      }
+    });
+
+    return predictions;
+  }
+
+  /**
+   * Rank every applicant for one job in a single wrapper call and return the top K
+   * The job text is vectorized once and only K results are built and returned
+   * A tier ('triage', 'screen' or one from --tier) scores with the first boosting rounds only:
+   * a cheaper first pass whose shortlist can then be re-ranked without one
+   * Candidates an overloaded wrapper could only rule-score come after every model-scored one,
+   * marked degraded; their keyword scores are never compared with model probabilities
+   */
+  async rankCandidates(
+    job: { jobDescription: string; jobRoles: string },
+    candidates: RankingCandidate[],
+    topK = 10,
+    tier?: string
+  ): Promise<RankedCandidate[]> {
+    if (!this.isInitialized) {
+      await this.initializeModel();
+    }
+
+    const response = await this.runPythonWrapper({
+      job: { 'Job Description': job.jobDescription, 'Job Roles': job.jobRoles },
+      candidates: candidates.map(candidate => ({
+        id: candidate.applicationId,
+        'Resume': candidate.resume,
+        'Ethnicity': candidate.ethnicity || 'Not Specified'
+      })),
+      top_k: topK,
+      ...(tier ? { tier } : {})
+    }, '/rank');
+
+    if (response.failed > 0) {
+      logger.warn(`Ranking skipped ${response.failed} of ${response.candidates} candidates:`, response.errors);
+    }
+
+    const ranked: RankedEntry[] = response.ranked;
+    const degraded: RankedEntry[] = (response.degraded || []).slice(0, Math.max(0, topK - ranked.length));
+    if (degraded.length > 0) {
+      logger.warn(`Ranking rule-scored ${response.degraded_rows} of ${response.candidates} candidates (wrapper overloaded)`);
+    }
+
+    return [
+      ...ranked.map(entry => ({
+        applicationId: entry.id,
+        rank: entry.rank,
+        probability: entry.probability,
+        binaryPrediction: (entry.probability >= this.optimizedThreshold ? 1 : 0) as 0 | 1,
+        ...(entry.rounds !== undefined ? { rounds: entry.rounds } : {}),
+        ...(entry.cascade ? { cascade: entry.cascade } : {})
+      })),
+      // Keyword coverage is not a probability: never thresholded into a positive prediction
+      ...degraded.map((entry, offset) => ({
+        applicationId: entry.id,
+        rank: ranked.length + offset + 1,
+        probability: entry.probability,
+        binaryPrediction: 0 as const,
+        degraded: true
+      }))
+    ];
+  }
+
+  /**
+   * Map TalentSol input onto the model's training column names
+   */
+  private toModelInput(input: XGBoostModelInput): Record<string, string> {
+    return {
+      'Job Description': input.data.jobDescription,
+      'Resume': input.data.resume,
+      'Job Roles': input.data.jobRoles,
+      'Ethnicity': input.data.ethnicity || 'Not Specified'
+    };
+  }
+
+  /**
+   * Apply the optimized threshold and assemble the prediction record
+   */
+  private buildPrediction(
+    input: XGBoostModelInput,
+    probability: number,
+    timings: Pick<XGBoostPrediction, 'processingTimeMs' | 'featureExtractionTimeMs' | 'inferenceTimeMs'>,
+    degraded = false
+  ): XGBoostPrediction {
+    // Apply your optimized threshold; keyword coverage is not a probability, so a
+    // degraded score is never a positive prediction and carries no confidence
+    const binaryPrediction = !degraded && probability >= this.optimizedThreshold ? 1 : 0;
+
+    // Calculate confidence (distance from decision boundary)
+    const confidence = degraded ? 0 : Math.abs(probability - 0.5) * 2;
+    const reasoning = this.generateReasoning({ probability }, binaryPrediction);
+    if (degraded) {
+      reasoning.unshift('Approximate score: the model was overloaded, so a rule-based keyword match answered');
+    }
+
+    return {
+      applicationId: input.applicationId,
+      candidateId: input.candidateId,
+      jobId: input.jobId,
+      probability,
+      binaryPrediction,
+      confidence,
+      thresholdUsed: this.optimizedThreshold,
+      modelVersion: this.modelVersion,
+      ...timings,
+      reasoning,
+      timestamp: new Date().toISOString(),
+      ...(degraded ? { degraded } : {})
+    };
+  }
+
   /**
    * Validate input format matches your training data expectations
    */
@@ -201,22 +413,43 @@ export class XGBoostModelService {
   /**
    * Call Python wrapper for model prediction using local virtual environment
    */
-  private async callPythonPredictor(input: Record<string, string>): Promise<{ probability: number }> {
+  private async callPythonPredictor(
+    input: Record<string, string>
+  ): Promise<{ probability: number; degraded?: boolean }> {
+    return this.runPythonWrapper(input);
+  }
+
+  /**
+   * Run the Python wrapper once with a JSON payload (an object, or an array for batches)
+   * When XGBOOST_SCORER_ADDRESS points at a running scoring server, post to it instead
+   * (to `endpoint` when given, otherwise /score or /score/batch); when XGBOOST_RESIDENT_PROTOCOL
+   * is 'framed' or 'lines', send it to a resident `--serve` wrapper kept by this service
+   * Resident scoring carries XGBOOST_DEADLINE_MS as each request's "deadline_ms" budget
+   */
+  private async runPythonWrapper(payload: unknown, endpoint?: string): Promise<any> {
+    const scorerAddress = process.env.XGBOOST_SCORER_ADDRESS;
+    if (scorerAddress) {
+      const deadline = this.deadlineFields();
+      const body = endpoint
+        ? payload
+        : Array.isArray(payload) ? { inputs: payload, ...deadline } : { input: payload, ...deadline };
+      const response = await this.callScoringServer(
+        scorerAddress,
+        endpoint || (Array.isArray(payload) ? '/score/batch' : '/score'),
+        body
+      );
+      return Array.isArray(payload) ? response.results : response;
+    }
+
+    const residentScorer = this.getResidentScorer();
+    if (residentScorer) {
+      return this.callResidentScorer(residentScorer, payload, endpoint);
+    }
+
+    await this.acquireProcessSlot();
     return new Promise((resolve, reject) => {
-      // Use local virtual environment Python if available
-      const pythonPath = process.env.XGBOOST_PYTHON_PATH ||
-        process.env.PYTHON_PATH ||
-        this.getLocalPythonPath() ||
-        'python';
-
-      const pythonProcess = spawn(pythonPath, [this.pythonWrapperPath], {
-        stdio: ['pipe', 'pipe', 'pipe'],
-        env: {
-          ...process.env,
-          VIRTUAL_ENV: process.env.XGBOOST_VENV_PATH || process.env.VIRTUAL_ENV,
-          PATH: this.getEnhancedPath()
-        }
-      });
+      const pythonProcess = this.spawnPythonWrapper();
+      this.releaseOnExit(pythonProcess);
 
       let stdout = '';
       let stderr = '';
@@ -244,11 +477,242 @@ export class XGBoostModelService {
       });
 
       // Send input to Python process
-      pythonProcess.stdin.write(JSON.stringify(input));
+      pythonProcess.stdin.write(JSON.stringify(payload));
       pythonProcess.stdin.end();
     });
   }
 
+  /**
+   * The resident `--serve` wrapper selected by XGBOOST_RESIDENT_PROTOCOL, started on first use
+   */
+  private getResidentScorer(): ResidentScorer | null {
+    const protocol = process.env.XGBOOST_RESIDENT_PROTOCOL;
+    if (!protocol) {
+      return null;
+    }
+    if (!this.residentScorer) {
+      // XGBOOST_DEGRADE=rule: overloaded or overdue rows get a rule-based score marked degraded
+      const degradeArgs = process.env.XGBOOST_DEGRADE === 'rule' ? ['--degrade', 'rule'] : [];
+      // XGBOOST_CASCADE=path: a linear pre-screen settles clear-cut rows before the trees
+      const cascadeArgs = process.env.XGBOOST_CASCADE ? ['--cascade', process.env.XGBOOST_CASCADE] : [];
+      this.residentScorer = new ResidentScorer(
+        args => this.spawnPythonWrapper([...args, ...degradeArgs, ...cascadeArgs]),
+        protocol === 'lines' ? 'lines' : 'framed',
+        Number(process.env.XGBOOST_RESIDENT_TIMEOUT_MS) || DEFAULT_REQUEST_TIMEOUT_MS
+      );
+    }
+    return this.residentScorer;
+  }
+
+  /**
+   * Score through the resident wrapper: arrays as column-encoded batches, rankings as op 'rank'
+   */
+  private async callResidentScorer(scorer: ResidentScorer, payload: any, endpoint?: string): Promise<any> {
+    if (Array.isArray(payload)) {
+      return scorer.scoreBatch(payload, this.deadlineFields());
+    }
+
+    const response = endpoint === '/rank'
+      ? await scorer.request({ ...payload, op: 'rank' })
+      : await scorer.request({ input: payload, ...this.deadlineFields() });
+    if (response.error) {
+      throw new Error(`Resident scorer failed: ${response.error}`);
+    }
+    return response;
+  }
+
+  /**
+   * Request-level "deadline_ms" from XGBOOST_DEADLINE_MS, or nothing when unset
+   */
+  private deadlineFields(): { deadline_ms?: number } {
+    const deadlineMs = Number(process.env.XGBOOST_DEADLINE_MS);
+    return deadlineMs > 0 ? { deadline_ms: deadlineMs } : {};
+  }
+
+  /**
+   * Wait for a free wrapper process slot; rejects at once when XGBOOST_MAX_QUEUED_CALLS are already waiting
+   * so a burst fails fast instead of spawning Python until the host swaps
+   */
+  private acquireProcessSlot(): Promise<void> {
+    if (this.activeProcesses < this.maxProcesses) {
+      this.activeProcesses++;
+      return Promise.resolve();
+    }
+    if (this.processQueue.length >= this.maxQueuedCalls) {
+      this.shedCalls++;
+      return Promise.reject(new Error(
+        `XGBoost scorer overloaded: ${this.activeProcesses} wrapper processes running, ${this.processQueue.length} calls queued`
+      ));
+    }
+    return new Promise(resolve => this.processQueue.push(resolve));
+  }
+
+  /**
+   * Hand the slot to the next queued call once the process has gone
+   */
+  private releaseOnExit(pythonProcess: ChildProcess): void {
+    let released = false;
+    const release = () => {
+      if (released) {
+        return;
+      }
+      released = true;
+      const next = this.processQueue.shift();
+      if (next) {
+        next();
+      } else {
+        this.activeProcesses--;
+      }
+    };
+    pythonProcess.once('close', release);
+    pythonProcess.once('error', release);
+  }
+
+  /**
+   * Spawn-mode load: running wrapper processes, calls waiting for one, and calls shed because the queue was full
+   */
+  getProcessStats() {
+    return {
+      activeProcesses: this.activeProcesses,
+      queuedCalls: this.processQueue.length,
+      maxProcesses: this.maxProcesses,
+      maxQueuedCalls: this.maxQueuedCalls,
+      shedCalls: this.shedCalls
+    };
+  }
+
+  /**
+   * Start the Python wrapper, using the local virtual environment's Python if available
+   */
+  private spawnPythonWrapper(args: string[] = []): ChildProcessWithoutNullStreams {
+    const pythonPath = process.env.XGBOOST_PYTHON_PATH ||
+      process.env.PYTHON_PATH ||
+      this.getLocalPythonPath() ||
+      'python';
+
+    return spawn(pythonPath, [this.pythonWrapperPath, ...args], {
+      stdio: ['pipe', 'pipe', 'pipe'],
+      env: {
+        ...process.env,
+        VIRTUAL_ENV: process.env.XGBOOST_VENV_PATH || process.env.VIRTUAL_ENV,
+        PATH: this.getEnhancedPath()
+      }
+    });
+  }
+
+  /**
+   * Score rows with one `--stream` wrapper process: NDJSON in, one NDJSON result line per row
+   * onResult runs for each row in input order as soon as its chunk is scored
+   */
+  private async streamPythonWrapper(
+    payloads: unknown[],
+    onResult: (index: number, result: { probability?: number; error?: string }) => Promise<void>
+  ): Promise<void> {
+    await this.acquireProcessSlot();
+    return new Promise((resolve, reject) => {
+      const pythonProcess = this.spawnPythonWrapper(['--stream']);
+      this.releaseOnExit(pythonProcess);
+      const stdin = pythonProcess.stdin;
+      const stdout = pythonProcess.stdout;
+
+      let pending = '';
+      let index = 0;
+      let stderr = '';
+      // Results are handled one after another so stores keep input order
+      let handled: Promise<void> = Promise.resolve();
+
+      stdout.setEncoding('utf8');
+      stdout.on('data', (chunk: string) => {
+        const lines = (pending + chunk).split('\n');
+        pending = lines.pop() ?? '';
+        for (const line of lines) {
+          if (!line.trim()) {
+            continue;
+          }
+          const position = index++;
+          let result: { probability?: number; error?: string };
+          try {
+            result = JSON.parse(line);
+          } catch (error) {
+            result = { error: `Failed to parse Python output: ${line}` };
+          }
+          handled = handled.then(() => onResult(position, result));
+        }
+      });
+
+      pythonProcess.stderr.on('data', (data) => {
+        stderr += data.toString();
+      });
+
+      pythonProcess.on('error', reject);
+      pythonProcess.on('close', (code) => {
+        handled.then(() => {
+          if (code !== 0) {
+            reject(new Error(`Python process failed with code ${code}: ${stderr}`));
+            return;
+          }
+          resolve();
+        }, reject);
+      });
+
+      // Respect backpressure so a large batch isn't buffered whole in the pipe
+      stdin.on('error', reject);
+      (async () => {
+        for (const payload of payloads) {
+          if (!stdin.write(JSON.stringify(payload) + '\n')) {
+            await new Promise(drained => stdin.once('drain', drained));
+          }
+        }
+        stdin.end();
+      })();
+    });
+  }
+
+  /**
+   * POST to a resident scoring server (`xgboost_predict_wrapper.py --listen ...`)
+   * Address is `unix:/path/to.sock` or `host:port`
+   */
+  private callScoringServer(address: string, endpoint: string, payload: unknown): Promise<any> {
+    return new Promise((resolve, reject) => {
+      const body = JSON.stringify(payload);
+      const target = address.startsWith('unix:')
+        ? { socketPath: address.slice('unix:'.length) }
+        : { host: address.split(':')[0] || '127.0.0.1', port: Number(address.split(':').pop()) };
+
+      const request = http.request({
+        ...target,
+        path: endpoint,
+        method: 'POST',
+        agent: this.scorerAgent,
+        headers: {
+          'Content-Type': 'application/json',
+          'Content-Length': Buffer.byteLength(body)
+        }
+      }, (response) => {
+        let data = '';
+        response.setEncoding('utf8');
+        response.on('data', (chunk) => {
+          data += chunk;
+        });
+        response.on('end', () => {
+          try {
+            const result = JSON.parse(data);
+            if (response.statusCode !== 200) {
+              reject(new Error(`Scoring server returned ${response.statusCode}: ${result.error || data}`));
+              return;
+            }
+            resolve(result);
+          } catch (error) {
+            reject(new Error(`Failed to parse scoring server output: ${data}`));
+          }
+        });
+      });
+
+      request.on('error', reject);
+      request.end(body);
+    });
+  }
+
   /**
    * Generate human-readable reasoning for the prediction
    */
@@ -286,7 +750,8 @@ export class XGBoostModelService {
         prediction: JSON.stringify({
           probability: prediction.probability,
           binary_prediction: prediction.binaryPrediction,
-          threshold_used: prediction.thresholdUsed
+          threshold_used: prediction.thresholdUsed,
+          degraded: prediction.degraded === true
         }),
         confidence: prediction.confidence,
         explanation: JSON.stringify({
@@ -351,8 +816,17 @@ print("validation_success")
 
   /**
    * Create Python wrapper script for model prediction
+   * (only when missing — the checked-in wrapper also provides --serve mode)
    */
   private async createPythonWrapper(): Promise<void> {
+    try {
+      await fs.access(this.pythonWrapperPath);
+      logger.info(`Using existing Python wrapper: ${this.pythonWrapperPath}`);
+      return;
+    } catch (error) {
+      // Fall through and generate the minimal one-shot wrapper
+    }
+
     const wrapperContent = `#!/usr/bin/env python3
 """
 XGBoost Model Prediction Wrapper for TalentSol
@@ -0,0 +1,270 @@
+import { ChildProcessWithoutNullStreams } from 'child_process';
+import { logger } from '../utils/logger';
+
+/**
+ * Client for one resident `xgboost_predict_wrapper.py --serve` process
+ * 'framed' speaks the length-prefixed protocol (framed_protocol.py): batches go
+ * column-encoded, with each distinct value sent once. 'lines' speaks JSON lines,
+ * which is easier to read when debugging. Requests are matched to responses by
+ * id, so many can be in flight. The process is started on first use and again
+ * after it exits. A request the process doesn't answer within the timeout is
+ * rejected, so a wedged wrapper can't hang its callers.
+ */
+export type ResidentProtocol = 'framed' | 'lines';
+
+// Frame: u32 payload length | u8 kind | payload (little-endian)
+const FRAME_HEADER_BYTES = 5;
+const KIND_JSON = 'J'.charCodeAt(0);
+const KIND_BATCH = 'B'.charCodeAt(0);
+// Row index for a field the row doesn't have
+const MISSING = 0xffffffff;
+
+export const DEFAULT_REQUEST_TIMEOUT_MS = 30000;
+
+interface PendingRequest {
+  resolve: (response: any) => void;
+  reject: (error: Error) => void;
+  timer: NodeJS.Timeout;
+}
+
+function frame(kind: number, payload: Buffer): Buffer {
+  const header = Buffer.alloc(FRAME_HEADER_BYTES);
+  header.writeUInt32LE(payload.length, 0);
+  header.writeUInt8(kind, 4);
+  return Buffer.concat([header, payload]);
+}
+
+function uint32(value: number): Buffer {
+  const buffer = Buffer.alloc(4);
+  buffer.writeUInt32LE(value, 0);
+  return buffer;
+}
+
+/**
+ * Column-encoded batch frame: per column, the distinct values once, then one index per row
+ */
+export function encodeBatchFrame(
+  inputs: Array<Record<string, string>>,
+  fields: Record<string, unknown>
+): Buffer {
+  const columns = [...new Set(inputs.flatMap(input => Object.keys(input)))];
+  const header = Buffer.from(JSON.stringify({ ...fields, rows: inputs.length, columns }), 'utf8');
+  const parts: Buffer[] = [uint32(header.length), header];
+
+  for (const column of columns) {
+    const distinct = new Map<string, number>();
+    const indices = Buffer.alloc(4 * inputs.length);
+    inputs.forEach((input, row) => {
+      const value = input[column];
+      if (value === undefined || value === null) {
+        indices.writeUInt32LE(MISSING, 4 * row);
+        return;
+      }
+      let index = distinct.get(String(value));
+      if (index === undefined) {
+        index = distinct.size;
+        distinct.set(String(value), index);
+      }
+      indices.writeUInt32LE(index, 4 * row);
+    });
+
+    const values = [...distinct.keys()].map(value => Buffer.from(value, 'utf8'));
+    const lengths = Buffer.alloc(4 * (values.length + 1));
+    lengths.writeUInt32LE(values.length, 0);
+    values.forEach((value, index) => lengths.writeUInt32LE(value.length, 4 * (index + 1)));
+    parts.push(lengths, ...values, indices);
+  }
+
+  return frame(KIND_BATCH, Buffer.concat(parts));
+}
+
+export class ResidentScorer {
+  private process: ChildProcessWithoutNullStreams | null = null;
+  private ready: Promise<void> | null = null;
+  private readonly pending = new Map<number, PendingRequest>();
+  // Unparsed output, joined only once it can hold a whole message
+  private chunks: Buffer[] = [];
+  private bufferedBytes = 0;
+  private neededBytes = 0;
+  private nextId = 1;
+
+  constructor(
+    private readonly spawnWrapper: (args: string[]) => ChildProcessWithoutNullStreams,
+    private readonly protocol: ResidentProtocol = 'framed',
+    private readonly requestTimeoutMs = DEFAULT_REQUEST_TIMEOUT_MS
+  ) {}
+
+  /**
+   * Send one JSON request ({ input }, { inputs }, { op: 'rank', ... }) and resolve with its response
+   */
+  async request(payload: Record<string, unknown>): Promise<any> {
+    await this.start();
+    const id = this.nextId++;
+    const body = Buffer.from(JSON.stringify({ ...payload, id }), 'utf8');
+    const data = this.protocol === 'framed' ? frame(KIND_JSON, body) : Buffer.concat([body, Buffer.from('\n')]);
+    return this.send(id, data);
+  }
+
+  /**
+   * Score a batch of model input rows; results come back in row order
+   */
+  async scoreBatch(
+    inputs: Array<Record<string, string>>,
+    fields: Record<string, unknown> = {}
+  ): Promise<Array<{ probability?: number; error?: string; degraded?: boolean }>> {
+    if (this.protocol !== 'framed') {
+      return (await this.request({ ...fields, inputs })).results;
+    }
+
+    await this.start();
+    const id = this.nextId++;
+    const response = await this.send(id, encodeBatchFrame(inputs, { ...fields, id }));
+    return response.results;
+  }
+
+  /**
+   * Close stdin; the wrapper answers what it has already read and exits
+   */
+  close(): void {
+    this.process?.stdin.end();
+    this.process = null;
+    this.ready = null;
+  }
+
+  private send(id: number, data: Buffer): Promise<any> {
+    return new Promise((resolve, reject) => {
+      // The process may have exited between start() resolving and now
+      const child = this.process;
+      if (!child) {
+        reject(new Error('Resident scorer is not running'));
+        return;
+      }
+      const timer = setTimeout(() => {
+        if (this.pending.delete(id)) {
+          reject(new Error(`Resident scorer did not answer within ${this.requestTimeoutMs} ms`));
+        }
+      }, this.requestTimeoutMs);
+      this.pending.set(id, { resolve, reject, timer });
+      // Node buffers whatever the pipe can't take yet; responses still match by id
+      child.stdin.write(data);
+    });
+  }
+
+  private start(): Promise<void> {
+    if (this.ready) {
+      return this.ready;
+    }
+
+    this.ready = new Promise((resolve, reject) => {
+      const args = this.protocol === 'framed' ? ['--serve', '--framed'] : ['--serve'];
+      const child = this.spawnWrapper(args);
+      this.process = child;
+      this.chunks = [];
+      this.bufferedBytes = 0;
+      this.neededBytes = 0;
+      let started = false;
+
+      child.stdout.on('data', (chunk: Buffer) => {
+        for (const message of this.takeMessages(chunk)) {
+          if (message.event === 'ready') {
+            started = true;
+            resolve();
+            continue;
+          }
+          this.settle(message);
+        }
+      });
+
+      child.stderr.on('data', (data) => {
+        logger.warn(`XGBoost resident scorer: ${data.toString().trim()}`);
+      });
+
+      child.stdin.on('error', (error) => {
+        logger.error('XGBoost resident scorer stdin failed:', error);
+      });
+
+      const fail = (error: Error) => {
+        if (this.process === child) {
+          this.process = null;
+          this.ready = null;
+        }
+        if (!started) {
+          reject(error);
+        }
+        for (const request of this.pending.values()) {
+          clearTimeout(request.timer);
+          request.reject(error);
+        }
+        this.pending.clear();
+      };
+      child.on('error', fail);
+      child.on('close', (code) => fail(new Error(`Resident scorer exited with code ${code}`)));
+    });
+
+    return this.ready;
+  }
+
+  /**
+   * Complete messages once a chunk finishes one or more (frames or lines); partial ones stay buffered
+   */
+  private takeMessages(chunk: Buffer): any[] {
+    this.chunks.push(chunk);
+    this.bufferedBytes += chunk.length;
+    // Joining on every chunk would copy a large response once per chunk
+    if (this.bufferedBytes < this.neededBytes || (this.protocol === 'lines' && !chunk.includes(0x0a))) {
+      return [];
+    }
+
+    const data = this.chunks.length === 1 ? this.chunks[0] : Buffer.concat(this.chunks, this.bufferedBytes);
+    const messages: any[] = [];
+    let offset = 0;
+
+    if (this.protocol === 'framed') {
+      this.neededBytes = FRAME_HEADER_BYTES;
+      while (data.length - offset >= FRAME_HEADER_BYTES) {
+        const size = data.readUInt32LE(offset);
+        if (data.length - offset - FRAME_HEADER_BYTES < size) {
+          this.neededBytes = FRAME_HEADER_BYTES + size;
+          break;
+        }
+        const start = offset + FRAME_HEADER_BYTES;
+        messages.push(this.parse(data.toString('utf8', start, start + size)));
+        offset = start + size;
+      }
+    } else {
+      let newline: number;
+      while ((newline = data.indexOf(0x0a, offset)) !== -1) {
+        const line = data.toString('utf8', offset, newline);
+        if (line.trim()) {
+          messages.push(this.parse(line));
+        }
+        offset = newline + 1;
+      }
+    }
+
+    const rest = data.subarray(offset);
+    this.chunks = rest.length ? [rest] : [];
+    this.bufferedBytes = rest.length;
+    return messages;
+  }
+
+  private parse(text: string): any {
+    try {
+      return JSON.parse(text);
+    } catch (error) {
+      return { id: null, error: `Failed to parse resident scorer output: ${text.slice(0, 200)}` };
+    }
+  }
+
+  private settle(message: any): void {
+    const request = this.pending.get(message.id);
+    if (!request) {
+      // Also a late answer to a request that already timed out
+      logger.warn('XGBoost resident scorer sent an unmatched response:', message);
+      return;
+    }
+    this.pending.delete(message.id);
+    clearTimeout(request.timer);
+    request.resolve(message);
+  }
+}